@@ -0,0 +1,95 @@
+'''GeoGrapher批量计算性能测试
+测试Core中各批量计算函数的耗时，并检查结果的形状，包括N为0的情形。
+使用`make benchmark-batch`运行。
+'''
+
+import array
+import random
+import time
+
+from .GeoGraphItems import Core
+
+__all__ = ['matrix', 'checkShapes', 'benchmark']
+
+
+def matrix(values: list[float], width: int) -> memoryview | array.array:
+    '''以连续的float64数组表示n行width列的矩阵，供批量计算函数使用。
+
+    :param values: 按行排列的所有元素。
+    :param width: 列数，为1时返回一维数组。
+    :returns: 支持缓冲区协议的数组，无元素时为空的一维数组。
+    '''
+    data = array.array('d', values)
+    if width == 1 or not data:
+        return data  # memoryview.cast()不接受含0的形状
+    return memoryview(data).cast('B').cast('d', (len(data) // width, width))
+
+
+def randomArgs(n: int) -> dict[str, memoryview | array.array]:
+    '''生成n组随机参数：点p、直线l与l2、圆心o与o2、半径r与r2、直线上的两点p0与p1。
+    '''
+    def uniform(count: int, low: float = -100., high: float = 100.):
+        return [random.uniform(low, high) for _ in range(count)]
+    p0, p1 = uniform(2 * n), uniform(2 * n)
+    line = []
+    for i in range(n):
+        (x0, y0), (x1, y1) = p0[2 * i:2 * i + 2], p1[2 * i:2 * i + 2]
+        line += [y1 - y0, x0 - x1, x1 * y0 - x0 * y1]
+    return {
+        'p': matrix(uniform(2 * n), 2), 'l': matrix(line, 3),
+        'l2': matrix(uniform(3 * n), 3),
+        'o': matrix(uniform(2 * n), 2), 'o2': matrix(uniform(2 * n), 2),
+        'r': matrix(uniform(n, 10., 100.), 1),
+        'r2': matrix(uniform(n, 10., 100.), 1),
+        'p0': matrix(p0, 2), 'p1': matrix(p1, 2)}
+
+
+def kernels(args: dict) -> dict:
+    '''各批量计算函数及其参数，值为返回结果的无参函数。
+    '''
+    a = args
+    return {
+        'batchDistanceTo(p, p)': lambda: Core.batchDistanceTo(a['p'], a['o']),
+        'batchDistanceTo(p, l)': lambda: Core.batchDistanceTo(a['p'], a['l']),
+        'batchFootPoint(p, l)': lambda: Core.batchFootPoint(a['p'], a['l']),
+        'batchFootPoint(p, o, r)': lambda: Core.batchFootPoint(
+            a['p'], a['o'], a['r']),
+        'batchIntersec(l1, l2)': lambda: Core.batchIntersec(a['l'], a['l2']),
+        'batchIntersec(l, o, r, p0, p1)': lambda: Core.batchIntersec(
+            a['l'], a['o'], a['r'], a['p0'], a['p1']),
+        'batchIntersec(o1, r1, o2, r2)': lambda: Core.batchIntersec(
+            a['o'], a['r'], a['o2'], a['r2']),
+    }
+
+
+def checkShapes(n: int):
+    '''检查各批量计算函数在n组参数下返回的memoryview形状，不符时抛出AssertionError。
+    '''
+    for name, kernel in kernels(randomArgs(n)).items():
+        result = kernel()
+        views = result if isinstance(result, tuple) else (result,)
+        for view in views:
+            expected = (n,) if view.format == '?' or 'Distance' in name \
+                else (n, 2)
+            assert view.shape == expected, (name, view.shape, expected)
+            assert len(view.tolist()) == n, name
+
+
+def benchmark(n: int, repeat: int = 5):
+    '''以n组随机参数测试各批量计算函数，输出平均每项的耗时。
+    '''
+    checkShapes(n)
+    print(f'== N = {n}')
+    for name, kernel in kernels(randomArgs(n)).items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            kernel()
+        elapsed = (time.perf_counter() - start) / repeat
+        perItem = f'{elapsed / n * 1e9:10.1f} ns per item' if n else ''
+        print(f'{name:<34}{elapsed * 1e6:10.1f} us{perItem}')
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    for n in (0, 1, 1000, 100000):
+        benchmark(n)
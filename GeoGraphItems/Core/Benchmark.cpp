@@ -0,0 +1,231 @@
+/* Benchmark.cpp - Core计算核心的性能测试
+ * 使用`make benchmark`编译并运行
+ */
+#include <chrono>
+#include <cstdio>
+#include <random>
+#include <thread>
+
+#include "GeoItems/GeoIntersection.hpp"
+#include "GeoItems/GeoItemsManager.hpp"
+
+template <class F>
+double timeit(int n, F f)
+{
+    // 运行f(i)共n次，返回每次运行的平均时间（纳秒）
+    auto start = std::chrono::steady_clock::now();
+    for (int i = 0; i < n; ++i) f(i);
+    std::chrono::duration<double, std::nano> d
+        = std::chrono::steady_clock::now() - start;
+    return d.count() / n;
+}
+
+template <class Real>
+struct KernelInputs
+{
+    /* 随机生成的计算核心输入。
+     */
+    std::vector<BasicPointPos<Real>> p, o;
+    std::vector<BasicLineArgs<Real>> l;
+    std::vector<Real> r;
+
+    KernelInputs(int n)
+    {
+        std::mt19937 gen(20250101);
+        std::uniform_real_distribution<double> pos(-1000, 1000), rad(1, 800);
+        for (int i = 0; i < n; ++i)
+        {
+            double x1 = pos(gen), y1 = pos(gen), x2 = pos(gen), y2 = pos(gen),
+                x3 = pos(gen), y3 = pos(gen);
+            p.emplace_back(Real(x1), Real(y1));
+            o.emplace_back(Real(x2), Real(y2));
+            l.emplace_back(Real(y3 - y1), Real(x1 - x3), Real(x3 * y1 - x1 * y3));
+            r.push_back(Real(rad(gen)));
+        }
+    }
+};
+
+template <class Real>
+void benchKernels(const char *name, int n, double *results)
+{
+    KernelInputs<Real> in(n);
+    volatile bool sink = false;
+    results[0] = timeit(n, [&](int i) {
+        sink = sink ^ (footPoint(in.p[i], in.l[i]).first > 0);});
+    results[1] = timeit(n, [&](int i) {
+        sink = sink ^ (footPoint(in.p[i], in.o[i], in.r[i]).first > 0);});
+    results[2] = timeit(n, [&](int i) {
+        sink = sink ^ (intersec(in.l[i], in.l[(i + 1) % n]).first > 0);});
+    results[3] = timeit(n, [&](int i) {
+        auto [p1, p2] = intersec(
+            in.l[i], in.o[i], in.r[i], in.p[i], in.o[(i + 1) % n]);
+        sink = sink ^ (p1.first > 0);});
+    results[4] = timeit(n, [&](int i) {
+        auto [p1, p2] = intersec(
+            in.o[i], in.r[i], in.o[(i + 1) % n], in.r[(i + 1) % n]);
+        sink = sink ^ (p1.first > 0);});
+    std::printf("%-10s", name);
+    for (int k = 0; k < 5; ++k) std::printf("%14.1f", results[k]);
+    std::printf("\n");
+}
+
+void benchmarkKernels()
+{
+    const char *names[] = {"footPoint(L)", "footPoint(C)",
+        "intersec(LL)", "intersec(LC)", "intersec(CC)"};
+    double dec[5], dbl[5];
+    std::printf("== Kernels, ns per call\n%-10s", "");
+    for (auto& name : names) std::printf("%14s", name);
+    std::printf("\n");
+    benchKernels<DecFloat>("DecFloat", 20000, dec);
+    benchKernels<double>("double", 2000000, dbl);
+    std::printf("%-10s", "speedup");
+    for (int k = 0; k < 5; ++k) std::printf("%13.1fx", dec[k] / dbl[k]);
+    std::printf("\n");
+}
+
+void benchmarkGraph(int n, int moves)
+{
+    // 共享一个端点的n条线段，相邻线段与第n + 1条线段的交点，拖动共享端点
+    GeoItemsManager manager;
+    manager.setPrecision(Precision::Double);
+    GeoPoint shared(0, 0), far(1000, 1);
+    std::vector<GeoPoint> ends;
+    std::vector<GeoSegment> segments(n + 1);
+    std::vector<GeoIntersection> intersections(n);
+    ends.reserve(n);
+    segments[n].addMaster(shared), segments[n].addMaster(far);
+    for (int i = 0; i < n; ++i)
+    {
+        ends.emplace_back(1000 - i, 1000 + i);
+        segments[i].addMaster(shared), segments[i].addMaster(ends[i]);
+    }
+    for (int i = 0; i < n; ++i)
+    {
+        intersections[i].addMaster(segments[i]);
+        intersections[i].addMaster(segments[(i + 1) % n]);
+    }
+    manager.addItem(shared), manager.addItem(far);
+    for (auto& i : ends) manager.addItem(i);
+    for (auto& i : segments) manager.addItem(i);
+    for (auto& i : intersections) manager.addItem(i);
+    manager.recompute({&shared});
+    GeoPoint::cacheStatistics().reset();
+    GeoSegment::cacheStatistics().reset();
+    GeoIntersection::cacheStatistics().reset();
+    double t = timeit(moves, [&](int i) {
+        shared.setPos(i % 7, i % 5);
+        manager.recompute({&shared});});
+    CacheStatistics p = GeoPoint::cacheStatistics().total();
+    CacheStatistics s = GeoSegment::cacheStatistics().total();
+    CacheStatistics c = GeoIntersection::cacheStatistics().total();
+    std::printf("== Graph, %d segments sharing one point\n"
+        "recompute: %.1f us per move\n"
+        "cache hits/misses per move: point %.1f/%.1f, segment %.1f/%.1f, "
+        "intersection %.1f/%.1f\n", n, t / 1000,
+        double(p.hits) / moves, double(p.misses) / moves,
+        double(s.hits) / moves, double(s.misses) / moves,
+        double(c.hits) / moves, double(c.misses) / moves);
+}
+
+void benchmarkScaling(int n, int moves, Precision precision)
+{
+    // 一个点经由n条线段影响n个交点，每层n个互不依赖的图元
+    GeoItemsManager manager;
+    manager.setPrecision(precision);
+    GeoPoint shared(0, 0);
+    std::vector<GeoPoint> ends;
+    std::vector<GeoSegment> segments(n);
+    std::vector<GeoIntersection> intersections(n);
+    ends.reserve(n);
+    for (int i = 0; i < n; ++i)
+    {
+        ends.emplace_back(1000 - i, 1000 + i);
+        segments[i].addMaster(shared), segments[i].addMaster(ends[i]);
+    }
+    for (int i = 0; i < n; ++i)
+    {
+        intersections[i].addMaster(segments[i]);
+        intersections[i].addMaster(segments[(i + 1) % n]);
+    }
+    manager.addItem(shared);
+    for (auto& i : ends) manager.addItem(i);
+    for (auto& i : segments) manager.addItem(i);
+    for (auto& i : intersections) manager.addItem(i);
+    int maxThreads = std::max(1u, std::thread::hardware_concurrency());
+    std::printf("== Scaling, %d segments, %s\n", n,
+        precision == Precision::Double ? "double" : "DecFloat");
+    double serial = 0;
+    for (int threads = 1; threads <= maxThreads; ++threads)
+    {
+        manager.setThreadCount(threads);
+        manager.recompute({&shared});
+        double t = timeit(moves, [&](int i) {
+            shared.setPos(i % 7, i % 5);
+            manager.recompute({&shared});});
+        if (threads == 1) serial = t;
+        std::printf("%2d threads: %9.1f us per move, speedup %.2f\n",
+            threads, t / 1000, serial / t);
+    }
+}
+
+void benchmarkIndex(int n, int queries)
+{
+    // n / 2个随机点与连接相邻两点的n / 2条线段，点的平均间距为40
+    // 点按列排序，使相邻两点大多相近，与SpatialIndexBenchmark.py相同
+    std::mt19937 rng(0);
+    double side = 40 * std::sqrt(n / 2.);
+    std::uniform_real_distribution<double> uniform(-side, side);
+    GeoItemsManager manager;
+    manager.setPrecision(Precision::Double);
+    std::vector<PointPosD> positions(n / 2);
+    for (auto& p : positions) p = PointPosD(uniform(rng), uniform(rng));
+    std::sort(positions.begin(), positions.end(), [](auto& p, auto& q) {
+        return std::make_pair(std::floor(p.first / 40), p.second)
+            < std::make_pair(std::floor(q.first / 40), q.second);});
+    std::vector<GeoPoint> points;
+    std::vector<GeoSegment> segments(n / 2);
+    points.reserve(n / 2);
+    for (auto& [x, y] : positions) points.emplace_back(x, y);
+    for (int i = 0; i < n / 2; ++i)
+    {
+        segments[i].addMaster(points[i]);
+        segments[i].addMaster(points[(i + 1) % (n / 2)]);
+    }
+    for (auto& i : points) manager.addItem(i);
+    for (auto& i : segments) manager.addItem(i);
+    manager.within(0, 0, 0);
+    std::vector<double> xs(queries), ys(queries);
+    for (int i = 0; i < queries; ++i) xs[i] = uniform(rng), ys[i] = uniform(rng);
+    size_t found = 0;
+    double tWithin = timeit(queries, [&](int i) {
+        found += manager.within(xs[i], ys[i], 20).size();});
+    double tNearest = timeit(queries, [&](int i) {
+        found += manager.nearest(xs[i], ys[i], 8).size();});
+    double tRect = timeit(queries, [&](int i) {
+        found += manager.inRect(xs[i], ys[i], xs[i] + 100, ys[i] + 100).size();});
+    // 拖动一个点（移动不超过10）后的增量更新与查询
+    std::uniform_real_distribution<double> step(-10, 10);
+    double tMove = timeit(queries, [&](int i) {
+        GeoPoint& point = points[i % points.size()];
+        auto [x, y] = positions[i % points.size()];
+        x += step(rng), y += step(rng);
+        point.setPos(x, y);
+        manager.recompute({&point});
+        found += manager.within(x, y, 20).size();});
+    std::printf("== Spatial index, %d items\n"
+        "within(p, 20) %.2f us, nearest(p, 8) %.2f us, inRect(100x100) %.2f us, "
+        "drag + within %.2f us (%zu hits)\n",
+        n, tWithin / 1000, tNearest / 1000, tRect / 1000, tMove / 1000, found);
+}
+
+int main()
+{
+    benchmarkKernels();
+    benchmarkGraph(1000, 200);
+    benchmarkScaling(4000, 50, Precision::Double);
+    benchmarkScaling(4000, 5, Precision::DecFloat);
+    benchmarkIndex(10000, 10000);
+    benchmarkIndex(100000, 10000);
+    return 0;
+}
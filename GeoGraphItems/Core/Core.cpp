@@ -1,5 +1,6 @@
 /* GeoGrapher.GeoGraphItems.Core - 基础图元和计算几何核心
  */
+#include "GeoItems/GeoBatch.hpp"
 #include "GeoItems/GeoIntersection.hpp"
 #include "GeoItems/GeoItemsManager.hpp"
 
@@ -16,6 +17,30 @@ bp::tuple (*intersec_CC)(PointPos, DecFloat, PointPos, DecFloat)
     = [](PointPos o1, DecFloat r1, PointPos o2, DecFloat r2){
         auto [p1, p2] = intersec(o1, r1, o2, r2);
         return bp::make_tuple(p1, p2);};
+bp::dict (*cacheStatistics)() = [](){
+    bp::dict statistics;
+    auto add = [&](const char *name, CacheCounter& counter){
+        CacheStatistics s = counter.total();
+        statistics[name] = bp::make_tuple(s.hits, s.misses);};
+    add("GeoPoint", GeoPoint::cacheStatistics());
+    add("GeoSegment", GeoSegment::cacheStatistics());
+    add("GeoCircle", GeoCircle::cacheStatistics());
+    add("GeoIntersection", GeoIntersection::cacheStatistics());
+    return statistics;};
+void (*resetCacheStatistics)() = [](){
+    GeoPoint::cacheStatistics().reset();
+    GeoSegment::cacheStatistics().reset();
+    GeoCircle::cacheStatistics().reset();
+    GeoIntersection::cacheStatistics().reset();};
+bp::object (*batchFootPoint_L)(bp::object, bp::object) = &batchFootPoint;
+bp::object (*batchFootPoint_C)(bp::object, bp::object, bp::object)
+    = &batchFootPoint;
+bp::tuple (*batchIntersec_LL)(bp::object, bp::object) = &batchIntersec;
+bp::tuple (*batchIntersec_LC)(
+    bp::object, bp::object, bp::object, bp::object, bp::object)
+    = &batchIntersec;
+bp::tuple (*batchIntersec_CC)(bp::object, bp::object, bp::object, bp::object)
+    = &batchIntersec;
 
 BOOST_PYTHON_MODULE(Core)
 {
@@ -42,12 +67,71 @@ BOOST_PYTHON_MODULE(Core)
         .def("a", &getla, arg("self"), "直线方程中x项系数。")
         .def("b", &getlb, arg("self"), "直线方程中y项系数。")
         .def("c", &getlc, arg("self"), "直线方程中常数项。");
-    class_<GeoItemsManager>("GeoItemsManager", "图元管理类。",
+    enum_<Precision>("GeoPrecision", "图元计算使用的精度。")
+        .value("DECFLOAT", Precision::DecFloat)
+        .value("DOUBLE", Precision::Double);
+    class_<GeoItemsManager, boost::noncopyable>("GeoItemsManager", "图元管理类。",
         init<>(arg("self"), "初始化图元管理对象。"))
         .def("addItem", &GeoItemsManager::addItem,
-            (arg("self"), "item"), "添加图元。")
+            (arg("self"), "item"), "添加图元，返回图元编号。")
         .def("removeItem", &GeoItemsManager::removeItem,
-            (arg("self"), "item"), "删除图元。");
+            (arg("self"), "item"), "删除图元。")
+        .def("recompute", &GeoItemsManager::recomputePy,
+            (arg("self"), "items"),
+            "重新计算给定图元及受其影响的所有图元，"
+            "返回坐标或定义状态改变了的图元编号列表，按拓扑顺序排列。")
+        .def("threadCount", &GeoItemsManager::threadCount, arg("self"),
+            "重新计算使用的线程数，默认为1。")
+        .def("setThreadCount", &GeoItemsManager::setThreadCount,
+            (arg("self"), "count"),
+            "设置重新计算使用的线程数，0表示使用硬件支持的线程数，最多64。"
+            "重新计算时释放GIL，互不依赖的同层图元较多时分给各线程计算，"
+            "结果与线程数无关。")
+        .def("precision", &GeoItemsManager::precision, arg("self"),
+            "所管理图元的计算精度，为`GeoPrecision`对象。")
+        .def("setPrecision", &GeoItemsManager::setPrecision,
+            (arg("self"), "precision"),
+            "设置所有已添加及之后添加的图元的计算精度。"
+            "`GeoPrecision.DOUBLE`使用硬件双精度浮点数，速度快；"
+            "`GeoPrecision.DECFLOAT`使用50位十进制浮点数，用于导出或验证。\n"
+            "切换精度后交点的坐标可能改变，退化情形下两交点的编号也可能互换；"
+            "本函数不通知调用者，应随后以所有顶层图元调用`recompute()`，"
+            "得到坐标改变了的图元。")
+        .def("memoryUsage", &GeoItemsManager::memoryUsage, arg("self"),
+            "内存占用统计，返回字典：items为图元数，storeBytes为连续存储占用的字节数，"
+            "objectBytes为图元对象占用的字节数（估计值），bytesPerItem为平均每个图元"
+            "占用的字节数。")
+        .def("snapshot", &GeoItemsManager::snapshot, arg("self"),
+            "无复制地导出所有图元的计算结果，返回字典，值均为只读memoryview"
+            "（可用numpy.asarray转换）：\n"
+            "points为点与交点坐标，形状(N, 2)；segments为线段的直线参数a, b, c，"
+            "形状(N, 3)；circles为圆心坐标与半径，形状(N, 3)；\n"
+            "pointHandles、segmentHandles、circleHandles为各行对应的图元编号；"
+            "rows为图元编号到所在行号的映射，无则为-1；version为存储的版本号。\n"
+            "导出的数组持有其数据，在图元管理器销毁后仍可访问。"
+            "`storeVersion()`与导出时的version相同时，导出的数组随重新计算原地更新；"
+            "添加或删除图元时，仍被导出的数组先被复制，"
+            "导出的数组因而保持导出时的长度与内容，不再更新。")
+        .def("storeVersion", &GeoItemsManager::storeVersion, arg("self"),
+            "连续存储的版本号，每次添加或删除图元时改变。")
+        .def("nearest", &GeoItemsManager::nearestPy, (arg("self"), "p", "k"),
+            "到点p = (x, y)最近的k个图元，返回(图元编号, 距离)的列表，按距离由近到远排列。"
+            "空间查询只涉及点（含交点）、线段与圆，距离为到线段或圆周的距离，"
+            "未定义的图元不参与；空间索引在重新计算时增量更新。")
+        .def("within", &GeoItemsManager::withinPy,
+            (arg("self"), "p", "radius"),
+            "到点p = (x, y)的距离不超过radius的所有图元，返回值同`nearest()`。")
+        .def("inRect", &GeoItemsManager::inRectPy, (arg("self"), "rect"),
+            "与矩形rect = (left, top, right, bottom)相交的所有图元的编号列表，"
+            "按编号排列。圆只以圆周参与相交判断。")
+        .def("updateIndex", &GeoItemsManager::updateIndex, (arg("self"), "item"),
+            "立即更新已移动的图元在空间索引中的位置。图元移动后要到下次`recompute()`"
+            "才更新空间索引，期间如需空间查询（如拖动时逐帧绘制），应在移动后调用此函数。")
+        .def("indexCellSize", &GeoItemsManager::indexCellSize, arg("self"),
+            "空间索引的网格大小，默认为64。")
+        .def("setIndexCellSize", &GeoItemsManager::setIndexCellSize,
+            (arg("self"), "cellSize"),
+            "设置空间索引的网格大小，宜与查询半径及图元间距相当。");
     class_<GeoItem>("GeoItem", "所有图元类的基类。",
         init<>(arg("self"), "初始化图元。"))
         .def("addMaster", &GeoItem::addMaster, (arg("self"), "master"),
@@ -56,9 +140,24 @@ BOOST_PYTHON_MODULE(Core)
             (arg("self"), "child"), "添加子图元。")
         .def("removeChild", &GeoItem::removeChild,
             (arg("self"), "child"), "删除子图元。")
-        .def("update", &GeoItem::update, arg("self"), "更新本图元。");
+        .def("update", &GeoItem::update, arg("self"),
+            "更新本图元，即使本图元及所有依赖于它的图元的缓存失效。")
+        .def("invalidate", &GeoItem::invalidate, arg("self"),
+            "使本图元及所有依赖于它的图元的缓存失效。")
+        .def("isStale", &GeoItem::isStale, arg("self"), "缓存是否已失效。")
+        .def("precision", &GeoItem::precision, arg("self"),
+            "本图元的计算精度。")
+        .def("refresh", &GeoItem::refresh, arg("self"),
+            "重新计算本图元，返回坐标或定义状态是否改变。")
+        .def("handle", &GeoItem::handle, arg("self"),
+            "图元在图元管理器中的编号，未添加至图元管理器时为-1。");
     class_<GeoPoint, bases<GeoItem>>("GeoPoint", "点图元类。",
-        init<object, object>((arg("self"), "x", "y"), "初始化点图元。"))
+        init<>(arg("self"), "初始化坐标为NaN的点图元。"))
+        .def(init<double, double>(
+            (arg("self"), "x", "y"), "以给定坐标初始化点图元。"))
+        .def("setPos", &GeoPoint::setPos, (arg("self"), "x", "y"),
+            "设置点图元的原始坐标，应在点图元移动后调用。"
+            "路径上的点以原始坐标在路径上的投影为坐标。")
         .def("cpos", &GeoPoint::pos, arg("self"), "点图元位置，返回PointPos对象。")
         .def("pos", &GeoPoint::posPy, arg("self"), "点图元位置。");
     class_<GeoSegment, bases<GeoItem>>("GeoSegment", "线段图元类。",
@@ -95,4 +194,28 @@ BOOST_PYTHON_MODULE(Core)
         "求直线与圆的两交点，以元组返回。最后2个参数传入直线上的两点。");
     def("intersec", intersec_CC,
         (arg("o1"), "r1", "o2", "r2"), "求两圆的两交点，以元组返回。");
+    def("cacheStatistics", cacheStatistics,
+        "各类图元的缓存命中统计，返回字典，键为类名，值为元组(命中次数, 未命中次数)。");
+    def("resetCacheStatistics", resetCacheStatistics, "清零缓存命中统计。");
+    def("batchDistanceTo", &batchDistanceTo, (arg("p"), "q"),
+        "批量计算距离。参数均为支持缓冲区协议的连续float64数组（如NumPy数组），"
+        "p形状为(N, 2)；q形状为(N, 2)时计算两点距离，为(N, 3)时计算点到直线距离，"
+        "每行为直线参数a, b, c。返回形状为(N,)的memoryview。计算期间释放GIL。\n"
+        "N可为0（其余批量函数同），此时参数也可为空的一维数组，"
+        "返回的memoryview形状仍为(0,)或(0, 2)。");
+    def("batchFootPoint", batchFootPoint_L, (arg("p"), "l"),
+        "批量计算点在直线上的投影，p形状为(N, 2)，l形状为(N, 3)，"
+        "返回形状为(N, 2)的memoryview。");
+    def("batchFootPoint", batchFootPoint_C, (arg("p"), "o", "r"),
+        "批量计算点到圆垂足，p、o形状为(N, 2)，r形状为(N,)，"
+        "返回形状为(N, 2)的memoryview。");
+    def("batchIntersec", batchIntersec_LL, (arg("l1"), "l2"),
+        "批量求两直线的交点，l1、l2形状为(N, 3)。返回元组(交点, 掩码)，"
+        "交点形状为(N, 2)，不存在的交点为NaN；掩码形状为(N,)，交点存在处为True。");
+    def("batchIntersec", batchIntersec_LC, (arg("l"), "o", "r", "p0", "p1"),
+        "批量求直线与圆的两交点，l形状为(N, 3)，r形状为(N,)，其余形状为(N, 2)。"
+        "返回元组(第一交点, 第二交点, 掩码)，含义同上。");
+    def("batchIntersec", batchIntersec_CC, (arg("o1"), "r1", "o2", "r2"),
+        "批量求两圆的两交点，o1、o2形状为(N, 2)，r1、r2形状为(N,)。"
+        "返回元组(第一交点, 第二交点, 掩码)，含义同上。");
 }
@@ -3,25 +3,39 @@
 #ifndef GeoBasic_HPP
 #define GeoBasic_HPP
 
+#include <cmath>
 #include <boost/multiprecision/cpp_dec_float.hpp>
 #include <boost/python.hpp>
 
 using namespace boost::math;
 namespace bp = boost::python;
 using DecFloat = boost::multiprecision::cpp_dec_float_50;  // 高精度浮点数
-using PointPos = std::pair<DecFloat, DecFloat>;            // 点坐标
-using LineArgs = std::tuple<DecFloat, DecFloat, DecFloat>; // 表示一条直线的参数
-using Func = std::function<DecFloat()>; // 返回DecFloat的函数，用于GeoPoint
+template <class Real>
+using BasicPointPos = std::pair<Real, Real>;          // 任意精度的点坐标
+template <class Real>
+using BasicLineArgs = std::tuple<Real, Real, Real>;   // 任意精度的直线参数
+using PointPos = BasicPointPos<DecFloat>;   // 点坐标
+using LineArgs = BasicLineArgs<DecFloat>;   // 表示一条直线的参数
+using PointPosD = BasicPointPos<double>;    // 双精度点坐标
+using LineArgsD = BasicLineArgs<double>;    // 双精度直线参数
+
+enum class Precision {DecFloat, Double};  // 图元计算使用的精度
 
 DecFloat nandf = DecFloat(nan(""));               // NaN
 PointPos nanpos = PointPos(nandf, nandf);         // NaN点
+PointPosD nanposd = PointPosD(NAN, NAN);          // 双精度NaN点
 LineArgs nanline = LineArgs(nandf, nandf, nandf); // NaN直线
-Func nanfunc = []() -> DecFloat {return nandf;};  // 返回NaN的函数
 double dfloat2double(DecFloat& num);  // DecFloat转double
-Func pyfunccv(bp::object f);  // Python函数转返回DecFloat的函数
 DecFloat getla(LineArgs& l);  // 获取LineArgs的a
 DecFloat getlb(LineArgs& l);  // 获取LineArgs的b
 DecFloat getlc(LineArgs& l);  // 获取LineArgs的c
+bool samed(double a, double b);  // 判断两数相同，NaN视为相同
+bool samepos(const PointPosD& p, const PointPosD& q);  // 判断两点坐标相同
+template <class Real> Real nanof();                  // 给定精度的NaN
+template <class To, class From>  // 转换点坐标的精度
+BasicPointPos<To> poscv(const BasicPointPos<From>& p);
+template <class To, class From>  // 转换直线参数的精度
+BasicLineArgs<To> linecv(const BasicLineArgs<From>& l);
 
 double dfloat2double(DecFloat& num)
 {
@@ -33,13 +47,6 @@ bool dfloatisnan(DecFloat& num)
     return isnan((double)num);
 }
 
-Func pyfunccv(bp::object f)
-{
-    return [f]() -> DecFloat {
-        return DecFloat((double)bp::extract<double>(f()));
-    };
-}
-
 DecFloat getla(LineArgs& l)
 {
     return std::get<0>(l);
@@ -55,4 +62,33 @@ DecFloat getlc(LineArgs& l)
     return std::get<2>(l);
 }
 
+bool samed(double a, double b)
+{
+    return a == b or (std::isnan(a) and std::isnan(b));
+}
+
+bool samepos(const PointPosD& p, const PointPosD& q)
+{
+    return samed(p.first, q.first) and samed(p.second, q.second);
+}
+
+template <class Real>
+Real nanof()
+{
+    return std::numeric_limits<Real>::quiet_NaN();
+}
+
+template <class To, class From>
+BasicPointPos<To> poscv(const BasicPointPos<From>& p)
+{
+    return BasicPointPos<To>(To(p.first), To(p.second));
+}
+
+template <class To, class From>
+BasicLineArgs<To> linecv(const BasicLineArgs<From>& l)
+{
+    auto [a, b, c] = l;
+    return BasicLineArgs<To>(To(a), To(b), To(c));
+}
+
 #endif
@@ -0,0 +1,291 @@
+/* GeoBatch.hpp - 批量计算函数
+ * 通过缓冲区协议读取连续的float64数组（如NumPy数组），逐项调用双精度计算核心，
+ * 计算期间释放GIL。结果以memoryview返回，可用numpy.asarray无复制地转换。
+ */
+#ifndef GeoBatch_HPP
+#define GeoBatch_HPP
+
+#include "GeoBuffer.hpp"
+#include "GeoCalc.hpp"
+
+class BatchArray
+{
+    /* 只读的双精度连续数组，通过缓冲区协议获取，析构时释放。
+     * 形状为(N, width)，width为1时也可为(N,)。
+     * 空的一维数组视为0行，因memoryview.cast()无法得到形状(0, width)的数组。
+     */
+public:
+    // 获取obj的缓冲区，width为0时接受任意列数；name用于错误信息
+    BatchArray(bp::object obj, Py_ssize_t width, const char *name);
+    BatchArray(const BatchArray&) = delete;
+    BatchArray& operator=(const BatchArray&) = delete;
+    ~BatchArray();
+    Py_ssize_t size();    // 行数N
+    Py_ssize_t width();   // 列数
+    const double *row(Py_ssize_t i); // 第i行的首地址
+private:
+    Py_buffer _view;
+    Py_ssize_t _size = 0, _width = 1;
+    void _fail(const char *name, const char *reason); // 释放缓冲区并抛出ValueError
+};
+
+class BatchResult
+{
+    /* 计算结果数组，最后以带形状的memoryview导出，不复制数据。
+     */
+public:
+    // 分配size行、width列的结果，format为"d"（double）或"?"（bool）
+    BatchResult(Py_ssize_t size, Py_ssize_t width, const char *format);
+    template <class T>
+    T *data();          // 存储的首地址
+    bp::object view();  // 转换为memoryview，size为0时为形状(0, width)的空数组
+private:
+    std::shared_ptr<std::vector<unsigned char>> _bytes;
+    Py_ssize_t _size, _width, _itemsize;
+    const char *_format;
+};
+
+class GILRelease
+{
+    /* 在作用域内释放GIL。作用域内不得访问Python对象。
+     */
+public:
+    GILRelease();
+    GILRelease(const GILRelease&) = delete;
+    GILRelease& operator=(const GILRelease&) = delete;
+    ~GILRelease();
+private:
+    PyThreadState *_state;
+};
+
+// 批量计算两点距离或点到直线距离，由q的列数（2或3）决定，返回(N,)数组
+bp::object batchDistanceTo(bp::object p, bp::object q);
+// 批量计算点到直线垂足，返回(N, 2)数组
+bp::object batchFootPoint(bp::object p, bp::object l);
+// 批量计算点到圆垂足，返回(N, 2)数组
+bp::object batchFootPoint(bp::object p, bp::object o, bp::object r);
+// 批量计算两直线交点，返回交点(N, 2)数组与交点存在的掩码(N,)数组
+bp::tuple batchIntersec(bp::object l1, bp::object l2);
+// 批量计算直线与圆交点，返回两组交点(N, 2)数组与交点存在的掩码(N,)数组
+bp::tuple batchIntersec(bp::object l, bp::object o, bp::object r,
+    bp::object p0, bp::object p1);
+// 批量计算两圆交点，返回两组交点(N, 2)数组与交点存在的掩码(N,)数组
+bp::tuple batchIntersec(
+    bp::object o1, bp::object r1, bp::object o2, bp::object r2);
+
+BatchArray::BatchArray(bp::object obj, Py_ssize_t width, const char *name)
+{
+    if (PyObject_GetBuffer(obj.ptr(), &_view,
+            PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) < 0)
+        bp::throw_error_already_set();
+    const char *format = _view.format ? _view.format : "B";
+    if (*format == '@' or *format == '=' or *format == '<') ++format;
+    if (_view.itemsize != sizeof(double) or std::string(format) != "d")
+        _fail(name, "元素类型必须为float64");
+    if (_view.ndim == 1 and width <= 1) _size = _view.shape[0];
+    else if (_view.ndim == 1 and _view.shape[0] == 0) _width = width;
+    else if (_view.ndim == 2 and (width == 0 or _view.shape[1] == width))
+        _size = _view.shape[0], _width = _view.shape[1];
+    else _fail(name, "形状不符");
+}
+
+BatchArray::~BatchArray()
+{
+    PyBuffer_Release(&_view);
+}
+
+void BatchArray::_fail(const char *name, const char *reason)
+{
+    PyBuffer_Release(&_view);
+    std::string message = std::string("参数") + name + "：" + reason;
+    PyErr_SetString(PyExc_ValueError, message.c_str());
+    bp::throw_error_already_set();
+}
+
+Py_ssize_t BatchArray::size()
+{
+    return _size;
+}
+
+Py_ssize_t BatchArray::width()
+{
+    return _width;
+}
+
+const double *BatchArray::row(Py_ssize_t i)
+{
+    return static_cast<const double *>(_view.buf) + i * _width;
+}
+
+BatchResult::BatchResult(Py_ssize_t size, Py_ssize_t width, const char *format)
+    : _size(size), _width(width),
+    _itemsize(*format == 'd' ? sizeof(double) : sizeof(bool)), _format(format)
+{
+    // operator new分配的内存满足double的对齐要求
+    _bytes = std::make_shared<std::vector<unsigned char>>(
+        size * width * _itemsize);
+}
+
+template <class T>
+T *BatchResult::data()
+{
+    return reinterpret_cast<T *>(_bytes->data());
+}
+
+bp::object BatchResult::view()
+{
+    // memoryview.cast()不接受含0的形状，故直接以显式的形状导出
+    return exportBuffer(_bytes, _bytes->data(), _size, _width, _itemsize,
+        _format);
+}
+
+GILRelease::GILRelease() : _state(PyEval_SaveThread()) {}
+
+GILRelease::~GILRelease()
+{
+    PyEval_RestoreThread(_state);
+}
+
+// 检查各数组行数相同，返回行数
+template <class... Arrays>
+Py_ssize_t batchSize(BatchArray& first, Arrays&... rest)
+{
+    if (((rest.size() != first.size()) or ...))
+    {
+        PyErr_SetString(PyExc_ValueError, "各参数的长度必须相同");
+        bp::throw_error_already_set();
+    }
+    return first.size();
+}
+
+PointPosD batchPos(BatchArray& a, Py_ssize_t i)
+{
+    return PointPosD(a.row(i)[0], a.row(i)[1]);
+}
+
+LineArgsD batchLine(BatchArray& a, Py_ssize_t i)
+{
+    return LineArgsD(a.row(i)[0], a.row(i)[1], a.row(i)[2]);
+}
+
+void batchStore(double *out, Py_ssize_t i, PointPosD p)
+{
+    out[2 * i] = p.first, out[2 * i + 1] = p.second;
+}
+
+bp::object batchDistanceTo(bp::object p, bp::object q)
+{
+    BatchArray ps(p, 2, "p"), qs(q, 0, "q");
+    if (qs.size() and qs.width() != 2 and qs.width() != 3)
+    {
+        PyErr_SetString(PyExc_ValueError, "参数q：列数必须为2（点）或3（直线）");
+        bp::throw_error_already_set();
+    }
+    Py_ssize_t n = batchSize(ps, qs);
+    BatchResult result(n, 1, "d");
+    double *out = result.data<double>();
+    {
+        GILRelease release;
+        if (qs.width() == 2)
+            for (Py_ssize_t i = 0; i < n; ++i)
+                out[i] = distanceTo(batchPos(ps, i), batchPos(qs, i));
+        else
+            for (Py_ssize_t i = 0; i < n; ++i)
+                out[i] = distanceTo(batchPos(ps, i), batchLine(qs, i));
+    }
+    return result.view();
+}
+
+bp::object batchFootPoint(bp::object p, bp::object l)
+{
+    BatchArray ps(p, 2, "p"), ls(l, 3, "l");
+    Py_ssize_t n = batchSize(ps, ls);
+    BatchResult result(n, 2, "d");
+    double *out = result.data<double>();
+    {
+        GILRelease release;
+        for (Py_ssize_t i = 0; i < n; ++i)
+            batchStore(out, i, footPoint(batchPos(ps, i), batchLine(ls, i)));
+    }
+    return result.view();
+}
+
+bp::object batchFootPoint(bp::object p, bp::object o, bp::object r)
+{
+    BatchArray ps(p, 2, "p"), os(o, 2, "o"), rs(r, 1, "r");
+    Py_ssize_t n = batchSize(ps, os, rs);
+    BatchResult result(n, 2, "d");
+    double *out = result.data<double>();
+    {
+        GILRelease release;
+        for (Py_ssize_t i = 0; i < n; ++i)
+            batchStore(out, i,
+                footPoint(batchPos(ps, i), batchPos(os, i), *rs.row(i)));
+    }
+    return result.view();
+}
+
+bp::tuple batchIntersec(bp::object l1, bp::object l2)
+{
+    BatchArray l1s(l1, 3, "l1"), l2s(l2, 3, "l2");
+    Py_ssize_t n = batchSize(l1s, l2s);
+    BatchResult result(n, 2, "d"), mask(n, 1, "?");
+    double *out = result.data<double>();
+    bool *ok = mask.data<bool>();
+    {
+        GILRelease release;
+        for (Py_ssize_t i = 0; i < n; ++i)
+        {
+            PointPosD p = intersec(batchLine(l1s, i), batchLine(l2s, i));
+            batchStore(out, i, p);
+            ok[i] = not std::isnan(p.first);
+        }
+    }
+    return bp::make_tuple(result.view(), mask.view());
+}
+
+bp::tuple batchIntersec(bp::object l, bp::object o, bp::object r,
+    bp::object p0, bp::object p1)
+{
+    BatchArray ls(l, 3, "l"), os(o, 2, "o"), rs(r, 1, "r"),
+        p0s(p0, 2, "p0"), p1s(p1, 2, "p1");
+    Py_ssize_t n = batchSize(ls, os, rs, p0s, p1s);
+    BatchResult result1(n, 2, "d"), result2(n, 2, "d"), mask(n, 1, "?");
+    double *out1 = result1.data<double>(), *out2 = result2.data<double>();
+    bool *ok = mask.data<bool>();
+    {
+        GILRelease release;
+        for (Py_ssize_t i = 0; i < n; ++i)
+        {
+            auto [i1, i2] = intersec(batchLine(ls, i), batchPos(os, i),
+                *rs.row(i), batchPos(p0s, i), batchPos(p1s, i));
+            batchStore(out1, i, i1), batchStore(out2, i, i2);
+            ok[i] = not std::isnan(i1.first);
+        }
+    }
+    return bp::make_tuple(result1.view(), result2.view(), mask.view());
+}
+
+bp::tuple batchIntersec(
+    bp::object o1, bp::object r1, bp::object o2, bp::object r2)
+{
+    BatchArray o1s(o1, 2, "o1"), r1s(r1, 1, "r1"),
+        o2s(o2, 2, "o2"), r2s(r2, 1, "r2");
+    Py_ssize_t n = batchSize(o1s, r1s, o2s, r2s);
+    BatchResult result1(n, 2, "d"), result2(n, 2, "d"), mask(n, 1, "?");
+    double *out1 = result1.data<double>(), *out2 = result2.data<double>();
+    bool *ok = mask.data<bool>();
+    {
+        GILRelease release;
+        for (Py_ssize_t i = 0; i < n; ++i)
+        {
+            auto [i1, i2] = intersec(
+                batchPos(o1s, i), *r1s.row(i), batchPos(o2s, i), *r2s.row(i));
+            batchStore(out1, i, i1), batchStore(out2, i, i2);
+            ok[i] = not std::isnan(i1.first);
+        }
+    }
+    return bp::make_tuple(result1.view(), result2.view(), mask.view());
+}
+
+#endif
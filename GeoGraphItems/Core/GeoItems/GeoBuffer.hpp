@@ -0,0 +1,171 @@
+/* GeoBuffer.hpp - 以缓冲区协议导出连续数组
+ * 导出的memoryview通过导出对象持有底层数组，不依赖于导出者的生命周期；
+ * 底层数组被导出期间若需改变长度，则先复制一份（写时复制）。
+ * 图元存储的快照与批量计算的结果均由此导出，形状总是显式给出，N可为0。
+ */
+#ifndef GeoBuffer_HPP
+#define GeoBuffer_HPP
+
+#include <cstddef>
+#include <memory>
+#include <new>
+#include <vector>
+
+#include "GeoBasic.hpp"
+
+template <class T>
+class SharedArray
+{
+    /* 可导出的连续数组。导出的缓冲区与本对象共享底层数组，
+     * 底层数组的引用计数减1即为导出计数。
+     * 导出计数不为0时，改变长度或行号映射前先复制底层数组，
+     * 已导出的缓冲区因而始终有效，并保持导出时的长度；
+     * 在此之前，原地修改的值对已导出的缓冲区可见。
+     */
+public:
+    SharedArray();
+    const std::vector<T>& get() const;  // 只读访问
+    T *data();                // 原地修改值的首地址，不改变长度
+    std::vector<T>& detach(); // 取得可任意修改的数组，仍被导出时先复制
+    std::shared_ptr<const std::vector<T>> share();  // 导出底层数组
+    long exports() const;     // 导出计数
+private:
+    std::shared_ptr<std::vector<T>> _data;
+};
+
+struct GeoBufferObject
+{
+    /* 导出对象，实现只读的缓冲区协议，以自身作为Py_buffer的obj。
+     * 持有底层数组，由memoryview等使用者持有，最后一个使用者释放后析构。
+     */
+    PyObject_HEAD
+    std::shared_ptr<const void> owner;  // 持有底层数组
+    void *buf;
+    Py_ssize_t len, itemsize, ndim, shape[2], strides[2];
+    const char *format;
+};
+
+PyTypeObject *geoBufferType();  // 导出对象的类型，首次调用时初始化
+// 以只读memoryview导出buf处size行width列、每项itemsize字节的数组，不复制数据
+// width为1时为一维数组，size可为0；owner须持有buf，format须为静态字符串
+bp::object exportBuffer(std::shared_ptr<const void> owner, const void *buf,
+    Py_ssize_t size, Py_ssize_t width, Py_ssize_t itemsize,
+    const char *format);
+// 以只读memoryview导出data，width列，不复制数据
+template <class T>
+bp::object exportArray(std::shared_ptr<const std::vector<T>> data,
+    Py_ssize_t width, const char *format);
+
+template <class T>
+SharedArray<T>::SharedArray() : _data(std::make_shared<std::vector<T>>()) {}
+
+template <class T>
+const std::vector<T>& SharedArray<T>::get() const
+{
+    return *_data;
+}
+
+template <class T>
+T *SharedArray<T>::data()
+{
+    return _data->data();
+}
+
+template <class T>
+std::vector<T>& SharedArray<T>::detach()
+{
+    if (_data.use_count() > 1)
+        _data = std::make_shared<std::vector<T>>(*_data);
+    return *_data;
+}
+
+template <class T>
+std::shared_ptr<const std::vector<T>> SharedArray<T>::share()
+{
+    return _data;
+}
+
+template <class T>
+long SharedArray<T>::exports() const
+{
+    return _data.use_count() - 1;
+}
+
+int geoBufferGet(PyObject *self, Py_buffer *view, int flags)
+{
+    if (flags & PyBUF_WRITABLE)
+    {
+        PyErr_SetString(PyExc_BufferError, "导出的数组是只读的");
+        view->obj = nullptr;
+        return -1;
+    }
+    GeoBufferObject *buffer = reinterpret_cast<GeoBufferObject *>(self);
+    view->obj = self, Py_INCREF(self);
+    view->buf = buffer->buf;
+    view->len = buffer->len;
+    view->itemsize = buffer->itemsize;
+    view->readonly = 1;
+    view->format = flags & PyBUF_FORMAT ?
+        const_cast<char *>(buffer->format) : nullptr;
+    // 使用者未请求形状时按一维字节数组导出，数组总是C连续的
+    view->ndim = flags & PyBUF_ND ? buffer->ndim : 1;
+    view->shape = flags & PyBUF_ND ? buffer->shape : nullptr;
+    view->strides = (flags & PyBUF_STRIDES) == PyBUF_STRIDES ?
+        buffer->strides : nullptr;
+    view->suboffsets = nullptr;
+    view->internal = nullptr;
+    return 0;
+}
+
+void geoBufferDealloc(PyObject *self)
+{
+    reinterpret_cast<GeoBufferObject *>(self)->owner.~shared_ptr();
+    PyObject_Free(self);
+}
+
+PyTypeObject *geoBufferType()
+{
+    static PyBufferProcs procs = {geoBufferGet, nullptr};
+    static PyTypeObject type = {PyVarObject_HEAD_INIT(nullptr, 0)};
+    if (not type.tp_name)
+    {
+        type.tp_name = "Core.GeoBuffer";
+        type.tp_basicsize = sizeof(GeoBufferObject);
+        type.tp_flags = Py_TPFLAGS_DEFAULT;
+        type.tp_doc = "图元存储或批量计算结果的只读缓冲区。";
+        type.tp_dealloc = geoBufferDealloc;
+        type.tp_as_buffer = &procs;
+        if (PyType_Ready(&type) < 0) bp::throw_error_already_set();
+    }
+    return &type;
+}
+
+bp::object exportBuffer(std::shared_ptr<const void> owner, const void *buf,
+    Py_ssize_t size, Py_ssize_t width, Py_ssize_t itemsize,
+    const char *format)
+{
+    static std::max_align_t empty;  // 空数组的首地址可能为nullptr，以此代替
+    GeoBufferObject *buffer = PyObject_New(GeoBufferObject, geoBufferType());
+    if (not buffer) bp::throw_error_already_set();
+    bp::object object(bp::handle<>(reinterpret_cast<PyObject *>(buffer)));
+    new (&buffer->owner) std::shared_ptr<const void>(std::move(owner));
+    buffer->buf = size ? const_cast<void *>(buf) : (void *)&empty;
+    buffer->len = size * width * itemsize;
+    buffer->itemsize = itemsize;
+    buffer->ndim = width == 1 ? 1 : 2;
+    buffer->shape[0] = size, buffer->shape[1] = width;
+    buffer->strides[0] = width * itemsize, buffer->strides[1] = itemsize;
+    buffer->format = format;
+    return bp::object(bp::handle<>(PyMemoryView_FromObject(object.ptr())));
+}
+
+template <class T>
+bp::object exportArray(std::shared_ptr<const std::vector<T>> data,
+    Py_ssize_t width, const char *format)
+{
+    const T *buf = data->data();
+    Py_ssize_t size = data->size() / width;
+    return exportBuffer(std::move(data), buf, size, width, sizeof(T), format);
+}
+
+#endif
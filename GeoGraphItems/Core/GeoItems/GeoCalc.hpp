@@ -1,73 +1,143 @@
 /* GeoCalc - GeoItems相关计算函数
+ * 所有函数均以精度Real为模板参数，Real为DecFloat或double
  */
 #ifndef GeoCalc_HPP
 #define GeoCalc_HPP
 
+#include <cfloat>
+#include <cmath>
+#include <type_traits>
+
 #include "GeoBasic.hpp"
 
-DecFloat distanceTo(PointPos p1, PointPos p2);  // 两点距离
-DecFloat distanceTo(PointPos p, LineArgs l);    // 点到直线距离
+template <class Real>  // 两点距离
+Real distanceTo(BasicPointPos<Real> p1, BasicPointPos<Real> p2);
+template <class Real>  // 点到直线距离
+Real distanceTo(BasicPointPos<Real> p, BasicLineArgs<Real> l);
 // 一次计算点到直线的距离、投影，以及直线x项系数与y项系数的平方和
-std::tuple<DecFloat, PointPos, DecFloat> dstfpsq(PointPos p, LineArgs l);
-PointPos footPoint(PointPos p, LineArgs l); // 点到直线垂足
+template <class Real>
+std::tuple<Real, BasicPointPos<Real>, Real> dstfpsq(
+    BasicPointPos<Real> p, BasicLineArgs<Real> l);
+template <class Real>  // 点到直线垂足
+BasicPointPos<Real> footPoint(BasicPointPos<Real> p, BasicLineArgs<Real> l);
 // 点到圆垂足，意即以圆心为顶点、经过给定点的射线与圆的交点
-PointPos footPoint(PointPos p, PointPos o, DecFloat r);
+template <class Real>
+BasicPointPos<Real> footPoint(
+    BasicPointPos<Real> p, BasicPointPos<Real> o, Real r);
 // 判断给定角是否是逆时针角，返回正数代表是，负数代表非，0代表给定三点共线
-int isCounterclockwiseAngle(PointPos a, PointPos o, PointPos b);
-PointPos intersec(LineArgs l1, LineArgs l2); // 两直线交点
+// 双精度输入先以双精度计算并估计舍入误差，仅当无法判断时才以DecFloat计算
+template <class Real>
+int isCounterclockwiseAngle(
+    BasicPointPos<Real> a, BasicPointPos<Real> o, BasicPointPos<Real> b);
+int isCounterclockwiseAngleExact(PointPos a, PointPos o, PointPos b);
+// 判断向量u与向量p - q的数量积的符号，正数代表为正，负数代表为负
+// 与isCounterclockwiseAngle相同，双精度输入无法判断时才以DecFloat计算
+template <class Real>
+int dotSign(
+    BasicPointPos<Real> u, BasicPointPos<Real> p, BasicPointPos<Real> q);
+int dotSignExact(PointPos u, PointPos p, PointPos q);
+template <class Real>  // 两直线交点
+BasicPointPos<Real> intersec(BasicLineArgs<Real> l1, BasicLineArgs<Real> l2);
 // 直线与圆交点，圆用圆心与半径表示
-std::pair<PointPos, PointPos> intersec(
-    LineArgs l, PointPos o, DecFloat r, PointPos p0, PointPos p1);
+template <class Real>
+std::pair<BasicPointPos<Real>, BasicPointPos<Real>> intersec(
+    BasicLineArgs<Real> l, BasicPointPos<Real> o, Real r,
+    BasicPointPos<Real> p0, BasicPointPos<Real> p1);
 // 两圆交点，圆用圆心与半径表示
-std::pair<PointPos, PointPos> intersec(
-    PointPos o1, DecFloat r1, PointPos o2, DecFloat r2);
+template <class Real>
+std::pair<BasicPointPos<Real>, BasicPointPos<Real>> intersec(
+    BasicPointPos<Real> o1, Real r1, BasicPointPos<Real> o2, Real r2);
+
+// 过滤谓词的误差界系数。双精度结果与精确结果之差不超过此系数乘以各项绝对值之和，
+//   对于从DecFloat舍入得到的输入同样成立
+const double filterErrorBound = 8 * DBL_EPSILON;
 
-DecFloat distanceTo(PointPos p1, PointPos p2)
+template <class Real>
+Real distanceTo(BasicPointPos<Real> p1, BasicPointPos<Real> p2)
 {
-    DecFloat dx = p1.first - p2.first, dy = p1.second - p2.second;
+    using std::sqrt, std::fma;
+    Real dx = p1.first - p2.first, dy = p1.second - p2.second;
     return sqrt(fma(dx, dx, dy * dy));
 }
 
-DecFloat distanceTo(PointPos p, LineArgs l)
+template <class Real>
+Real distanceTo(BasicPointPos<Real> p, BasicLineArgs<Real> l)
 {
+    using std::sqrt, std::fma, std::abs;
     auto [a, b, c] = l;
-    DecFloat k = sqrt(fma(a, a, b * b));
-    return k ? abs(fma(a, p.first, fma(b, p.second, c)) / k) : nandf;
+    Real k = sqrt(fma(a, a, b * b));
+    return k ? Real(abs(fma(a, p.first, fma(b, p.second, c)) / k))
+        : nanof<Real>();
 }
 
-std::tuple<DecFloat, PointPos, DecFloat> dstfpsq(PointPos p, LineArgs l)
+template <class Real>
+std::tuple<Real, BasicPointPos<Real>, Real> dstfpsq(
+    BasicPointPos<Real> p, BasicLineArgs<Real> l)
 {
+    using std::sqrt, std::fma, std::abs;
     // 依次返回点到直线的距离（DiSTance）、点在直线上的投影坐标（FootPoint）、
     //   以及直线方程ax + by + c = 0中的a、b两项的平方和（SQuare）
     auto [a, b, c] = l;
-    if (a == 0 and b == 0) return std::make_tuple(nandf, nanpos, nandf);
+    Real nan = nanof<Real>();
+    if (a == 0 and b == 0)
+        return std::make_tuple(nan, BasicPointPos<Real>(nan, nan), nan);
     auto [x, y] = p;
-    DecFloat s = fma(a, a, b * b), k = -fma(a, x, fma(b, y, c)) / s;
-    return std::make_tuple(
-        abs(k * sqrt(s)), PointPos(fma(a, k, x), fma(b, k, y)), s);
+    Real s = fma(a, a, b * b), k = -fma(a, x, fma(b, y, c)) / s;
+    return std::make_tuple(Real(abs(k * sqrt(s))),
+        BasicPointPos<Real>(fma(a, k, x), fma(b, k, y)), s);
 }
 
-PointPos footPoint(PointPos p, LineArgs l)
+template <class Real>
+BasicPointPos<Real> footPoint(BasicPointPos<Real> p, BasicLineArgs<Real> l)
 {
+    using std::fma;
     auto [a, b, c] = l;
-    if (a == 0 and b == 0) return nanpos;
+    if (a == 0 and b == 0)
+        return BasicPointPos<Real>(nanof<Real>(), nanof<Real>());
     auto [x, y] = p;
-    DecFloat k = -fma(a, x, fma(b, y, c)) / fma(a, a, b * b);
-    return PointPos(fma(a, k, x), fma(b, k, y));
+    Real k = -fma(a, x, fma(b, y, c)) / fma(a, a, b * b);
+    return BasicPointPos<Real>(fma(a, k, x), fma(b, k, y));
 }
 
-PointPos footPoint(PointPos p, PointPos o, DecFloat r)
+template <class Real>
+BasicPointPos<Real> footPoint(
+    BasicPointPos<Real> p, BasicPointPos<Real> o, Real r)
 {
+    using std::sqrt, std::fma;
     auto [x, y] = p;
     auto [ox, oy] = o;
-    if (x == ox and y == oy) return nanpos;
-    if (x == ox) return PointPos(x, oy + (y > oy ? r : -r));
-    DecFloat k = (y - oy) / (x - ox),
-        ks = fma(k, k, 1), kd = r / sqrt(ks), kt = x > ox ? kd : -kd;
-    return PointPos(kt + ox, fma(k, kt, oy));
+    if (x == ox and y == oy)
+        return BasicPointPos<Real>(nanof<Real>(), nanof<Real>());
+    if (x == ox) return BasicPointPos<Real>(x, oy + (y > oy ? r : -r));
+    Real k = (y - oy) / (x - ox),
+        ks = fma(k, k, Real(1)), kd = r / sqrt(ks), kt = x > ox ? kd : -kd;
+    return BasicPointPos<Real>(kt + ox, fma(k, kt, oy));
+}
+
+template <class Real>
+int isCounterclockwiseAngle(
+    BasicPointPos<Real> a, BasicPointPos<Real> o, BasicPointPos<Real> b)
+{
+    using std::abs;
+    // DecFloat输入无需过滤，转换为双精度的开销高于直接计算
+    if constexpr (std::is_same_v<Real, DecFloat>)
+        return isCounterclockwiseAngleExact(a, o, b);
+    auto [xa, ya] = poscv<double>(a);
+    auto [xo, yo] = poscv<double>(o);
+    auto [xb, yb] = poscv<double>(b);
+    double x1 = (xo - xa) * (yb - yo), x2 = (yo - ya) * (xb - xo),
+        bound = filterErrorBound * (
+            (abs(xo) + abs(xa)) * (abs(yb) + abs(yo))
+            + (abs(yo) + abs(ya)) * (abs(xb) + abs(xo)));
+    if (x1 - x2 > bound) return -1;  // 含义同isCounterclockwiseAngleExact
+    else if (x2 - x1 > bound) return 1;
+    else if (std::isnan(bound)) return 0;  // 存在NaN，与精确计算结果相同
+    // 误差范围内无法判断，即三点近似共线
+    return isCounterclockwiseAngleExact(
+        poscv<DecFloat>(a), poscv<DecFloat>(o), poscv<DecFloat>(b));
 }
 
-int isCounterclockwiseAngle(PointPos a, PointPos o, PointPos b)
+int isCounterclockwiseAngleExact(PointPos a, PointPos o, PointPos b)
 {
     auto [xa, ya] = a;
     auto [xo, yo] = o;
@@ -79,61 +149,103 @@ int isCounterclockwiseAngle(PointPos a, PointPos o, PointPos b)
     return 0;  // a、o、b三点共线，无法判断
 }
 
-PointPos intersec(LineArgs l1, LineArgs l2)
+template <class Real>
+int dotSign(
+    BasicPointPos<Real> u, BasicPointPos<Real> p, BasicPointPos<Real> q)
+{
+    using std::abs, std::fma;
+    if constexpr (std::is_same_v<Real, DecFloat>)
+        return dotSignExact(u, p, q);
+    auto [ux, uy] = poscv<double>(u);
+    auto [px, py] = poscv<double>(p);
+    auto [qx, qy] = poscv<double>(q);
+    double v = fma(ux, px - qx, uy * (py - qy)),
+        bound = filterErrorBound * (
+            abs(ux) * (abs(px) + abs(qx)) + abs(uy) * (abs(py) + abs(qy)));
+    if (v > bound) return 1;
+    else if (-v > bound) return -1;
+    else if (std::isnan(bound) or std::isnan(v)) return 0;
+    return dotSignExact(
+        poscv<DecFloat>(u), poscv<DecFloat>(p), poscv<DecFloat>(q));
+}
+
+int dotSignExact(PointPos u, PointPos p, PointPos q)
 {
+    auto [ux, uy] = u;
+    DecFloat v = ux * (p.first - q.first) + uy * (p.second - q.second);
+    if (v > 0) return 1;
+    else if (v < 0) return -1;
+    return 0;
+}
+
+template <class Real>
+BasicPointPos<Real> intersec(BasicLineArgs<Real> l1, BasicLineArgs<Real> l2)
+{
+    using std::fma;
     auto [a1, b1, c1] = l1;
     auto [a2, b2, c2] = l2;
-    DecFloat k = fma(a1, b2, -a2 * b1);
-    return k ? PointPos(
-        fma(b1, c2, -b2 * c1) / k,
-        fma(a2, c1, -a1 * c2) / k) : nanpos;
+    Real k = fma(a1, b2, -a2 * b1);
+    return k ? BasicPointPos<Real>(
+        fma(b1, c2, -b2 * c1) / k, fma(a2, c1, -a1 * c2) / k)
+        : BasicPointPos<Real>(nanof<Real>(), nanof<Real>());
 }
 
-std::pair<PointPos, PointPos> intersec(
-    LineArgs l, PointPos o, DecFloat r, PointPos p0, PointPos p1)
+template <class Real>
+std::pair<BasicPointPos<Real>, BasicPointPos<Real>> intersec(
+    BasicLineArgs<Real> l, BasicPointPos<Real> o, Real r,
+    BasicPointPos<Real> p0, BasicPointPos<Real> p1)
 {
+    using std::sqrt;
+    using Pos = BasicPointPos<Real>;
     auto [a, b, c] = l;
-    if (a == 0 and b == 0)
-        return std::make_pair(nanpos, nanpos);
-    auto [ox, oy] = o;
+    Pos nan = Pos(nanof<Real>(), nanof<Real>());
+    if (a == 0 and b == 0) return std::make_pair(nan, nan);
     auto [h, hp, s] = dstfpsq(o, l);
-    if (r < h) return std::make_pair(nanpos, nanpos);
+    if (r < h) return std::make_pair(nan, nan);
     auto [hx, hy] = hp;
-    DecFloat d = (r + h) * (r - h), q = sqrt(d / s),
+    Real d = (r + h) * (r - h), q = sqrt(d / s),
         dx = -b * q, dy = a * q;
-    PointPos i1 = PointPos(hx + dx, hy + dy),
-        i2 = PointPos(hx - dx, hy - dy);
-    // 严格根据文档要求确定交点编号
-    int prop = isCounterclockwiseAngle(i2, i1, o);
-    if (prop > 0) return std::make_pair(i1, i2);
-    else if (prop < 0) return std::make_pair(i2, i1);
-    else
-    {
-        DecFloat d1 = distanceTo(p0, i1), d2 = distanceTo(p0, i2);
-        if (d1 > d2) return std::make_pair(i2, i1);
-        else if (d1 < d2 or distanceTo(p1, i1) > distanceTo(p1, i2))
-            return std::make_pair(i1, i2);
-        else return std::make_pair(i2, i1);
-    }
+    Pos i1 = Pos(hx + dx, hy + dy), i2 = Pos(hx - dx, hy - dy);
+    // 严格根据文档要求确定交点编号，即角i2 i1 o为逆时针角时i1为第一交点
+    // i1 - i2与向量(-b, a)即p1 - p0同向，故角i2 i1 o与角p0 p1 o的方向相同，
+    //   即圆心o在直线的哪一侧；以直线上的两点而非已舍入的交点或直线参数判断，
+    //   使两种精度的交点编号一致，如以圆心为端点的线段总是落入下面的分支
+    int side = isCounterclockwiseAngle(p0, p1, o);
+    if (side > 0) return std::make_pair(i1, i2);
+    else if (side < 0) return std::make_pair(i2, i1);
+    // 直线过圆心时，到p0较近的交点为第一交点，p0到两交点等距时，
+    //   到p1较远的交点为第一交点；p到i1较近即向量(-b, a)与p - o的数量积为正
+    Pos v = Pos(-b, a);
+    int near = dotSign(v, p0, o);
+    if (near > 0) return std::make_pair(i1, i2);
+    else if (near < 0 or dotSign(v, p1, o) >= 0) return std::make_pair(i2, i1);
+    else return std::make_pair(i1, i2);
 }
 
-std::pair<PointPos, PointPos> intersec(
-    PointPos o1, DecFloat r1, PointPos o2, DecFloat r2)
+template <class Real>
+std::pair<BasicPointPos<Real>, BasicPointPos<Real>> intersec(
+    BasicPointPos<Real> o1, Real r1, BasicPointPos<Real> o2, Real r2)
 {
+    using std::sqrt, std::fma;
+    using Pos = BasicPointPos<Real>;
     auto [x1, y1] = o1;
     auto [x2, y2] = o2;
-    DecFloat a = y2 - y1, b = x1 - x2, sq = fma(a, a, b * b),
+    Real a = y2 - y1, b = x1 - x2, sq = fma(a, a, b * b),
         l = sqrt(sq), rs = r1 + r2, ak = a / l, bk = b / l;
-    if (rs < l) return std::make_pair(nanpos, nanpos);
-    DecFloat l1 = (l + rs) * (l + r1 - r2) / l / 2 - r1,
+    if (rs < l)
+    {
+        Pos nan = Pos(nanof<Real>(), nanof<Real>());
+        return std::make_pair(nan, nan);
+    }
+    Real l1 = (l + rs) * (l + r1 - r2) / l / 2 - r1,
         x0 = x1 - l1 * bk, y0 = y1 + l1 * ak,
         h = sqrt((r1 + l1) * (r1 - l1)), dx = h * ak, dy = h * bk;
-    PointPos i1 = PointPos(x0 + dx, y0 + dy),
-        i2 = PointPos(x0 - dx, y0 - dy);
-    // 严格根据文档要求确定交点编号
-    int prop = isCounterclockwiseAngle(o1, i1, o2);
-    if (prop > 0) return std::make_pair(i1, i2);
-    else return std::make_pair(i2, i1);
+    Pos i1 = Pos(x0 + dx, y0 + dy), i2 = Pos(x0 - dx, y0 - dy);
+    // 严格根据文档要求确定交点编号，即角o1 i1 o2为逆时针角时i1为第一交点
+    // (x0, y0)在直线o1 o2上，i1 - (x0, y0)与向量(a, b)同向，故i1总在该直线的同一侧，
+    //   角o1 i1 o2总是顺时针角（两圆相切时三点共线，两交点重合），第一交点总是i2；
+    //   不以已舍入的交点判断，使两种精度的交点编号一致
+    return std::make_pair(i2, i1);
 }
 
 #endif
@@ -13,12 +13,26 @@ class GeoCircle : public GeoPathItem
 public:
     GeoCircle();
     PointPos footPointFrom(PointPos p);    // 点在圆上的投影
+    PointPosD footPointFrom(PointPosD p);  // 点在圆上的投影，使用双精度
     GeoPoint *o();   // 圆心
     GeoPoint *onc(); // 圆上一点
     DecFloat r();    // 半径
+    double rd();     // 双精度的半径
+    template <class Real>
+    Real rAs();      // 以给定精度返回半径
+    void evaluate(); // 若缓存失效则重新计算半径
+    bool refresh();  // 重新计算半径，返回圆心或半径是否改变
+    static CacheCounter& cacheStatistics(); // 半径缓存的命中统计
 private:
     GeoPoint *_o = nullptr, *_onc = nullptr;
-    DecFloat _cachedr = nandf;
+    DecFloat _cachedr = nandf;   // 双精度计算时按需由_cachedrd转换
+    double _cachedrd = NAN;
+    bool _cachedrReady = false;  // _cachedr是否已与_cachedrd一致
+    PointPosD _lasto = nanposd;  // 上次的圆心坐标
+    double _lastr = NAN;         // 上次的半径
+    inline static CacheCounter _statistics;
+    // 若缓存失效，按图元精度计算半径并缓存；DecFloat计算时同时缓存双精度结果
+    void _evaluate();
 };
 
 GeoCircle::GeoCircle() : GeoPathItem() {}
@@ -39,14 +53,63 @@ GeoPoint *GeoCircle::onc()
     return _onc ? _onc : (_onc = &nanpoint);
 }
 
-DecFloat GeoCircle::r()
+void GeoCircle::_evaluate()
 {
-    if (_masters.size() != 2) return nandf;
-    if (_updated) return _cachedr;
-    _updated = true;
+    if (not isStale())
+    {
+        _statistics.hit();
+        return;
+    }
+    _statistics.miss();
     GeoPoint *p1 = o(), *p2 = onc();
-    return _cachedr = p1 and p2 ?
-        distanceTo(p1->pos(), p2->pos()) : nandf;
+    if (_precision == Precision::Double)
+        _cachedrd = distanceTo(p1->posd(), p2->posd()), _cachedrReady = false;
+    else
+    {
+        _cachedrd = double(_cachedr = distanceTo(p1->pos(), p2->pos()));
+        _cachedrReady = true;
+    }
+    _validate();
+}
+
+void GeoCircle::evaluate()
+{
+    _evaluate();
+}
+
+DecFloat GeoCircle::r()
+{
+    _evaluate();
+    if (not _cachedrReady) _cachedr = DecFloat(_cachedrd), _cachedrReady = true;
+    return _cachedr;
+}
+
+double GeoCircle::rd()
+{
+    _evaluate();
+    return _cachedrd;
+}
+
+template <class Real>
+Real GeoCircle::rAs()
+{
+    if constexpr (std::is_same_v<Real, double>) return rd();
+    else return r();
+}
+
+bool GeoCircle::refresh()
+{
+    if (_masters.size() != 2) return false;
+    double rad = rd();
+    PointPosD p = o()->posd();
+    if (samepos(p, _lasto) and samed(rad, _lastr)) return false;
+    _lasto = p, _lastr = rad;
+    return true;
+}
+
+CacheCounter& GeoCircle::cacheStatistics()
+{
+    return _statistics;
 }
 
 PointPos GeoCircle::footPointFrom(PointPos p)
@@ -54,4 +117,9 @@ PointPos GeoCircle::footPointFrom(PointPos p)
     return footPoint(p, o()->pos(), r());
 }
 
+PointPosD GeoCircle::footPointFrom(PointPosD p)
+{
+    return footPoint(p, o()->posd(), rd());
+}
+
 #endif
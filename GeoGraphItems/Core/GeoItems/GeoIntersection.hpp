@@ -13,43 +13,96 @@ class GeoIntersection : public GeoPoint
      */
 public:
     GeoIntersection();
-    PointPos pos();  // 交点坐标
+    PointPos pos();   // 交点坐标
+    PointPosD posd(); // 双精度的交点坐标
+    void evaluate();  // 若缓存失效则重新计算交点坐标
+    static CacheCounter& cacheStatistics(); // 交点坐标缓存的命中统计
 private:
     enum {InterUndefined,
         InterLL, InterLC, InterCC} _mode = InterUndefined;  // 交点模式
     GeoSegment *s[2]; // 线段图元数组，存储_masters中的线段图元（如有）
     GeoCircle *c[2];  // 圆图元，同上
     GeoVariable<int> *i;  // 交点编号，仅有圆时使用
-    PointPos _cachedPos = nanpos;
+    PointPos _cachedPos = nanpos;    // 双精度计算时按需由_cachedPosd转换
+    PointPosD _cachedPosd = nanposd;
+    bool _cachedPosReady = false;    // _cachedPos是否已与_cachedPosd一致
+    inline static CacheCounter _statistics;
     // 检查_masters[i]的类型并存入c或s中
     // 返回值中第一个表示是否成功，第二个表示是否为线段
     std::pair<bool, bool> _checkMode(int i);
     // 检查_masters的类型并存入c或s中，并设置交点编号（如需），返回是否成功
     bool _checkMode();
+    // 若缓存失效，按图元精度计算交点坐标并缓存；DecFloat计算时同时缓存双精度结果
+    void _evaluate();
+    template <class Real>
+    BasicPointPos<Real> _pos(); // 以给定精度计算交点坐标
 };
 
-GeoIntersection::GeoIntersection() : GeoPoint(nanfunc, nanfunc) {}
+GeoIntersection::GeoIntersection() : GeoPoint() {}
 
-PointPos GeoIntersection::pos()
+template <class Real>
+BasicPointPos<Real> GeoIntersection::_pos()
 {
-    if (_mode == InterUndefined and not _checkMode()) return nanpos;
-    if (_updated) return _cachedPos;
-    _updated = true;
     if (_mode == InterLL)
-        return _cachedPos = intersec(s[0]->abc(), s[1]->abc());
+        return intersec(s[0]->abcAs<Real>(), s[1]->abcAs<Real>());
     else if (_mode == InterLC)
     {
         auto [p1, p2] = intersec(
-            s[0]->abc(), c[1]->o()->pos(), c[1]->r(),
-            s[0]->point1()->pos(), s[0]->point2()->pos());
-        return _cachedPos = i->get() == 1 ? p1 : p2;
+            s[0]->abcAs<Real>(), c[1]->o()->posAs<Real>(), c[1]->rAs<Real>(),
+            s[0]->point1()->posAs<Real>(), s[0]->point2()->posAs<Real>());
+        return i->get() == 1 ? p1 : p2;
     } else
     {
         auto [p1, p2] = intersec(
-            c[0]->o()->pos(), c[0]->r(), c[1]->o()->pos(), c[1]->r());
-        return _cachedPos = i->get() == 1 ? p1 : p2;
+            c[0]->o()->posAs<Real>(), c[0]->rAs<Real>(),
+            c[1]->o()->posAs<Real>(), c[1]->rAs<Real>());
+        return i->get() == 1 ? p1 : p2;
+    }
+}
+
+void GeoIntersection::_evaluate()
+{
+    if (not isStale())
+    {
+        _statistics.hit();
+        return;
     }
-    return nanpos;
+    _statistics.miss();
+    // 父图元不足时同样缓存NaN，添加父图元时缓存会失效
+    if (_mode == InterUndefined and not _checkMode())
+        _cachedPosd = nanposd, _cachedPosReady = false;
+    else if (_precision == Precision::Double)
+        _cachedPosd = _pos<double>(), _cachedPosReady = false;
+    else
+    {
+        _cachedPosd = poscv<double>(_cachedPos = _pos<DecFloat>());
+        _cachedPosReady = true;
+    }
+    _validate();
+}
+
+void GeoIntersection::evaluate()
+{
+    _evaluate();
+}
+
+PointPos GeoIntersection::pos()
+{
+    _evaluate();
+    if (not _cachedPosReady)
+        _cachedPos = poscv<DecFloat>(_cachedPosd), _cachedPosReady = true;
+    return _cachedPos;
+}
+
+PointPosD GeoIntersection::posd()
+{
+    _evaluate();
+    return _cachedPosd;
+}
+
+CacheCounter& GeoIntersection::cacheStatistics()
+{
+    return _statistics;
 }
 
 std::pair<bool, bool> GeoIntersection::_checkMode(int i)
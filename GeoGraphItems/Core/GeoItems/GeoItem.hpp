@@ -3,14 +3,48 @@
 #ifndef GeoItem_HPP
 #define GeoItem_HPP
 
+#include <atomic>
 #include <vector>
 #include <unordered_set>
 
+#include "GeoBasic.hpp"
+
 class GeoItem;
 
 using ItemVec = std::vector<GeoItem *>;
 using ItemSet = std::unordered_set<GeoItem *>;
 
+struct CacheStatistics
+{
+    /* 某类图元的缓存命中统计。
+     */
+    unsigned long long hits = 0;    // 命中次数
+    unsigned long long misses = 0;  // 未命中（重新计算）次数
+};
+
+class CacheCounter
+{
+    /* 缓存命中计数器。各线程在各自的槽中计数，读取时汇总，
+     * 避免多线程计算时争用同一缓存行。
+     */
+public:
+    static const int maxThreads = 64;  // 最多支持的线程数
+    void hit();     // 记录一次命中
+    void miss();    // 记录一次未命中
+    CacheStatistics total();  // 所有线程的汇总
+    void reset();   // 清零，不应在计算时调用
+    // 设置当前线程使用的槽，由线程池在工作线程启动时调用，主线程为0
+    static void setThreadIndex(int index);
+private:
+    struct alignas(64) Slot
+    {
+        // 每个槽只由一个线程写入，故可使用relaxed的读写而非原子加法
+        std::atomic<unsigned long long> hits{0}, misses{0};
+    };
+    Slot _slots[maxThreads];
+    inline static thread_local int _threadIndex = 0;
+};
+
 class GeoItem
 {
     /* 所有图元类的基类。
@@ -21,17 +55,34 @@ public:
     void addMaster(GeoItem& master);  // 添加父图元，并将自身添加为父图元的子图元
     void addChild(GeoItem& child);    // 添加子图元，而不将自身添加为子图元的父图元
     void removeChild(GeoItem& child); // 删除子图元
-    void update();      // 递归更新图元
-    ItemVec masters();  // 返回父图元
-    ItemSet children(); // 返回子图元
+    void update();      // 更新图元，即invalidate()
+    // 使本图元及所有依赖于它的图元的缓存失效
+    // 已失效的图元的子图元必然也已失效，故遇到已失效的图元即停止
+    void invalidate();
+    bool isStale();     // 缓存是否已失效
+    virtual void evaluate();  // 若缓存失效则重新计算，不影响refresh()的返回值
+    virtual bool refresh(); // 重新计算图元，返回坐标或定义状态是否改变
+    int handle();       // 图元在图元管理器中的编号，未登记时为-1
+    void setHandle(int handle);  // 设置图元编号，由图元管理器调用
+    Precision precision();       // 图元计算使用的精度
+    void setPrecision(Precision precision); // 设置精度，由图元管理器调用
+    const ItemVec& masters();    // 返回父图元
+    const ItemSet& children();   // 返回子图元
+    // 图结构的版本号，每次添加或删除父子关系时递增
+    static unsigned long long graphGeneration();
 protected:
     ItemVec _masters;
     ItemSet _children;
-    bool _updated = false; // 是否已是最新
+    unsigned long long _generation = 1;       // 版本号，每次失效时递增
+    unsigned long long _cachedGeneration = 0; // 缓存对应的版本号
+    void _validate();   // 标记缓存为最新，由子类在重新计算后调用
+    int _handle = -1;      // 图元编号
+    Precision _precision = Precision::DecFloat;  // 计算精度
+    inline static unsigned long long _graphGeneration = 0;
 private:
     // 重新初始化，并将所有子图元重新初始化
-    // top表示是否为顶层调用
-    void reinitialize(bool top = true);
+    // 子图元同时从其它父图元中移除自身，使其不存留野指针
+    void reinitialize();
 };
 
 class GeoPathItem : public GeoItem
@@ -39,8 +90,44 @@ class GeoPathItem : public GeoItem
 public:
     GeoPathItem();
     virtual PointPos footPointFrom(PointPos p) = 0;
+    virtual PointPosD footPointFrom(PointPosD p) = 0;
 };
 
+void CacheCounter::hit()
+{
+    auto& hits = _slots[_threadIndex].hits;
+    hits.store(hits.load(std::memory_order_relaxed) + 1,
+        std::memory_order_relaxed);
+}
+
+void CacheCounter::miss()
+{
+    auto& misses = _slots[_threadIndex].misses;
+    misses.store(misses.load(std::memory_order_relaxed) + 1,
+        std::memory_order_relaxed);
+}
+
+CacheStatistics CacheCounter::total()
+{
+    CacheStatistics s;
+    for (auto& slot : _slots)
+    {
+        s.hits += slot.hits.load(std::memory_order_relaxed);
+        s.misses += slot.misses.load(std::memory_order_relaxed);
+    }
+    return s;
+}
+
+void CacheCounter::reset()
+{
+    for (auto& slot : _slots) slot.hits = 0, slot.misses = 0;
+}
+
+void CacheCounter::setThreadIndex(int index)
+{
+    _threadIndex = index;
+}
+
 GeoItem::GeoItem()
 {
     _masters.clear();
@@ -56,41 +143,117 @@ void GeoItem::addMaster(GeoItem& master)
 {
     _masters.push_back(&master);
     master.addChild(*this);
+    invalidate();
 }
 
 void GeoItem::addChild(GeoItem& child)
 {
     if (_children.find(&child) == _children.end())
+    {
         _children.insert(&child);
+        ++_graphGeneration;
+    }
 }
 
 void GeoItem::removeChild(GeoItem& child)
 {
     auto ch = _children.find(&child);
-    if (ch != _children.end()) _children.erase(ch);
+    if (ch != _children.end())
+    {
+        _children.erase(ch);
+        ++_graphGeneration;
+    }
+}
+
+int GeoItem::handle()
+{
+    return _handle;
 }
 
-ItemVec GeoItem::masters()   // No Python
+void GeoItem::setHandle(int handle)  // No Python
+{
+    _handle = handle;
+}
+
+Precision GeoItem::precision()
+{
+    return _precision;
+}
+
+void GeoItem::setPrecision(Precision precision)  // No Python
+{
+    _precision = precision;
+    invalidate();
+}
+
+const ItemVec& GeoItem::masters()   // No Python
 {
     return _masters;
 }
 
-ItemSet GeoItem::children()  // No Python
+const ItemSet& GeoItem::children()  // No Python
 {
     return _children;
 }
 
-void GeoItem::reinitialize(bool top)
+unsigned long long GeoItem::graphGeneration()  // No Python
 {
-    for (auto& i : _children) i->reinitialize(false);
-    if (top) for (auto& i : _masters) i->removeChild(*this);
+    return _graphGeneration;
+}
+
+void GeoItem::reinitialize()
+{
+    // 先取出子图元集合，子图元从本图元中移除自身时不影响遍历
+    ItemSet children;
+    children.swap(_children);
+    for (auto& i : children) i->reinitialize();
+    for (auto& i : _masters) i->removeChild(*this);
     _masters.clear();
-    _children.clear();
+    ++_graphGeneration;
+    ++_generation;
 }
 
 void GeoItem::update()
 {
-    _updated = false;
+    invalidate();
+}
+
+void GeoItem::invalidate()
+{
+    if (isStale()) return;
+    // 非递归的遍历，避免过深的依赖链导致栈溢出
+    ItemVec stack = {this};
+    ++_generation;
+    while (not stack.empty())
+    {
+        GeoItem *item = stack.back();
+        stack.pop_back();
+        for (auto& child : item->_children)
+            if (not child->isStale())
+            {
+                ++child->_generation;
+                stack.push_back(child);
+            }
+    }
+}
+
+bool GeoItem::isStale()
+{
+    return _cachedGeneration != _generation;
+}
+
+void GeoItem::_validate()
+{
+    _cachedGeneration = _generation;
+}
+
+void GeoItem::evaluate()
+{
+}
+
+bool GeoItem::refresh()
+{
+    return false;
 }
 
 GeoPathItem::GeoPathItem() : GeoItem() {}
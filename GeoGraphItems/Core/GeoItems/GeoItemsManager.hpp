@@ -3,32 +3,453 @@
 #ifndef GeoItemsManager_HPP
 #define GeoItemsManager_HPP
 
+#include <algorithm>
+#include <map>
+
+#include "GeoBasic.hpp"
 #include "GeoItem.hpp"
+#include "GeoItemsStore.hpp"
+#include "GeoThreadPool.hpp"
+#include "GeoSpatialIndex.hpp"
+#include "GeoBatch.hpp"
+
+struct UpdateOrder
+{
+    /* 受给定图元影响的图元的更新顺序。图元按拓扑层次排列，同一层的图元互不依赖，
+     * 第i层为items[levelOffsets[i]]至items[levelOffsets[i + 1] - 1]。
+     */
+    ItemVec sources;                // 不依赖其它受影响图元的给定图元，最先计算
+    ItemVec items;                  // 按层次排列的图元
+    std::vector<int> levelOffsets;  // 各层在items中的起点，末尾为items.size()
+    ItemVec outerMasters;  // 受影响图元的未受影响的父图元，并行计算前须先计算
+};
 
 class GeoItemsManager
 {
+    /* 图元管理类。管理图元的编号与连续存储，并负责从给定图元开始重新计算依赖图。
+     */
 public:
     GeoItemsManager();
-    void addItem(GeoItem& item);        // 添加图元
-    void removeItem(GeoItem& item);     // 删除图元
+    int addItem(GeoItem& item);        // 添加图元，返回图元编号
+    void removeItem(GeoItem& item);    // 删除图元
+    // 重新计算给定图元及受其影响的所有图元，返回坐标或定义状态改变了的图元编号
+    // 给定图元本身不会出现在返回值中
+    std::vector<int> recompute(const ItemVec& items);
+    bp::list recomputePy(bp::object items);  // recompute的Python封装
+    Precision precision();  // 所管理图元的计算精度
+    void setPrecision(Precision precision);  // 设置所有图元的计算精度
+    GeoItemsStore& store();  // 图元的连续存储
+    bp::dict memoryUsage();  // 内存占用统计
+    // 以只读memoryview无复制地导出连续存储，返回字典，见Core.cpp中的说明
+    bp::dict snapshot();
+    unsigned long long storeVersion();  // 连续存储的版本号
+    int threadCount();  // 重新计算使用的线程数
+    // 设置重新计算使用的线程数，0表示使用硬件支持的线程数
+    void setThreadCount(int count);
+    // 一层的图元数不少于此值时才并行计算，否则线程同步的开销大于收益
+    static const int parallelThreshold = 256;
+    // 空间查询，均只涉及点（含交点）、线段与圆，未定义的图元不参与
+    // 到(x, y)最近的k个图元，返回图元编号与距离，按距离由近到远排列
+    std::vector<IndexHit> nearest(double x, double y, int k);
+    // 到(x, y)的距离不超过radius的所有图元，返回值同上
+    std::vector<IndexHit> within(double x, double y, double radius);
+    // 与矩形相交的所有图元的编号，按编号排列
+    std::vector<int> inRect(double left, double top, double right, double bottom);
+    bp::list nearestPy(bp::object p, int k);          // nearest的Python封装
+    bp::list withinPy(bp::object p, double radius);   // within的Python封装
+    bp::list inRectPy(bp::object rect);               // inRect的Python封装
+    // 将已移动的图元的当前位置写入存储，下次空间查询前更新其在空间索引中的位置
+    // 图元移动后要到下次重新计算时才写入存储，期间的空间查询须先调用此函数
+    void updateIndex(GeoItem& item);
+    double indexCellSize();  // 空间索引的网格大小
+    void setIndexCellSize(double cellSize);  // 设置空间索引的网格大小
 private:
-    ItemSet _items;
+    GeoItemsStore _store;
+    Precision _precision = Precision::DecFloat;  // 新添加图元的计算精度
+    // 缓存的更新顺序，键为排序后的顶层图元
+    std::map<ItemVec, UpdateOrder> _orders;
+    unsigned long long _ordersGeneration = 0; // 缓存对应的图结构版本号
+    GeoThreadPool _pool;
+    std::vector<char> _changed;  // 重新计算时各图元是否改变，按更新顺序排列
+    // _updateOrder()复用的标记数组，调用之间全为初始值
+    std::vector<char> _visited;
+    std::vector<int> _levels;
+    GeoSpatialIndex _index;
+    // 空间索引在查询前才更新：图结构或精度变化后全部重建，否则只更新重新计算过的图元
+    std::vector<int> _indexDirty;       // 待更新的图元编号
+    std::vector<char> _indexPending;    // 图元编号是否已在_indexDirty中
+    unsigned long long _indexSyncCount = 0;  // 空间索引对应的存储重建次数
+    bool _indexStale = true;            // 是否需要全部重建
+    void _markIndexDirty(int handle);   // 登记待更新的图元
+    void _syncIndex();                  // 使空间索引与存储一致
+    IndexShape _indexShape(int handle); // 图元当前的几何形状
+    // 计算受给定图元影响的所有图元的更新顺序，不含给定图元本身
+    const UpdateOrder& _updateOrder(ItemVec items);
 };
 
-GeoItemsManager::GeoItemsManager()
-{
-    _items.clear();
-}
+GeoItemsManager::GeoItemsManager() {}
 
-void GeoItemsManager::addItem(GeoItem& item)
+int GeoItemsManager::addItem(GeoItem& item)
 {
-    _items.insert(&item);
+    if (item.precision() != _precision) item.setPrecision(_precision);
+    _orders.clear();
+    return _store.add(item);
 }
 
 void GeoItemsManager::removeItem(GeoItem& item)
 {
-    if (_items.find(&item) != _items.end()) _items.erase(&item);
+    if (_store.contains(item))
+    {
+        _store.remove(item);
+        _orders.clear();
+    }
     for (auto& i : item.children()) removeItem(*i);
 }
 
+Precision GeoItemsManager::precision()
+{
+    return _precision;
+}
+
+void GeoItemsManager::setPrecision(Precision precision)
+{
+    _precision = precision;
+    for (int h = 0, n = _store.handleCount(); h < n; ++h)
+        if (GeoItem *item = _store.item(h))
+        {
+            item->setPrecision(precision);
+            _store.write(*item);
+        }
+    _indexStale = true;
+}
+
+GeoItemsStore& GeoItemsManager::store()  // No Python
+{
+    return _store;
+}
+
+bp::dict GeoItemsManager::memoryUsage()
+{
+    bp::dict usage;
+    size_t storeBytes = _store.storeMemoryUsage(),
+        objectBytes = _store.objectMemoryUsage();
+    int n = _store.size();
+    usage["items"] = n;
+    usage["storeBytes"] = storeBytes;
+    usage["objectBytes"] = objectBytes;
+    usage["bytesPerItem"] = n ? double(storeBytes + objectBytes) / n : 0.;
+    return usage;
+}
+
+bp::dict GeoItemsManager::snapshot()
+{
+    _store.sync();
+    bp::dict views;
+    // 导出的memoryview共享底层数组，此后添加或删除图元时存储会先复制数组
+    GeoItemsTable &points = _store.points(), &segments = _store.segments(),
+        &circles = _store.circles();
+    views["points"] = exportArray(points.values().share(), 2, "d");
+    views["segments"] = exportArray(segments.values().share(), 3, "d");
+    views["circles"] = exportArray(circles.values().share(), 3, "d");
+    views["pointHandles"] = exportArray(points.handles().share(), 1, "i");
+    views["segmentHandles"] = exportArray(segments.handles().share(), 1, "i");
+    views["circleHandles"] = exportArray(circles.handles().share(), 1, "i");
+    views["rows"] = exportArray(_store.rows().share(), 1, "i");
+    views["version"] = _store.version();
+    return views;
+}
+
+unsigned long long GeoItemsManager::storeVersion()
+{
+    return _store.version();
+}
+
+int GeoItemsManager::threadCount()
+{
+    return _pool.threadCount();
+}
+
+void GeoItemsManager::setThreadCount(int count)
+{
+    _pool.setThreadCount(count);
+}
+
+const UpdateOrder& GeoItemsManager::_updateOrder(ItemVec items)
+{
+    if (_ordersGeneration != GeoItem::graphGeneration() or _orders.size() > 64)
+    {
+        _orders.clear();
+        _ordersGeneration = GeoItem::graphGeneration();
+    }
+    std::sort(items.begin(), items.end());
+    items.erase(std::unique(items.begin(), items.end()), items.end());
+    auto found = _orders.find(items);
+    if (found != _orders.end()) return found->second;
+    // 在CSR形式的子图元上非递归地深度优先遍历，后序的逆序即为拓扑顺序
+    // 未登记的图元不参与遍历，其缓存仍会因失效而在读取时重新计算
+    const std::vector<int>& offsets = _store.childOffsets();
+    const std::vector<int>& children = _store.childHandles();
+    // 遍历用的标记数组在多次调用间复用，用后只重置访问过的图元，
+    // 使更新顺序的计算量只与受影响的图元数有关，而与图元总数无关
+    int handleCount = _store.handleCount();
+    if ((int)_visited.size() < handleCount)
+        _visited.resize(handleCount, 0), _levels.resize(handleCount, -1);
+    std::vector<char>& visited = _visited;
+    std::vector<int>& level = _levels;  // 图元的层次，未受影响的图元为-1
+    std::vector<int> postorder;
+    std::vector<std::pair<int, int>> stack;  // 编号，下一个子图元在children中的位置
+    for (auto& item : items)
+    {
+        if (not _store.contains(*item)) continue;
+        int handle = item->handle();
+        level[handle] = 0;
+        if (visited[handle]) continue;
+        visited[handle] = 1;
+        stack.emplace_back(handle, offsets[handle]);
+        while (not stack.empty())
+        {
+            auto& [master, next] = stack.back();
+            if (next == offsets[master + 1])
+            {
+                postorder.push_back(master);
+                stack.pop_back();
+                continue;
+            }
+            int child = children[next++];
+            if (not visited[child])
+            {
+                visited[child] = 1;
+                stack.emplace_back(child, offsets[child]);
+            }
+        }
+    }
+    // 按拓扑顺序计算层次：不依赖其它受影响图元的给定图元为第0层，
+    // 其余图元的层次为受影响的父图元的最大层次加1，再按层次计数排序；
+    // 同层内保持拓扑顺序，故结果与线程数无关
+    // 给定图元也可能是另一给定图元的子孙，如同时移动的自由点与其所在路径上的点，
+    // 此时它不在第0层，而与其它子孙图元一样在父图元之后计算
+    const std::vector<int>& masterOffsets = _store.masterOffsets();
+    const std::vector<int>& masters = _store.masterHandles();
+    int levelCount = 1;
+    for (auto i = postorder.rbegin(); i != postorder.rend(); ++i)
+    {
+        int handle = *i;
+        int l = -1;
+        for (int j = masterOffsets[handle]; j < masterOffsets[handle + 1]; ++j)
+            l = std::max(l, level[masters[j]]);
+        if (l < 0) continue;  // 不依赖其它受影响图元的给定图元
+        level[handle] = l + 1;
+        levelCount = std::max(levelCount, l + 2);
+    }
+    UpdateOrder order;
+    for (auto& item : items)
+        if (not _store.contains(*item) or level[item->handle()] == 0)
+            order.sources.push_back(item);
+    order.levelOffsets.assign(levelCount + 1, 0);
+    for (auto& handle : postorder)
+        if (level[handle]) ++order.levelOffsets[level[handle]];
+    for (int l = 0, offset = 0; l <= levelCount; ++l)
+    {
+        int count = order.levelOffsets[l];
+        order.levelOffsets[l] = offset, offset += count;
+    }
+    order.items.resize(order.levelOffsets[levelCount]);
+    std::vector<int> next(order.levelOffsets.begin(), order.levelOffsets.end() - 1);
+    for (auto i = postorder.rbegin(); i != postorder.rend(); ++i)
+        if (level[*i]) order.items[next[level[*i]]++] = _store.item(*i);
+    // 未登记或未受影响的父图元可能也已失效，并行计算时不能由多个线程同时计算
+    ItemSet outer;
+    for (auto& item : order.items)
+        for (auto& master : item->masters())
+            if (not _store.contains(*master) or level[master->handle()] < 0)
+                if (outer.insert(master).second)
+                    order.outerMasters.push_back(master);
+    for (auto& handle : postorder) visited[handle] = 0, level[handle] = -1;
+    return _orders[items] = std::move(order);
+}
+
+std::vector<int> GeoItemsManager::recompute(const ItemVec& items)
+{
+    const UpdateOrder& order = _updateOrder(items);
+    // 先使给定图元及其所有子孙图元的缓存失效，再逐层重新计算
+    for (auto& item : items) item->invalidate();
+    for (auto& item : order.sources)
+        if (item->refresh() and _store.contains(*item))
+        {
+            _store.write(*item);
+            _markIndexDirty(item->handle());
+        }
+    const ItemVec& updated = order.items;
+    _changed.assign(updated.size(), 0);
+    auto refreshRange = [&](int begin, int end) {
+        for (int i = begin; i < end; ++i)
+            if (updated[i]->refresh())
+            {
+                _store.write(*updated[i]);
+                _changed[i] = 1;
+            }
+    };
+    bool parallel = _pool.threadCount() > 1;
+    if (parallel)
+        for (auto& master : order.outerMasters) master->evaluate();
+    for (int l = 0, n = order.levelOffsets.size() - 1; l < n; ++l)
+    {
+        int begin = order.levelOffsets[l], size = order.levelOffsets[l + 1] - begin;
+        if (parallel and size >= parallelThreshold)
+            _pool.parallelFor(size, [&](int b, int e) {
+                refreshRange(begin + b, begin + e);});
+        else refreshRange(begin, begin + size);
+    }
+    std::vector<int> changed;
+    for (int i = 0, n = updated.size(); i < n; ++i)
+        if (_changed[i])
+        {
+            changed.push_back(updated[i]->handle());
+            _markIndexDirty(updated[i]->handle());
+        }
+    return changed;
+}
+
+bp::list GeoItemsManager::recomputePy(bp::object items)
+{
+    ItemVec tops;
+    for (long i = 0, n = bp::len(items); i < n; ++i)
+        tops.push_back(&bp::extract<GeoItem&>(items[i])());
+    std::vector<int> handles;
+    {
+        GILRelease release;
+        handles = recompute(tops);
+    }
+    bp::list changed;
+    for (auto& handle : handles) changed.append(handle);
+    return changed;
+}
+
+void GeoItemsManager::_markIndexDirty(int handle)
+{
+    if (_indexStale) return;
+    if (handle >= (int)_indexPending.size()) _indexPending.resize(handle + 1, 0);
+    if (_indexPending[handle]) return;
+    _indexPending[handle] = 1;
+    _indexDirty.push_back(handle);
+}
+
+IndexShape GeoItemsManager::_indexShape(int handle)
+{
+    IndexShape shape;
+    GeoItem *item = _store.item(handle);
+    if (not item) return shape;
+    shape.kind = _store.kind(handle);
+    switch (shape.kind)
+    {
+    case ItemKind::Point: case ItemKind::Intersection:
+    {
+        shape.kind = ItemKind::Point;
+        const double *row = _store.points().row(_store.row(handle));
+        shape.g[0] = row[0], shape.g[1] = row[1];
+        break;
+    }
+    case ItemKind::Segment:
+    {
+        GeoSegment& segment = static_cast<GeoSegment&>(*item);
+        if (segment.masters().size() != 2) break;
+        auto [x1, y1] = segment.point1()->posd();
+        auto [x2, y2] = segment.point2()->posd();
+        shape.g[0] = x1, shape.g[1] = y1, shape.g[2] = x2, shape.g[3] = y2;
+        break;
+    }
+    case ItemKind::Circle:
+        std::copy_n(_store.circles().row(_store.row(handle)), 3, shape.g);
+        break;
+    default: break;
+    }
+    return shape;
+}
+
+void GeoItemsManager::updateIndex(GeoItem& item)
+{
+    if (not _store.contains(item)) return;
+    _store.write(item);
+    _markIndexDirty(item.handle());
+}
+
+void GeoItemsManager::_syncIndex()
+{
+    _store.sync();
+    if (_indexStale or _indexSyncCount != _store.syncCount())
+    {
+        _index.clear();
+        for (int h = 0, n = _store.handleCount(); h < n; ++h)
+            if (_store.item(h)) _index.update(h, _indexShape(h));
+        _indexStale = false;
+        _indexSyncCount = _store.syncCount();
+    }
+    else
+        for (auto& handle : _indexDirty)
+            if (_store.item(handle)) _index.update(handle, _indexShape(handle));
+            else _index.remove(handle);
+    for (auto& handle : _indexDirty) _indexPending[handle] = 0;
+    _indexDirty.clear();
+}
+
+std::vector<IndexHit> GeoItemsManager::nearest(double x, double y, int k)
+{
+    _syncIndex();
+    return _index.nearest(x, y, k);
+}
+
+std::vector<IndexHit> GeoItemsManager::within(double x, double y, double radius)
+{
+    _syncIndex();
+    return _index.within(x, y, radius);
+}
+
+std::vector<int> GeoItemsManager::inRect(
+    double left, double top, double right, double bottom)
+{
+    _syncIndex();
+    return _index.inRect(left, top, right, bottom);
+}
+
+// 将查询结果转换为(图元编号, 距离)元组的列表
+bp::list indexHitsPy(const std::vector<IndexHit>& hits)
+{
+    bp::list result;
+    for (auto& [handle, distance] : hits)
+        result.append(bp::make_tuple(handle, distance));
+    return result;
+}
+
+bp::list GeoItemsManager::nearestPy(bp::object p, int k)
+{
+    double x = bp::extract<double>(p[0]), y = bp::extract<double>(p[1]);
+    return indexHitsPy(nearest(x, y, k));
+}
+
+bp::list GeoItemsManager::withinPy(bp::object p, double radius)
+{
+    double x = bp::extract<double>(p[0]), y = bp::extract<double>(p[1]);
+    return indexHitsPy(within(x, y, radius));
+}
+
+bp::list GeoItemsManager::inRectPy(bp::object rect)
+{
+    bp::list result;
+    for (auto& handle : inRect(
+            bp::extract<double>(rect[0]), bp::extract<double>(rect[1]),
+            bp::extract<double>(rect[2]), bp::extract<double>(rect[3])))
+        result.append(handle);
+    return result;
+}
+
+double GeoItemsManager::indexCellSize()
+{
+    return _index.cellSize();
+}
+
+void GeoItemsManager::setIndexCellSize(double cellSize)
+{
+    if (cellSize > 0) _index.setCellSize(cellSize);
+}
+
 #endif
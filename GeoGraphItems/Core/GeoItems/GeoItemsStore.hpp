@@ -0,0 +1,376 @@
+/* GeoItemsStore - 图元的连续存储
+ */
+#ifndef GeoItemsStore_HPP
+#define GeoItemsStore_HPP
+
+#include "GeoBasic.hpp"
+#include "GeoBuffer.hpp"
+#include "GeoIntersection.hpp"
+#include "GeoVariable.hpp"
+
+enum class ItemKind {Other, Point, Intersection, Segment, Circle, Variable};
+
+class GeoItemsTable
+{
+    /* 同一种类图元的计算结果表，每行width个双精度数，行与行之间紧密排列。
+     * 删除图元时以最后一行填补空缺，故行号不稳定，应通过图元编号查找。
+     * 各数组可无复制地导出，导出期间添加或删除行时先复制，见SharedArray。
+     */
+public:
+    GeoItemsTable(int width);
+    int add(int handle);     // 添加一行，返回行号，值为NaN
+    int remove(int row);     // 删除一行，返回被移至该行的图元编号，无则为-1
+    double *row(int row);    // 第row行的首地址
+    SharedArray<int>& handles();      // 行号到图元编号的映射
+    SharedArray<double>& values();    // 所有行的值
+    int width();
+    size_t memoryUsage();    // 占用的字节数
+private:
+    int _width;
+    SharedArray<int> _handles;
+    SharedArray<double> _values;
+};
+
+class GeoItemsStore
+{
+    /* 图元的连续存储。以稳定的整数编号索引图元，编号从不重复使用；
+     * 点、线段、圆的计算结果分别存放在连续的双精度数组中；
+     * 父子关系以CSR（压缩稀疏行）形式存放，图结构变化后按需重建。
+     * 图元对象仍负责计算，本类是其计算结果与依赖关系的紧凑镜像。
+     */
+public:
+    GeoItemsStore();
+    int add(GeoItem& item);      // 登记图元，返回图元编号，计算结果在sync()时写入
+    void remove(GeoItem& item);  // 取消登记图元
+    bool contains(GeoItem& item);  // 图元是否已登记
+    GeoItem *item(int handle);   // 编号对应的图元，未登记时为nullptr
+    int size();                  // 已登记的图元数
+    int handleCount();           // 已分配的编号数，即最大编号加1
+    ItemKind kind(int handle);   // 编号对应的图元种类
+    int row(int handle);         // 图元在其种类的结果表中的行号，无则为-1
+    void write(GeoItem& item);   // 将图元当前的计算结果写入结果表
+    GeoItemsTable& points();     // 点与交点的坐标表，每行x, y
+    GeoItemsTable& segments();   // 线段的直线参数表，每行a, b, c
+    GeoItemsTable& circles();    // 圆的表，每行圆心x, y与半径r
+    // CSR形式的子图元：编号h的子图元编号为
+    //   childHandles()[childOffsets()[h]]至childHandles()[childOffsets()[h + 1] - 1]
+    const std::vector<int>& childOffsets();
+    const std::vector<int>& childHandles();
+    // CSR形式的父图元，同上，按添加父图元的顺序排列
+    const std::vector<int>& masterOffsets();
+    const std::vector<int>& masterHandles();
+    // 若登记的图元或图结构有变化，重建CSR并重写所有计算结果，否则什么都不做
+    // 图结构变化时图元未必被重新计算，故须重写，以保证结果表与图元一致
+    void sync();
+    // sync()实际重建的次数，可用于判断依赖于本存储的结构是否需要重建
+    unsigned long long syncCount();
+    // 存储的版本号，每次登记或取消登记图元时递增
+    // 版本号不变时，各数组的地址与长度不变，值则随重新计算原地更新；
+    // 版本号改变时，仍被导出的数组已被复制，导出的缓冲区保持原来的内容
+    unsigned long long version();
+    SharedArray<int>& rows();    // 编号到结果表行号的映射
+    size_t storeMemoryUsage();   // 本存储占用的字节数
+    size_t objectMemoryUsage();  // 已登记图元对象占用的字节数（估计值）
+private:
+    std::vector<GeoItem *> _items;  // 编号到图元的映射
+    std::vector<ItemKind> _kinds;   // 编号到图元种类的映射
+    SharedArray<int> _rows;         // 编号到结果表行号的映射
+    int _size = 0;
+    unsigned long long _version = 0;
+    GeoItemsTable _points, _segments, _circles;
+    std::vector<int> _childOffsets, _childHandles, _masterOffsets, _masterHandles;
+    bool _adjacencyDirty = true;  // 登记的图元变化后需调用sync()
+    unsigned long long _adjacencyGeneration = 0; // 上次sync()时的图结构版本号
+    unsigned long long _syncCount = 0;
+    GeoItemsTable *_table(ItemKind kind);  // 种类对应的结果表，无则为nullptr
+};
+
+GeoItemsTable::GeoItemsTable(int width) : _width(width) {}
+
+int GeoItemsTable::add(int handle)
+{
+    std::vector<int>& handles = _handles.detach();
+    std::vector<double>& values = _values.detach();
+    handles.push_back(handle);
+    values.resize(values.size() + _width, NAN);
+    return handles.size() - 1;
+}
+
+int GeoItemsTable::remove(int row)
+{
+    std::vector<int>& handles = _handles.detach();
+    std::vector<double>& values = _values.detach();
+    int last = handles.size() - 1, moved = -1;
+    if (row != last)
+    {
+        moved = handles[row] = handles[last];
+        std::copy_n(&values[last * _width], _width, &values[row * _width]);
+    }
+    handles.pop_back();
+    values.resize(values.size() - _width);
+    return moved;
+}
+
+double *GeoItemsTable::row(int row)
+{
+    return _values.data() + row * _width;
+}
+
+SharedArray<int>& GeoItemsTable::handles()
+{
+    return _handles;
+}
+
+SharedArray<double>& GeoItemsTable::values()
+{
+    return _values;
+}
+
+int GeoItemsTable::width()
+{
+    return _width;
+}
+
+size_t GeoItemsTable::memoryUsage()
+{
+    return _handles.get().capacity() * sizeof(int)
+        + _values.get().capacity() * sizeof(double);
+}
+
+GeoItemsStore::GeoItemsStore() : _points(2), _segments(3), _circles(3) {}
+
+int GeoItemsStore::add(GeoItem& item)
+{
+    if (contains(item)) return item.handle();
+    if (item.handle() < 0) item.setHandle(_items.size());
+    int handle = item.handle();
+    if (handle >= (int)_items.size())
+    {
+        _items.resize(handle + 1, nullptr);
+        _kinds.resize(handle + 1, ItemKind::Other);
+        _rows.detach().resize(handle + 1, -1);
+    }
+    ItemKind kind = ItemKind::Other;
+    if (dynamic_cast<GeoIntersection *>(&item)) kind = ItemKind::Intersection;
+    else if (dynamic_cast<GeoPoint *>(&item)) kind = ItemKind::Point;
+    else if (dynamic_cast<GeoSegment *>(&item)) kind = ItemKind::Segment;
+    else if (dynamic_cast<GeoCircle *>(&item)) kind = ItemKind::Circle;
+    else if (dynamic_cast<GeoVariable<int> *>(&item)) kind = ItemKind::Variable;
+    _items[handle] = &item, _kinds[handle] = kind, ++_size;
+    GeoItemsTable *table = _table(kind);
+    _rows.detach()[handle] = table ? table->add(handle) : -1;
+    _adjacencyDirty = true;
+    ++_version;
+    return handle;
+}
+
+void GeoItemsStore::remove(GeoItem& item)
+{
+    if (not contains(item)) return;
+    int handle = item.handle();
+    std::vector<int>& rows = _rows.detach();
+    GeoItemsTable *table = _table(_kinds[handle]);
+    if (table)
+    {
+        int moved = table->remove(rows[handle]);
+        if (moved >= 0) rows[moved] = rows[handle];
+    }
+    _items[handle] = nullptr, rows[handle] = -1, --_size;
+    _adjacencyDirty = true;
+    ++_version;
+}
+
+bool GeoItemsStore::contains(GeoItem& item)
+{
+    int handle = item.handle();
+    return handle >= 0 and handle < (int)_items.size()
+        and _items[handle] == &item;
+}
+
+GeoItem *GeoItemsStore::item(int handle)
+{
+    return handle >= 0 and handle < (int)_items.size() ? _items[handle] : nullptr;
+}
+
+int GeoItemsStore::size()
+{
+    return _size;
+}
+
+int GeoItemsStore::handleCount()
+{
+    return _items.size();
+}
+
+ItemKind GeoItemsStore::kind(int handle)
+{
+    return _kinds[handle];
+}
+
+int GeoItemsStore::row(int handle)
+{
+    return _rows.get()[handle];
+}
+
+GeoItemsTable *GeoItemsStore::_table(ItemKind kind)
+{
+    switch (kind)
+    {
+    case ItemKind::Point: case ItemKind::Intersection: return &_points;
+    case ItemKind::Segment: return &_segments;
+    case ItemKind::Circle: return &_circles;
+    default: return nullptr;
+    }
+}
+
+void GeoItemsStore::write(GeoItem& item)
+{
+    // 调用者须保证图元已登记；种类已知，故可使用static_cast
+    int handle = item.handle();
+    switch (_kinds[handle])
+    {
+    case ItemKind::Point: case ItemKind::Intersection:
+    {
+        auto [x, y] = static_cast<GeoPoint&>(item).posd();
+        double *row = _points.row(_rows.get()[handle]);
+        row[0] = x, row[1] = y;
+        break;
+    }
+    case ItemKind::Segment:
+    {
+        auto [a, b, c] = static_cast<GeoSegment&>(item).abcd();
+        double *row = _segments.row(_rows.get()[handle]);
+        row[0] = a, row[1] = b, row[2] = c;
+        break;
+    }
+    case ItemKind::Circle:
+    {
+        GeoCircle& circle = static_cast<GeoCircle&>(item);
+        auto [x, y] = circle.o()->posd();
+        double *row = _circles.row(_rows.get()[handle]);
+        row[0] = x, row[1] = y, row[2] = circle.rd();
+        break;
+    }
+    default: break;
+    }
+}
+
+GeoItemsTable& GeoItemsStore::points()
+{
+    return _points;
+}
+
+GeoItemsTable& GeoItemsStore::segments()
+{
+    return _segments;
+}
+
+GeoItemsTable& GeoItemsStore::circles()
+{
+    return _circles;
+}
+
+void GeoItemsStore::sync()
+{
+    if (not _adjacencyDirty
+            and _adjacencyGeneration == GeoItem::graphGeneration())
+        return;
+    _adjacencyDirty = false;
+    _adjacencyGeneration = GeoItem::graphGeneration();
+    ++_syncCount;
+    int n = _items.size();
+    _childOffsets.assign(n + 1, 0), _masterOffsets.assign(n + 1, 0);
+    _childHandles.clear(), _masterHandles.clear();
+    // 仅记录双方均已登记的父子关系
+    for (int h = 0; h < n; ++h)
+    {
+        _childOffsets[h] = _childHandles.size();
+        _masterOffsets[h] = _masterHandles.size();
+        if (not _items[h]) continue;
+        for (auto& child : _items[h]->children())
+            if (contains(*child)) _childHandles.push_back(child->handle());
+        for (auto& master : _items[h]->masters())
+            if (contains(*master)) _masterHandles.push_back(master->handle());
+        write(*_items[h]);
+    }
+    _childOffsets[n] = _childHandles.size();
+    _masterOffsets[n] = _masterHandles.size();
+}
+
+const std::vector<int>& GeoItemsStore::childOffsets()
+{
+    sync();
+    return _childOffsets;
+}
+
+const std::vector<int>& GeoItemsStore::childHandles()
+{
+    sync();
+    return _childHandles;
+}
+
+const std::vector<int>& GeoItemsStore::masterOffsets()
+{
+    sync();
+    return _masterOffsets;
+}
+
+const std::vector<int>& GeoItemsStore::masterHandles()
+{
+    sync();
+    return _masterHandles;
+}
+
+unsigned long long GeoItemsStore::syncCount()
+{
+    return _syncCount;
+}
+
+unsigned long long GeoItemsStore::version()
+{
+    return _version;
+}
+
+SharedArray<int>& GeoItemsStore::rows()
+{
+    return _rows;
+}
+
+size_t GeoItemsStore::storeMemoryUsage()
+{
+    return sizeof(*this)
+        + _items.capacity() * sizeof(GeoItem *)
+        + _kinds.capacity() * sizeof(ItemKind)
+        + _rows.get().capacity() * sizeof(int)
+        + _points.memoryUsage() + _segments.memoryUsage()
+        + _circles.memoryUsage()
+        + (_childOffsets.capacity() + _childHandles.capacity()
+            + _masterOffsets.capacity() + _masterHandles.capacity())
+            * sizeof(int);
+}
+
+size_t GeoItemsStore::objectMemoryUsage()
+{
+    // 对象本身，加上父图元数组与子图元哈希集合（桶数组与每个节点）的估计
+    const size_t nodeSize = sizeof(void *) + sizeof(GeoItem *) + sizeof(size_t);
+    size_t total = 0;
+    for (int h = 0, n = _items.size(); h < n; ++h)
+    {
+        if (not _items[h]) continue;
+        switch (_kinds[h])
+        {
+        case ItemKind::Point: total += sizeof(GeoPoint); break;
+        case ItemKind::Intersection: total += sizeof(GeoIntersection); break;
+        case ItemKind::Segment: total += sizeof(GeoSegment); break;
+        case ItemKind::Circle: total += sizeof(GeoCircle); break;
+        case ItemKind::Variable: total += sizeof(GeoVariable<int>); break;
+        default: total += sizeof(GeoItem); break;
+        }
+        total += _items[h]->masters().capacity() * sizeof(GeoItem *)
+            + _items[h]->children().bucket_count() * sizeof(void *)
+            + _items[h]->children().size() * nodeSize;
+    }
+    return total;
+}
+
+#endif
@@ -3,6 +3,8 @@
 #ifndef GeoPoint_HPP
 #define GeoPoint_HPP
 
+#include <type_traits>
+
 #include "GeoBasic.hpp"
 #include "GeoItem.hpp"
 
@@ -11,31 +13,107 @@ class GeoPoint : public GeoItem
     /* 点图元类。
      */
 public:
-    // 构造函数接受两个返回DecFloat的函数以获得坐标的动态变化
-    GeoPoint(Func x, Func y);
-    GeoPoint(bp::object x, bp::object y); // 构造函数的Python封装
-    virtual PointPos pos(); // 点坐标
-    bp::tuple posPy();      // 点坐标的Python封装
+    GeoPoint();                     // 初始化坐标为NaN的点图元
+    GeoPoint(double x, double y);   // 以给定坐标初始化点图元
+    // 设置原始坐标，由Python在点图元移动后调用；之后的计算不再访问Python
+    void setPos(double x, double y);
+    virtual PointPos pos();   // 点坐标
+    virtual PointPosD posd(); // 双精度点坐标
+    template <class Real>
+    BasicPointPos<Real> posAs(); // 以给定精度返回点坐标
+    bp::tuple posPy();        // 点坐标的Python封装
+    void evaluate();          // 若缓存失效则重新计算坐标
+    bool refresh();           // 重新计算坐标，返回坐标是否改变
+    static CacheCounter& cacheStatistics(); // 点坐标缓存的命中统计
 private:
-    Func _x, _y;        // 构造函数传入的函数
-    PointPos rawPos();  // 原始坐标，即(_x(), _y())
+    PointPosD _rawPos = nanposd;   // 原始坐标，路径上的点以其在路径上的投影为坐标
+    PointPosD _lastPos = nanposd;  // 上次调用refresh()时的坐标
+    PointPos _cachedPos = nanpos;    // 双精度计算时按需由_cachedPosd转换
+    PointPosD _cachedPosd = nanposd;
+    bool _cachedPosReady = false;    // _cachedPos是否已与_cachedPosd一致
+    GeoItem *_pathMaster = nullptr;  // 上次转换为路径图元的父图元
+    GeoPathItem *_path = nullptr;    // 转换结果，避免每次计算都进行dynamic_cast
+    inline static CacheCounter _statistics;
+    GeoPathItem *_onPath();  // 点所在路径，不在路径上时为nullptr
+    // 若缓存失效，按图元精度计算坐标并缓存；DecFloat计算时同时缓存双精度结果
+    void _evaluate();
+    template <class Real>
+    BasicPointPos<Real> _pos(); // 以给定精度计算点坐标
 };
 
-GeoPoint::GeoPoint(Func x, Func y) : GeoItem(), _x(x), _y(y) {}
+GeoPoint::GeoPoint() : GeoItem() {}
+
+GeoPoint::GeoPoint(double x, double y) : GeoItem(), _rawPos(x, y) {}
 
-GeoPoint::GeoPoint(bp::object x, bp::object y)
+void GeoPoint::setPos(double x, double y)
 {
-    _x = pyfunccv(x), _y = pyfunccv(y);
+    _rawPos = PointPosD(x, y);
+    invalidate();
 }
 
-PointPos GeoPoint::pos()
+GeoPathItem *GeoPoint::_onPath()
+{
+    if (_masters[0] != _pathMaster)
+    {
+        _pathMaster = _masters[0];
+        _path = dynamic_cast<GeoPathItem *>(_pathMaster);
+    }
+    return _path;
+}
+
+template <class Real>
+BasicPointPos<Real> GeoPoint::_pos()
 {
     // 若_masters为空，则点是自由点
-    if (_masters.empty()) return rawPos();
+    if (_masters.empty()) return poscv<Real>(_rawPos);
     // 若_masters非空，则点表示已知路径上的点
-    GeoPathItem *onPath = dynamic_cast<GeoPathItem *>(_masters[0]);
-    if (onPath) return onPath->footPointFrom(rawPos());
-    return nanpos; // 否则点无意义
+    GeoPathItem *onPath = _onPath();
+    if (onPath) return onPath->footPointFrom(poscv<Real>(_rawPos));
+    return BasicPointPos<Real>(nanof<Real>(), nanof<Real>()); // 否则点无意义
+}
+
+void GeoPoint::_evaluate()
+{
+    if (not isStale())
+    {
+        _statistics.hit();
+        return;
+    }
+    _statistics.miss();
+    if (_precision == Precision::Double)
+        _cachedPosd = _pos<double>(), _cachedPosReady = false;
+    else
+    {
+        _cachedPosd = poscv<double>(_cachedPos = _pos<DecFloat>());
+        _cachedPosReady = true;
+    }
+    _validate();
+}
+
+void GeoPoint::evaluate()
+{
+    _evaluate();
+}
+
+PointPos GeoPoint::pos()
+{
+    _evaluate();
+    if (not _cachedPosReady)
+        _cachedPos = poscv<DecFloat>(_cachedPosd), _cachedPosReady = true;
+    return _cachedPos;
+}
+
+PointPosD GeoPoint::posd()
+{
+    _evaluate();
+    return _cachedPosd;
+}
+
+template <class Real>
+BasicPointPos<Real> GeoPoint::posAs()
+{
+    if constexpr (std::is_same_v<Real, double>) return posd();
+    else return pos();
 }
 
 bp::tuple GeoPoint::posPy()
@@ -44,11 +122,19 @@ bp::tuple GeoPoint::posPy()
     return bp::make_tuple(x, y);
 }
 
-PointPos GeoPoint::rawPos()
+bool GeoPoint::refresh()
+{
+    PointPosD p = posd();
+    if (samepos(p, _lastPos)) return false;
+    _lastPos = p;
+    return true;
+}
+
+CacheCounter& GeoPoint::cacheStatistics()
 {
-    return PointPos(_x(), _y());
+    return _statistics;
 }
 
-GeoPoint nanpoint = GeoPoint(nanfunc, nanfunc);  // NaN点图元
+GeoPoint nanpoint = GeoPoint();  // NaN点图元
 
 #endif
@@ -12,13 +12,28 @@ class GeoSegment : public GeoPathItem
      */
 public:
     GeoSegment();
-    PointPos footPointFrom(PointPos p); // 点在直线上的投影
+    PointPos footPointFrom(PointPos p);   // 点在直线上的投影
+    PointPosD footPointFrom(PointPosD p); // 点在直线上的投影，使用双精度
     LineArgs abc(); // 一次性返回直线方程的a（x项系数）、b（y项系数）、c（常数项）。
+    LineArgsD abcd(); // 双精度的直线参数
+    template <class Real>
+    BasicLineArgs<Real> abcAs(); // 以给定精度返回直线参数
     GeoPoint *point1();
     GeoPoint *point2();
+    void evaluate(); // 若缓存失效则重新计算直线参数
+    bool refresh(); // 重新计算直线参数，返回端点是否改变
+    static CacheCounter& cacheStatistics(); // 直线参数缓存的命中统计
 private:
     GeoPoint *_point1 = nullptr, *_point2 = nullptr;
-    LineArgs _cachedabc = nanline;
+    LineArgs _cachedabc = nanline;   // 双精度计算时按需由_cachedabcd转换
+    LineArgsD _cachedabcd = LineArgsD(NAN, NAN, NAN);
+    bool _cachedabcReady = false;    // _cachedabc是否已与_cachedabcd一致
+    PointPosD _lastPoint1 = nanposd, _lastPoint2 = nanposd; // 上次的端点坐标
+    inline static CacheCounter _statistics;
+    // 若缓存失效，按图元精度计算直线参数并缓存；DecFloat计算时同时缓存双精度结果
+    void _evaluate();
+    template <class Real>
+    BasicLineArgs<Real> _abc(); // 以给定精度计算直线参数
 };
 
 GeoSegment::GeoSegment() : GeoPathItem() {}
@@ -28,6 +43,11 @@ PointPos GeoSegment::footPointFrom(PointPos p)
     return footPoint(p, abc());
 }
 
+PointPosD GeoSegment::footPointFrom(PointPosD p)
+{
+    return footPoint(p, abcd());
+}
+
 GeoPoint *GeoSegment::point1()
 {
     if (not _point1) _point1 = dynamic_cast<GeoPoint *>(_masters[0]);
@@ -40,15 +60,74 @@ GeoPoint *GeoSegment::point2()
     return _point2 ? _point2 : &nanpoint;
 }
 
+template <class Real>
+BasicLineArgs<Real> GeoSegment::_abc()
+{
+    using std::fma;
+    auto [x1, y1] = point1()->posAs<Real>();
+    auto [x2, y2] = point2()->posAs<Real>();
+    return BasicLineArgs<Real>(y2 - y1, x1 - x2, fma(x2, y1, -x1 * y2));
+}
+
+void GeoSegment::_evaluate()
+{
+    if (not isStale())
+    {
+        _statistics.hit();
+        return;
+    }
+    _statistics.miss();
+    if (_masters.size() != 2)
+        _cachedabcd = LineArgsD(NAN, NAN, NAN), _cachedabcReady = false;
+    else if (_precision == Precision::Double)
+        _cachedabcd = _abc<double>(), _cachedabcReady = false;
+    else
+    {
+        _cachedabcd = linecv<double>(_cachedabc = _abc<DecFloat>());
+        _cachedabcReady = true;
+    }
+    _validate();
+}
+
+void GeoSegment::evaluate()
+{
+    _evaluate();
+}
+
 LineArgs GeoSegment::abc()
 {
-    if (_masters.size() != 2) return nanline;
-    if (_updated) return _cachedabc;
-    _updated = true;
-    auto [x1, y1] = point1()->pos();
-    auto [x2, y2] = point2()->pos();
-    return _cachedabc = LineArgs(
-        y2 - y1, x1 - x2, fma(x2, y1, -x1 * y2));
+    _evaluate();
+    if (not _cachedabcReady)
+        _cachedabc = linecv<DecFloat>(_cachedabcd), _cachedabcReady = true;
+    return _cachedabc;
+}
+
+LineArgsD GeoSegment::abcd()
+{
+    _evaluate();
+    return _cachedabcd;
+}
+
+template <class Real>
+BasicLineArgs<Real> GeoSegment::abcAs()
+{
+    if constexpr (std::is_same_v<Real, double>) return abcd();
+    else return abc();
+}
+
+bool GeoSegment::refresh()
+{
+    if (_masters.size() != 2) return false;
+    _evaluate();
+    PointPosD p1 = point1()->posd(), p2 = point2()->posd();
+    if (samepos(p1, _lastPoint1) and samepos(p2, _lastPoint2)) return false;
+    _lastPoint1 = p1, _lastPoint2 = p2;
+    return true;
+}
+
+CacheCounter& GeoSegment::cacheStatistics()
+{
+    return _statistics;
 }
 
 #endif
@@ -0,0 +1,420 @@
+/* GeoSpatialIndex - 图元的空间索引
+ */
+#ifndef GeoSpatialIndex_HPP
+#define GeoSpatialIndex_HPP
+
+#include <algorithm>
+#include <unordered_map>
+
+#include "GeoItemsStore.hpp"
+
+struct IndexShape
+{
+    /* 空间索引中图元的几何形状。
+     * 点为(x, y)，线段为两端点(x1, y1, x2, y2)，圆为圆心与半径(x, y, r)。
+     */
+    ItemKind kind = ItemKind::Other;  // 图元种类，交点视为点
+    double g[4] = {NAN, NAN, NAN, NAN};
+    bool isValid();  // 形状是否有意义，即坐标均非NaN
+    std::tuple<double, double, double, double> bounds();  // 外接矩形
+    double distanceTo(double x, double y);  // 点(x, y)到形状的距离
+    // 形状是否与矩形[left, right]×[top, bottom]相交
+    bool intersects(double left, double top, double right, double bottom);
+};
+
+using IndexHit = std::pair<int, double>;  // 查询结果：图元编号与距离
+
+class GeoSpatialIndex
+{
+    /* 分层的均匀网格空间索引。每个图元登记在其几何形状实际经过的所有网格中，
+     * 故斜线段或大圆只占用沿途的网格，而非整个外接矩形。
+     * 第0层网格大小为cellSize()，每层网格边长为上一层的levelRatio倍；
+     * 图元登记在经过网格数不超过maxCellsPerItem的最细一层，
+     * 在最粗一层仍经过过多网格的图元（如极大的圆）单独存放，每次查询都逐一检查。
+     * 图元以图元编号索引，形状改变时增量更新，仅在所经过的网格变化时才移动。
+     */
+public:
+    GeoSpatialIndex(double cellSize = 64.);
+    void update(int handle, const IndexShape& shape);  // 登记或更新图元的形状
+    void remove(int handle);  // 删除图元，未登记时什么都不做
+    void clear();             // 删除所有图元
+    int size();               // 已登记的图元数
+    double cellSize();        // 网格大小
+    void setCellSize(double cellSize);  // 设置网格大小，并重新登记所有图元
+    // 到(x, y)最近的k个图元，按距离由近到远排列
+    std::vector<IndexHit> nearest(double x, double y, int k);
+    // 到(x, y)的距离不超过radius的所有图元，按距离由近到远排列
+    std::vector<IndexHit> within(double x, double y, double radius);
+    // 与矩形[left, right]×[top, bottom]相交的所有图元，按编号排列
+    std::vector<int> inRect(double left, double top, double right, double bottom);
+    static const int maxCellsPerItem = 256;  // 每个图元在一层中最多经过的网格数
+    static const int levelCount = 2;  // 网格的层数
+    static const int levelRatio = 16; // 相邻两层网格边长之比
+private:
+    struct Entry
+    {
+        IndexShape shape;
+        std::vector<unsigned long long> cells;  // 经过的网格的键
+        bool registered = false;
+        int level = -1;  // 所在的网格层，-1表示单独存放
+    };
+    double _cellSize;
+    std::vector<Entry> _entries;  // 图元编号到登记信息的映射
+    std::unordered_map<unsigned long long, std::vector<int>> _cells[levelCount];
+    std::vector<int> _large;      // 单独存放的图元
+    int _size = 0;
+    // 所有图元外接矩形的并，只增不减，用于限制查询范围
+    double _left = INFINITY, _top = INFINITY, _right = -INFINITY, _bottom = -INFINITY;
+    std::vector<unsigned> _stamps;  // 每个图元上次被查询检查时的查询编号，用于去重
+    unsigned _stamp = 0;
+    static unsigned long long _key(int cx, int cy);  // 网格坐标到键的映射
+    double _levelSize(int level);  // 第level层的网格大小
+    int _cell(double v, int level);  // 坐标所在的第level层网格坐标
+    // 形状经过的第level层网格，按键排列；超过maxCellsPerItem个时返回false
+    bool _cellsOf(IndexShape& shape, int level, std::vector<unsigned long long>& cells);
+    void _insertCells(int handle);  // 将图元加入其经过的网格
+    void _eraseCells(int handle);   // 将图元移出其经过的网格
+    // 对矩形覆盖的网格与单独存放的图元中的每个图元调用一次f
+    template <class F>
+    void _visit(double left, double top, double right, double bottom, F f);
+};
+
+bool IndexShape::isValid()
+{
+    int n = kind == ItemKind::Segment ? 4 : kind == ItemKind::Circle ? 3 : 2;
+    for (int i = 0; i < n; ++i)
+        if (std::isnan(g[i])) return false;
+    return kind != ItemKind::Other;
+}
+
+std::tuple<double, double, double, double> IndexShape::bounds()
+{
+    switch (kind)
+    {
+    case ItemKind::Segment:
+        return {std::min(g[0], g[2]), std::min(g[1], g[3]),
+            std::max(g[0], g[2]), std::max(g[1], g[3])};
+    case ItemKind::Circle:
+    {
+        double r = std::abs(g[2]);
+        return {g[0] - r, g[1] - r, g[0] + r, g[1] + r};
+    }
+    default: return {g[0], g[1], g[0], g[1]};
+    }
+}
+
+double IndexShape::distanceTo(double x, double y)
+{
+    switch (kind)
+    {
+    case ItemKind::Segment:
+    {
+        // 投影参数截断到[0, 1]，即到线段而非直线的距离
+        double dx = g[2] - g[0], dy = g[3] - g[1], len2 = dx * dx + dy * dy;
+        double t = len2 > 0 ? ((x - g[0]) * dx + (y - g[1]) * dy) / len2 : 0;
+        t = std::clamp(t, 0., 1.);
+        return std::hypot(x - g[0] - t * dx, y - g[1] - t * dy);
+    }
+    case ItemKind::Circle:
+        return std::abs(std::hypot(x - g[0], y - g[1]) - std::abs(g[2]));
+    default: return std::hypot(x - g[0], y - g[1]);
+    }
+}
+
+bool IndexShape::intersects(double left, double top, double right, double bottom)
+{
+    auto [l, t, r, b] = bounds();
+    if (l > right or r < left or t > bottom or b < top) return false;
+    switch (kind)
+    {
+    case ItemKind::Segment:
+    {
+        // Liang-Barsky裁剪：线段在矩形内的参数区间非空即相交
+        double t0 = 0, t1 = 1, dx = g[2] - g[0], dy = g[3] - g[1];
+        double p[4] = {-dx, dx, -dy, dy},
+            q[4] = {g[0] - left, right - g[0], g[1] - top, bottom - g[1]};
+        for (int i = 0; i < 4; ++i)
+        {
+            if (p[i] == 0)
+            {
+                if (q[i] < 0) return false;
+                continue;
+            }
+            double u = q[i] / p[i];
+            if (p[i] < 0) t0 = std::max(t0, u);
+            else t1 = std::min(t1, u);
+        }
+        return t0 <= t1;
+    }
+    case ItemKind::Circle:
+    {
+        // 圆周与矩形相交，当且仅当圆心到矩形的最近距离不大于半径，且最远距离不小于半径
+        double radius = std::abs(g[2]);
+        double nx = std::clamp(g[0], left, right) - g[0],
+            ny = std::clamp(g[1], top, bottom) - g[1];
+        double fx = std::max(std::abs(g[0] - left), std::abs(g[0] - right)),
+            fy = std::max(std::abs(g[1] - top), std::abs(g[1] - bottom));
+        return std::hypot(nx, ny) <= radius and std::hypot(fx, fy) >= radius;
+    }
+    default: return true;
+    }
+}
+
+GeoSpatialIndex::GeoSpatialIndex(double cellSize) : _cellSize(cellSize) {}
+
+unsigned long long GeoSpatialIndex::_key(int cx, int cy)
+{
+    return (unsigned long long)(unsigned)cx << 32 | (unsigned)cy;
+}
+
+double GeoSpatialIndex::_levelSize(int level)
+{
+    double size = _cellSize;
+    for (int i = 0; i < level; ++i) size *= levelRatio;
+    return size;
+}
+
+int GeoSpatialIndex::_cell(double v, int level)
+{
+    // 限制范围，避免极大坐标转换为整数时溢出
+    return (int)std::floor(std::clamp(v / _levelSize(level), -1e9, 1e9));
+}
+
+bool GeoSpatialIndex::_cellsOf(
+    IndexShape& shape, int level, std::vector<unsigned long long>& cells)
+{
+    cells.clear();
+    auto [l, t, r, b] = shape.bounds();
+    int cx1 = _cell(l, level), cy1 = _cell(t, level),
+        cx2 = _cell(r, level), cy2 = _cell(b, level);
+    if (shape.kind == ItemKind::Point or (cx1 == cx2 and cy1 == cy2))
+    {
+        cells.push_back(_key(cx1, cy1));
+        return true;
+    }
+    // 外接矩形中的网格过多时，形状经过的网格必然也很多（线段除外，其经过的网格数
+    // 不超过两个方向的网格数之和），直接视为过多，避免逐一检查
+    long long width = (long long)cx2 - cx1 + 1, height = (long long)cy2 - cy1 + 1;
+    if (shape.kind == ItemKind::Segment ? width + height > maxCellsPerItem
+            : width * height > (long long)maxCellsPerItem * maxCellsPerItem)
+        return false;
+    // 网格取闭区间并略微扩大，使浮点误差不致漏掉恰好经过网格边界的形状
+    double size = _levelSize(level), margin = size * 1e-9;
+    for (int cx = cx1; cx <= cx2; ++cx)
+    {
+        // 线段在此列网格中的纵向范围，只需检查这一范围内的网格
+        int cyFrom = cy1, cyTo = cy2;
+        if (shape.kind == ItemKind::Segment and shape.g[0] != shape.g[2])
+        {
+            double x1 = std::max(cx * size, l), x2 = std::min((cx + 1) * size, r);
+            double k = (shape.g[3] - shape.g[1]) / (shape.g[2] - shape.g[0]);
+            double y1 = shape.g[1] + k * (x1 - shape.g[0]),
+                y2 = shape.g[1] + k * (x2 - shape.g[0]);
+            cyFrom = std::max(cy1, _cell(std::min(y1, y2), level) - 1);
+            cyTo = std::min(cy2, _cell(std::max(y1, y2), level) + 1);
+        }
+        for (int cy = cyFrom; cy <= cyTo; ++cy)
+            if (shape.intersects(cx * size - margin, cy * size - margin,
+                    (cx + 1) * size + margin, (cy + 1) * size + margin))
+            {
+                cells.push_back(_key(cx, cy));
+                if ((int)cells.size() > maxCellsPerItem) return false;
+            }
+    }
+    std::sort(cells.begin(), cells.end());
+    return true;
+}
+
+void GeoSpatialIndex::_insertCells(int handle)
+{
+    Entry& e = _entries[handle];
+    if (e.level < 0) _large.push_back(handle);
+    else for (auto& key : e.cells) _cells[e.level][key].push_back(handle);
+}
+
+void GeoSpatialIndex::_eraseCells(int handle)
+{
+    Entry& e = _entries[handle];
+    auto erase = [handle](std::vector<int>& handles) {
+        auto i = std::find(handles.begin(), handles.end(), handle);
+        if (i != handles.end())
+        {
+            *i = handles.back();
+            handles.pop_back();
+        }
+    };
+    if (e.level < 0)
+    {
+        erase(_large);
+        return;
+    }
+    auto& cells = _cells[e.level];
+    for (auto& key : e.cells)
+    {
+        auto cell = cells.find(key);
+        if (cell == cells.end()) continue;
+        erase(cell->second);
+        if (cell->second.empty()) cells.erase(cell);
+    }
+}
+
+void GeoSpatialIndex::update(int handle, const IndexShape& shape)
+{
+    if (handle < 0) return;
+    if (handle >= (int)_entries.size())
+    {
+        _entries.resize(handle + 1);
+        _stamps.resize(handle + 1, 0);
+    }
+    IndexShape s = shape;
+    if (not s.isValid())
+    {
+        remove(handle);
+        return;
+    }
+    auto [l, t, r, b] = s.bounds();
+    _left = std::min(_left, l), _top = std::min(_top, t);
+    _right = std::max(_right, r), _bottom = std::max(_bottom, b);
+    static thread_local std::vector<unsigned long long> cells;
+    int level = 0;
+    while (level < levelCount and not _cellsOf(s, level, cells)) ++level;
+    if (level == levelCount) level = -1, cells.clear();
+    Entry& e = _entries[handle];
+    e.shape = s;
+    // 所经过的网格不变时只需更新形状
+    if (e.registered and e.level == level and e.cells == cells) return;
+    if (e.registered) _eraseCells(handle);
+    else ++_size;
+    e.registered = true, e.level = level, e.cells = cells;
+    _insertCells(handle);
+}
+
+void GeoSpatialIndex::remove(int handle)
+{
+    if (handle < 0 or handle >= (int)_entries.size()
+            or not _entries[handle].registered)
+        return;
+    _eraseCells(handle);
+    _entries[handle] = Entry();
+    --_size;
+}
+
+void GeoSpatialIndex::clear()
+{
+    _entries.clear(), _large.clear(), _stamps.clear();
+    for (auto& cells : _cells) cells.clear();
+    _size = 0;
+    _left = _top = INFINITY, _right = _bottom = -INFINITY;
+}
+
+int GeoSpatialIndex::size()
+{
+    return _size;
+}
+
+double GeoSpatialIndex::cellSize()
+{
+    return _cellSize;
+}
+
+void GeoSpatialIndex::setCellSize(double cellSize)
+{
+    std::vector<Entry> entries;
+    entries.swap(_entries);
+    clear();
+    _cellSize = cellSize;
+    for (int h = 0, n = entries.size(); h < n; ++h)
+        if (entries[h].registered) update(h, entries[h].shape);
+}
+
+template <class F>
+void GeoSpatialIndex::_visit(
+    double left, double top, double right, double bottom, F f)
+{
+    if (++_stamp == 0)  // 查询编号溢出时清零所有记录
+    {
+        std::fill(_stamps.begin(), _stamps.end(), 0);
+        _stamp = 1;
+    }
+    auto check = [&](int handle) {
+        if (_stamps[handle] == _stamp) return;
+        _stamps[handle] = _stamp;
+        f(handle, _entries[handle].shape);
+    };
+    for (auto& handle : _large) check(handle);
+    left = std::max(left, _left), top = std::max(top, _top);
+    right = std::min(right, _right), bottom = std::min(bottom, _bottom);
+    if (left > right or top > bottom) return;
+    for (int level = 0; level < levelCount; ++level)
+    {
+        auto& cells = _cells[level];
+        if (cells.empty()) continue;
+        int cx1 = _cell(left, level), cy1 = _cell(top, level),
+            cx2 = _cell(right, level), cy2 = _cell(bottom, level);
+        // 覆盖的网格多于非空网格时，直接遍历非空网格更快
+        if ((long long)(cx2 - cx1 + 1) * (cy2 - cy1 + 1) > (long long)cells.size())
+        {
+            for (auto& [key, handles] : cells)
+            {
+                int cx = (int)(unsigned)(key >> 32), cy = (int)(unsigned)key;
+                if (cx < cx1 or cx > cx2 or cy < cy1 or cy > cy2) continue;
+                for (auto& handle : handles) check(handle);
+            }
+            continue;
+        }
+        for (int cx = cx1; cx <= cx2; ++cx)
+            for (int cy = cy1; cy <= cy2; ++cy)
+            {
+                auto cell = cells.find(_key(cx, cy));
+                if (cell == cells.end()) continue;
+                for (auto& handle : cell->second) check(handle);
+            }
+    }
+}
+
+std::vector<IndexHit> GeoSpatialIndex::within(double x, double y, double radius)
+{
+    std::vector<IndexHit> hits;
+    if (not (radius >= 0) or std::isnan(x) or std::isnan(y)) return hits;
+    _visit(x - radius, y - radius, x + radius, y + radius,
+        [&](int handle, IndexShape& shape) {
+            double d = shape.distanceTo(x, y);
+            if (d <= radius) hits.emplace_back(handle, d);
+        });
+    std::sort(hits.begin(), hits.end(), [](const IndexHit& a, const IndexHit& b) {
+        return a.second < b.second or (a.second == b.second and a.first < b.first);});
+    return hits;
+}
+
+std::vector<IndexHit> GeoSpatialIndex::nearest(double x, double y, int k)
+{
+    if (k <= 0 or _size == 0 or std::isnan(x) or std::isnan(y)) return {};
+    // 逐步加倍搜索半径，直至找到至少k个图元，或半径已覆盖所有图元
+    // 半径内的图元是完整的，故其中最近的k个即为所求
+    double limit = std::hypot(
+        std::max(std::abs(x - _left), std::abs(x - _right)),
+        std::max(std::abs(y - _top), std::abs(y - _bottom)));
+    std::vector<IndexHit> hits;
+    for (double radius = _cellSize / 2; ; radius *= 2)
+    {
+        hits = within(x, y, std::min(radius, limit));
+        if ((int)hits.size() >= k or radius >= limit) break;
+    }
+    if ((int)hits.size() > k) hits.resize(k);
+    return hits;
+}
+
+std::vector<int> GeoSpatialIndex::inRect(
+    double left, double top, double right, double bottom)
+{
+    if (left > right) std::swap(left, right);
+    if (top > bottom) std::swap(top, bottom);
+    std::vector<int> handles;
+    _visit(left, top, right, bottom, [&](int handle, IndexShape& shape) {
+        if (shape.intersects(left, top, right, bottom)) handles.push_back(handle);
+    });
+    std::sort(handles.begin(), handles.end());
+    return handles;
+}
+
+#endif
@@ -0,0 +1,129 @@
+/* GeoThreadPool - 图元计算线程池
+ */
+#ifndef GeoThreadPool_HPP
+#define GeoThreadPool_HPP
+
+#include <algorithm>
+#include <condition_variable>
+#include <functional>
+#include <mutex>
+#include <thread>
+
+#include "GeoItem.hpp"
+
+using RangeFunc = std::function<void(int, int)>;  // 处理区间[begin, end)的函数
+
+class GeoThreadPool
+{
+    /* 图元计算线程池。调用线程也参与计算，故线程数为n时另有n - 1个工作线程。
+     * 不可重入，也不可被多个线程同时使用。
+     */
+public:
+    GeoThreadPool();
+    GeoThreadPool(const GeoThreadPool&) = delete;
+    GeoThreadPool& operator=(const GeoThreadPool&) = delete;
+    ~GeoThreadPool();
+    int threadCount();  // 线程数，含调用线程
+    // 设置线程数，不大于CacheCounter::maxThreads，0表示使用硬件支持的线程数
+    void setThreadCount(int count);
+    // 将[0, n)分块后由所有线程并行调用f处理，全部完成后返回
+    void parallelFor(int n, const RangeFunc& f);
+private:
+    std::vector<std::thread> _workers;
+    std::mutex _mutex;
+    std::condition_variable _wake, _done;
+    const RangeFunc *_task = nullptr;
+    int _size = 0, _chunk = 1;  // 当前任务的区间长度与分块大小
+    std::atomic<int> _next{0};  // 下一个未处理块的起点
+    int _pending = 0;           // 尚未完成当前任务的工作线程数
+    unsigned long long _round = 0;  // 任务编号，每次parallelFor递增
+    bool _stopping = false;
+    void _stop();          // 结束所有工作线程
+    void _run(int index);  // 工作线程的主循环
+    void _work();          // 不断领取并处理分块，直至全部领完
+};
+
+GeoThreadPool::GeoThreadPool() {}
+
+GeoThreadPool::~GeoThreadPool()
+{
+    _stop();
+}
+
+int GeoThreadPool::threadCount()
+{
+    return _workers.size() + 1;
+}
+
+void GeoThreadPool::setThreadCount(int count)
+{
+    if (count <= 0) count = std::max(1u, std::thread::hardware_concurrency());
+    count = std::min(count, CacheCounter::maxThreads);
+    if (count == threadCount()) return;
+    _stop();
+    _stopping = false;
+    for (int i = 1; i < count; ++i)
+        _workers.emplace_back(&GeoThreadPool::_run, this, i);
+}
+
+void GeoThreadPool::_stop()
+{
+    {
+        std::lock_guard<std::mutex> lock(_mutex);
+        _stopping = true;
+    }
+    _wake.notify_all();
+    for (auto& worker : _workers) worker.join();
+    _workers.clear();
+}
+
+void GeoThreadPool::parallelFor(int n, const RangeFunc& f)
+{
+    if (_workers.empty() or n < 2)
+    {
+        f(0, n);
+        return;
+    }
+    {
+        std::lock_guard<std::mutex> lock(_mutex);
+        _task = &f, _size = n, _next = 0;
+        // 分块数为线程数的若干倍，以平衡各块计算量的差异
+        _chunk = std::max(1, n / (threadCount() * 8));
+        _pending = _workers.size();
+        ++_round;
+    }
+    _wake.notify_all();
+    _work();
+    std::unique_lock<std::mutex> lock(_mutex);
+    _done.wait(lock, [this] {return _pending == 0;});
+    _task = nullptr;
+}
+
+void GeoThreadPool::_run(int index)
+{
+    CacheCounter::setThreadIndex(index);
+    unsigned long long round = 0;
+    std::unique_lock<std::mutex> lock(_mutex);
+    while (true)
+    {
+        _wake.wait(lock, [&] {return _stopping or _round != round;});
+        if (_stopping) return;
+        round = _round;
+        lock.unlock();
+        _work();
+        lock.lock();
+        if (--_pending == 0) _done.notify_one();
+    }
+}
+
+void GeoThreadPool::_work()
+{
+    while (true)
+    {
+        int begin = _next.fetch_add(_chunk);
+        if (begin >= _size) return;
+        (*_task)(begin, std::min(_size, begin + _chunk));
+    }
+}
+
+#endif
@@ -13,19 +13,26 @@ class GeoVariable : public GeoItem
      */
 public:
     GeoVariable(T v);
-    void set(T v);
-    T get();
+    void set(T v);  // 设置值，并使依赖于本图元的图元失效
+    T get();        // 获取值，不修改图元，故可被多个线程同时调用
 protected:
     T val;
 };
 
 template <class T>
-GeoVariable<T>::GeoVariable(T v) : val(v) {}
+GeoVariable<T>::GeoVariable(T v) : val(v)
+{
+    _validate();
+}
 
 template <class T>
 void GeoVariable<T>::set(T v)
 {
     val = v;
+    // 变量没有需要计算的缓存，始终视为最新；先标记为最新，以保证失效能传播至子图元
+    _validate();
+    invalidate();
+    _validate();
 }
 
 template <class T>
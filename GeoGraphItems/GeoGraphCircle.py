@@ -2,7 +2,7 @@
 '''
 
 from PySide6.QtGui import QPainterPath
-from PySide6.QtCore import QPointF, QLineF
+from PySide6.QtCore import QPointF, QLineF, QRectF
 
 from .GeoGraphItem import GeoGraphPathItem
 from .GeoGraphPoint import GeoGraphPoint
@@ -14,13 +14,13 @@ __all__ = ['GeoGraphCircle']
 class GeoGraphCircle(GeoGraphPathItem):
     '''圆图元类。圆图元由圆心与圆上一点定义。
     '''
+    typePatterns = frozenset({(GeoGraphPoint, GeoGraphPoint)})
 
     def __init__(self):
         '''初始化圆图元。
         '''
         super().__init__()
         self.instance = GeoCircle()
-        self.typePatterns = {(GeoGraphPoint, GeoGraphPoint)}
 
     def __str__(self):
         '''返回圆图元的标识字符串。
@@ -32,23 +32,50 @@ class GeoGraphCircle(GeoGraphPathItem):
         '''
         return self._masters[0].shortIdentifier()
 
-    def rawShape(self):
-        '''原始路径形状，不具有选中范围。
-        圆图元的路径形状仅包含圆周附近，而不包含圆内。
+    def _centreAndRadius(self) -> tuple[QPointF, float]:
+        '''圆心与半径，在图元坐标系下。正在创建时，圆上一点为鼠标位置。
         '''
-        firstPos = self.mapFromScene(self._masters[0].pos())
-        firstPosX, firstPosY = firstPos.x(), firstPos.y()
+        centre = self.mapFromScene(self._masters[0].pos())
         secondPos = self.mapFromScene(
-            self._mousePos()
+            self._previewPos
             if len(self._masters) == 1 else self._masters[1].pos())
-        radius = QLineF(self._masters[0].pos(), secondPos).length()
-        path = QPainterPath(QPointF(firstPosX + radius, firstPosY))
-        # 画两次弧，以保证圆图元不包含圆内部分
-        path.arcTo(
-            firstPosX - radius, firstPosY - radius,
-            radius * 2, radius * 2, 0, 360)
-        path.moveTo(firstPosX + radius, firstPosY)
-        path.arcTo(
-            firstPosX - radius, firstPosY - radius,
-            radius * 2, radius * 2, 0, 360)
+        return centre, QLineF(centre, secondPos).length()
+
+    def _newRawShape(self):
+        '''构造原始路径形状，不具有选中范围。
+        圆图元的路径形状仅包含圆周，选中与碰撞以解析方法判断，不包含圆内部分。
+        '''
+        centre, radius = self._centreAndRadius()
+        path = QPainterPath()
+        path.addEllipse(centre, radius, radius)
         return path
+
+    def _newBoundingRect(self):
+        '''圆的外接正方形向外扩展余量，作为图元的矩形。参见`self.boundingMargin()`。
+        '''
+        centre, radius = self._centreAndRadius()
+        radius += self.boundingMargin()
+        return QRectF(centre.x() - radius, centre.y() - radius,
+                      radius * 2, radius * 2)
+
+    def pathDistance(self, pos: QPointF) -> float:
+        '''给定点到圆周的距离，即到圆心的距离与半径之差的绝对值。
+        '''
+        centre, radius = self._centreAndRadius()
+        return abs(QLineF(centre, pos).length() - radius)
+
+    def pathPoint(self) -> QPointF:
+        '''圆周上最右侧的一点。
+        '''
+        centre, radius = self._centreAndRadius()
+        return QPointF(centre.x() + radius, centre.y())
+
+    def edgeDistance(self, a: QPointF, b: QPointF) -> float:
+        '''线段ab到圆周的距离。
+        线段到圆心的最近距离大于半径时，距离为二者之差；
+        线段的两端点到圆心的最远距离小于半径时，距离为二者之差；否则线段与圆周相交。
+        '''
+        centre, radius = self._centreAndRadius()
+        nearest = self._distanceToSegment(centre, a, b)
+        farthest = max(QLineF(centre, a).length(), QLineF(centre, b).length())
+        return max(nearest - radius, radius - farthest, 0.)
@@ -15,6 +15,11 @@ __all__ = ['GeoGraphIntersection']
 class GeoGraphIntersection(GeoGraphPoint):
     '''交点图元类。
     '''
+    typePatterns = frozenset({
+        (GeoGraphSegment, GeoGraphSegment),
+        (GeoGraphCircle, GeoGraphSegment, GeoGraphIsecNoVar),
+        (GeoGraphSegment, GeoGraphCircle, GeoGraphIsecNoVar),
+        (GeoGraphCircle, GeoGraphCircle, GeoGraphIsecNoVar)})
 
     def __init__(self):
         '''初始化交点图元。
@@ -25,11 +30,6 @@ class GeoGraphIntersection(GeoGraphPoint):
         self.isFree: bool = False     # 非自由点
         self.isIntersec: bool = True  # 是交点
         self.instance = GeoIntersection()
-        self.typePatterns = {
-            (GeoGraphSegment, GeoGraphSegment),
-            (GeoGraphCircle, GeoGraphSegment, GeoGraphIsecNoVar),
-            (GeoGraphSegment, GeoGraphCircle, GeoGraphIsecNoVar),
-            (GeoGraphCircle, GeoGraphCircle, GeoGraphIsecNoVar)}
 
     def _addFirstMaster(self, master):
         '''为本图元添加第一个父图元。子类可在此处作一些特殊处理。
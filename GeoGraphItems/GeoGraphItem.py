@@ -6,23 +6,27 @@ from typing import TYPE_CHECKING, Any, Iterator
 
 if TYPE_CHECKING:
     from PySide6.QtGui import QPainter
-    from PySide6.QtCore import QPointF
     from ..GeoGraphScene import GeoGraphScene
     from .Interfaces.ItemAttributesSetter import ItemAttributesSetterDialog
 
+import math
 from collections.abc import MutableMapping
 
 from PySide6.QtWidgets import QStyle, QGraphicsItem
-from PySide6.QtGui import QCursor, QPen, QColor
+from PySide6.QtGui import QPen, QColor
 from PySide6.QtGui import QPainterPath, QPainterPathStroker
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QPointF, QRectF
 
 __all__ = ['GeoGraphItem', 'GeoGraphPathItem', 'GeoGraphItemAttributes']
 
 
 class GeoGraphItem(QGraphicsItem):
     '''所有图元类的基类。此类不应被创建实例。
+    所有图元共用的状态（类型匹配、默认画笔等）存储于类属性中，仅在修改时复制到实例。
+    注意不可为图元类声明`__slots__`：PySide6的图元子类使用`__slots__`时会使解释器崩溃。
     '''
+    _NO_CHILDREN: frozenset[GeoGraphItem] = frozenset()  # 无子图元时共用的空集合
+    _NO_PREVIEW_POS = QPointF()  # 未设置鼠标位置时共用的坐标
     # 图元默认属性，子类可在此基础上添加以设置默认属性
     ATTRIBUTES_INFO = {
         'visible': {
@@ -36,29 +40,38 @@ class GeoGraphItem(QGraphicsItem):
             'setter': lambda self, value: self.setOpacity(value)
         },
     }
+    # 创建图元时可选择的父图元类型匹配，参见`GeoGraphView._clickInDrawMode()`
+    typePatterns: frozenset[tuple[type[GeoGraphItem]]] = frozenset()
 
     def __init__(self):
         '''初始化图元。
         '''
         super().__init__()
-        self._masters: list[GeoGraphItem] = []      # 父图元
-        self._children: set[GeoGraphItem] = set()  # 子图元
-        self.ancestors: set[GeoGraphItem] = set()  # 祖先
-        # 在一轮更新中尚未调用`self.updatePosition()`的父图元
-        self._mastersHaveNotUpdated: set[GeoGraphItem] = set()
-        self._pens: list[QPen] = []  # 图元所有的画笔，用于缩放比例时更新
+        self._masters: list[GeoGraphItem] = []  # 父图元
+        # 子图元，首次添加子图元时才创建集合
+        self._children: set[GeoGraphItem] = self._NO_CHILDREN
         self.isCreated: bool = False    # 是否已创建
         self.isUndefined: bool = False  # 是否未定义
         self.isAvailable: bool = True   # 是否可用，即是否未删除
         self.isUpdatable: bool = False  # 是否可作为顶层结点更新
         self._noMasters: bool = True    # 是否无祖先
-        self.itemAttributes: GeoGraphItemAttributes \
-            = GeoGraphItemAttributes(self, self.ATTRIBUTES_INFO)  # 图元属性
+        # 图元属性，首次访问`self.itemAttributes`时才创建
+        self._itemAttributes: GeoGraphItemAttributes | None = None
         self.itemAttributesSetterDialog: \
             ItemAttributesSetterDialog | None = None  # 图元属性设置对话框
-        self.typePatterns: set[tuple[type[GeoGraphItem]]] = set()
+        # 正在创建时鼠标的位置，在场景坐标系下
+        self._previewPos = self._NO_PREVIEW_POS
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
 
+    @property
+    def itemAttributes(self) -> GeoGraphItemAttributes:
+        '''图元属性。首次访问时创建，多数图元从不打开属性设置对话框，无需创建。
+        '''
+        if self._itemAttributes is None:
+            self._itemAttributes = GeoGraphItemAttributes(
+                self, self.ATTRIBUTES_INFO)
+        return self._itemAttributes
+
     def scene(self) -> GeoGraphScene:
         '''获取图元所在的场景。
         '''
@@ -80,42 +93,6 @@ class GeoGraphItem(QGraphicsItem):
             for child in self._children:
                 child.setUndefined(state)
 
-    def updateFromMasters(
-            self, master: GeoGraphItem | None = None,
-            ancestors: set[GeoGraphItem] | None = None) -> bool:
-        '''若没有传入`master`，则初始化`self._mastersHaveNotUpdated`。
-        若传入`master`，则从`self._mastersHaveNotUpdated`中删除之；
-        若本轮更新中该图元所有相关父图元均已更新，即`self._mastersHaveNotUpdated`
-        已空，则该图元可以更新，返回`True`，反之返回`False`。
-
-        :param master: 调用该函数的父图元。
-        :param ancestors: 本轮更新中的顶层图元。
-        :returns: 是否可以更新。
-        '''
-        if master is not None:
-            ancestors = set(ancestors)
-            if master in self._mastersHaveNotUpdated:
-                self._mastersHaveNotUpdated.remove(master)
-            while self._mastersHaveNotUpdated:
-                item = self._mastersHaveNotUpdated.pop()
-                if not item.ancestors.isdisjoint(ancestors):
-                    self._mastersHaveNotUpdated.add(item)
-                    return False
-        self._mastersHaveNotUpdated = set(self._masters)
-        return True
-
-    def updatePosition(
-            self, master: GeoGraphItem, ancestors: set[GeoGraphItem]):
-        '''被动更新。为避免反复更新同一图元，仅当一轮更新中最后一次调用时更新。
-
-        :param master: 调用该函数的父图元。
-        :param ancestors: 本轮更新中的顶层图元。
-        '''
-        if self.updateFromMasters(master, ancestors):
-            self.updateSelfPosition()     # 更新自身
-            for child in self._children:  # 更新子图元
-                child.updatePosition(self, ancestors)
-
     def updateSelfPosition(self):
         '''更新自身位置。子类可覆盖此方法。
         '''
@@ -153,12 +130,7 @@ class GeoGraphItem(QGraphicsItem):
             self._addFirstMaster(master)
         else:
             self._masters.append(master)
-            self._mastersHaveNotUpdated.add(master)
             master.addChild(self)
-            # 更新祖先
-            for ancestor in master.ancestors:
-                if ancestor not in self.ancestors:
-                    self.ancestors.add(ancestor)
             self.instance.addMaster(master.instance)
 
     def _addFirstMaster(self, master: GeoGraphItem):
@@ -166,6 +138,18 @@ class GeoGraphItem(QGraphicsItem):
         '''
         self.addMaster(master)
 
+    def _setInstance(self, instance):
+        '''替换基础图元。若图元已在场景中，则同时在场景的图元管理器中替换。
+
+        :param instance: 新的基础图元。
+        '''
+        scene = self.scene()
+        if scene is not None:
+            scene.unregisterInstance(self)
+        self.instance = instance
+        if scene is not None:
+            scene.registerInstance(self)
+
     def children(self) -> set[GeoGraphItem]:
         '''本图元的子图元。
         '''
@@ -174,6 +158,8 @@ class GeoGraphItem(QGraphicsItem):
     def addChild(self, child: GeoGraphItem):
         '''为本图元添加子图元。
         '''
+        if self._children is self._NO_CHILDREN:
+            self._children = set()
         self._children.add(child)
 
     def removeChild(self, child: GeoGraphItem):
@@ -193,13 +179,6 @@ class GeoGraphItem(QGraphicsItem):
         '''
         pass
 
-    def zoomScaleChanged(self, zoomChange: float):
-        '''当视图放缩比例改变时调用。子类可覆盖此方法。
-
-        :param zoomChange: 放缩比例的变化比例，即新放缩比例比原放缩比例。
-        '''
-        pass
-
     def itemChange(self, change, value):
         '''图元状态改变时调用。子类可覆盖此方法以处理特定状态改变。
         '''
@@ -224,63 +203,222 @@ class GeoGraphItem(QGraphicsItem):
         '''
         self.scene().views()[0].closeItemAttributesDialog(self)
 
-    def _mousePos(self) -> QPointF:
-        '''鼠标位置。
+    def hitRadius(self, scale: float = 1.) -> float:
+        '''选中范围的半径，即鼠标在场景坐标系下距图元多近时视为点击到图元。
+        子类可覆盖此方法。
+
+        :param scale: 进行命中测试的视图的放缩比例。
+            以像素为单位的选中范围除以此比例，即为场景坐标系下的选中范围。
+        '''
+        return 0.
+
+    def setPreviewPos(self, scenePos: QPointF):
+        '''设置正在创建时鼠标的位置。由视图在鼠标移动时调用，子类可覆盖此方法以更新预览。
 
-        :returns: 当前鼠标位置，在场景坐标系下。
+        :param scenePos: 鼠标位置，在场景坐标系下。
         '''
-        view = self.scene().views()[0]
-        return view.mapToScene(view.mapFromGlobal(QCursor.pos()))
+        self._previewPos = scenePos
 
 
 class GeoGraphPathItem(GeoGraphItem):
     '''所有路径图元类的基类。此类不应被创建实例。
     '''
+    SELECT_WIDTH = 10.  # 选中范围的宽度，在视图坐标系下，以像素为单位
+    pathConstructions: int = 0  # 构造路径与矩形的总次数，供性能测试统计
+    # 所有路径图元共用的画笔，线宽以像素为单位，不随放缩改变
+    _penDrag = QPen(QColor('#000000'), 1., Qt.PenStyle.DashLine)  # 创建时的画笔
+    _penFinal = QPen(QColor('#000000'))     # 创建完成后未选中时的画笔
+    _penSelected = QPen(QColor('#808080'))  # 创建完成后选中时的画笔
+    for _pen in (_penDrag, _penFinal, _penSelected):
+        _pen.setCosmetic(True)
+    del _pen
 
     def __init__(self):
         '''初始化路径图元。
         '''
         super().__init__()
-        self._penDrag = QPen(
-            QColor('#000000'), 1., Qt.PenStyle.DashLine)  # 创建时的画笔
-        self._penFinal = QPen(QColor('#000000'))     # 创建完成后未选中时的画笔
-        self._penSelected = QPen(QColor('#808080'))  # 创建完成后选中时的画笔
-        self._selectWidth = 10.      # 选中范围的宽度
-        # 所有画笔
-        self._pens = [self._penDrag, self._penFinal, self._penSelected]
+        # 原始路径形状、路径形状与矩形的缓存，为None时表示需重新构造
+        self._rawShapeCache: QPainterPath | None = None
+        self._shapeCache: QPainterPath | None = None
+        self._rectCache: QRectF | None = None
         self.setZValue(-1)  # 路径图元位于所有图元的下方
 
     def updateSelfPosition(self):
-        '''路径图元不更新位置，仅调用`prepareGeometryChange()`方法触发重绘。
+        '''路径图元不更新位置，仅使路径缓存失效并触发重绘。
         '''
         super().updateSelfPosition()
+        self.invalidateGeometry()
+
+    def setPreviewPos(self, scenePos: QPointF):
+        '''设置正在创建时鼠标的位置，并重新绘制预览。
+        '''
+        super().setPreviewPos(scenePos)
+        if not self.isCreated:
+            self.invalidateGeometry()
+
+    def invalidateGeometry(self):
+        '''使路径形状与矩形的缓存失效，并通知场景准备几何变化。
+        仅在`updateSelfPosition()`与正在创建时需要调用，放缩不改变路径与矩形。
+        '''
         self.prepareGeometryChange()
+        self._rawShapeCache = self._shapeCache = self._rectCache = None
+
+    def _cached(self, name: str, construct):
+        '''读取缓存，若缓存失效则调用`construct()`重新构造。
+        正在创建时路径随鼠标变化，故不写入缓存。
+
+        :param name: 缓存的属性名。
+        :param construct: 构造函数，无参数。
+        '''
+        value = getattr(self, name)
+        if value is None:
+            value = construct()
+            GeoGraphPathItem.pathConstructions += 1
+            if self.isCreated:
+                setattr(self, name, value)
+        return value
 
     def rawShape(self) -> QPainterPath:
-        '''原始的路径形状，不具有选中范围。此方法应被子类覆盖。
+        '''原始的路径形状，不具有选中范围。使用缓存。
         '''
-        pass
+        return self._cached(
+            '_rawShapeCache', lambda: self._newRawShape()
+            if self._masters else QPainterPath())
+
+    def _newRawShape(self) -> QPainterPath:
+        '''构造原始的路径形状。仅在存在父图元时调用，此方法应被子类覆盖。
+        '''
+        return QPainterPath()
 
     def shape(self) -> QPainterPath:
-        '''路径形状。
+        '''路径形状。使用缓存。
+        选中范围随视图的放缩比例改变，不计入形状，由`GeoGraphScene.itemsAt()`处理。
 
-        :returns: 路径的形状，具有带宽度的选中范围。
+        :returns: 路径的形状，即以画笔宽度描边的原始路径。
+        '''
+        return self._cached('_shapeCache', self._newShape)
+
+    def _newShape(self) -> QPainterPath:
+        '''以画笔宽度对原始路径形状描边，构造路径形状。
+        使用圆头描边，使形状恰为到原始路径的距离不超过画笔宽度一半的点，与`self.contains()`一致。
         '''
         pathStroker = QPainterPathStroker()
-        pathStroker.setWidth(self._selectWidth)
-        return pathStroker.createStroke(
-            QPainterPath() if not self._masters else self.rawShape())
+        pathStroker.setWidth(self.boundingMargin() * 2)
+        pathStroker.setCapStyle(Qt.PenCapStyle.RoundCap)
+        return pathStroker.createStroke(self.rawShape())
+
+    def hitRadius(self, scale: float = 1.) -> float:
+        '''选中范围的半径，即选中范围宽度的一半，在场景坐标系下。
+
+        :param scale: 进行命中测试的视图的放缩比例。
+        '''
+        return self.SELECT_WIDTH / 2 / scale
+
+    def boundingMargin(self) -> float:
+        '''矩形在原始路径之外的余量，即画笔宽度的一半。
+        画笔线宽以像素为单位，此处与Qt自身的图元相同，按场景坐标计入，
+        视图重绘时另留有余量。矩形因此不随放缩改变，放缩时无需更新图元。
+        '''
+        return max(pen.widthF() for pen in
+                   (self._penDrag, self._penFinal, self._penSelected)) / 2
 
     def boundingRect(self):
-        '''使用自身路径的矩形作为图元的矩形。
+        '''图元的矩形。使用缓存。
+        '''
+        return self._cached('_rectCache', lambda: self._newBoundingRect()
+                            if self._masters else QRectF())
+
+    def _newBoundingRect(self) -> QRectF:
+        '''构造图元的矩形。仅在存在父图元时调用。
+        默认使用路径形状的矩形，子类可覆盖此方法，以闭式计算矩形。
         '''
         return self.shape().boundingRect()
 
+    def pathDistance(self, pos: QPointF) -> float:
+        '''给定点到原始路径的距离。此方法应被子类覆盖。
+
+        :param pos: 给定点，在图元坐标系下。
+        '''
+        return math.inf
+
+    def pathPoint(self) -> QPointF:
+        '''原始路径上的任意一点，在图元坐标系下。此方法应被子类覆盖。
+        '''
+        return QPointF()
+
+    def edgeDistance(self, a: QPointF, b: QPointF) -> float:
+        '''线段ab到原始路径的最近距离。此方法应被子类覆盖。
+
+        :param a: 线段的一个端点，在图元坐标系下。
+        :param b: 线段的另一个端点，在图元坐标系下。
+        '''
+        return math.inf
+
+    def contains(self, pos: QPointF) -> bool:
+        '''给定点是否在路径形状内，即到原始路径的距离不超过画笔宽度的一半。
+        以解析方法判断，而不对路径描边。
+
+        :param pos: 给定点，在图元坐标系下。
+        '''
+        return bool(self._masters) \
+            and self.pathDistance(pos) <= self.boundingMargin()
+
+    def collidesWithPath(
+            self, path: QPainterPath,
+            mode=Qt.ItemSelectionMode.IntersectsItemShape) -> bool:
+        '''是否与给定路径碰撞，用于框选等。以解析方法判断，而不对路径描边。
+        路径与路径形状相交，当且仅当原始路径上有一点在给定路径内，
+        或给定路径的某条边到原始路径的距离不超过画笔宽度的一半。
+
+        :param path: 给定路径，在图元坐标系下。
+        :param mode: 碰撞模式。
+        '''
+        if not self._masters:
+            return False
+        half = self.boundingMargin()
+        if mode in (Qt.ItemSelectionMode.ContainsItemShape,
+                    Qt.ItemSelectionMode.ContainsItemBoundingRect):
+            return path.contains(self.rawShape().boundingRect().adjusted(
+                -half, -half, half, half))
+        polygon = path.toFillPolygon()
+        if polygon.containsPoint(self.pathPoint(), Qt.FillRule.OddEvenFill):
+            return True
+        return any(
+            self.edgeDistance(polygon[i], polygon[i + 1]) <= half
+            for i in range(len(polygon) - 1))
+
+    @staticmethod
+    def _distanceToSegment(p: QPointF, a: QPointF, b: QPointF) -> float:
+        '''点p到线段ab的距离。
+        '''
+        ax, ay = a.x(), a.y()
+        dx, dy = b.x() - ax, b.y() - ay
+        px, py = p.x() - ax, p.y() - ay
+        lengthSquared = dx * dx + dy * dy
+        t = (px * dx + py * dy) / lengthSquared if lengthSquared else 0.
+        t = min(max(t, 0.), 1.)
+        return math.hypot(px - t * dx, py - t * dy)
+
+    @staticmethod
+    def _segmentsDistance(
+            a: QPointF, b: QPointF, c: QPointF, d: QPointF) -> float:
+        '''线段ab与线段cd的距离，相交时为0。
+        '''
+        def cross(o: QPointF, p: QPointF, q: QPointF) -> float:
+            return (p.x() - o.x()) * (q.y() - o.y()) \
+                - (p.y() - o.y()) * (q.x() - o.x())
+        d1, d2 = cross(c, d, a), cross(c, d, b)
+        d3, d4 = cross(a, b, c), cross(a, b, d)
+        if ((d1 > 0 > d2) or (d1 < 0 < d2)) \
+                and ((d3 > 0 > d4) or (d3 < 0 < d4)):
+            return 0.
+        distance = GeoGraphPathItem._distanceToSegment
+        return min(distance(a, c, d), distance(b, c, d),
+                   distance(c, a, b), distance(d, a, b))
+
     def paint(self, painter: QPainter, option, widget=None):
         '''绘制路径。根据图元情况选择画笔。
         '''
-        if not self.isCreated:
-            self.prepareGeometryChange()  # 只有正在创建时才需要不断重绘
         if option.state & QStyle.StateFlag.State_Selected:
             painter.setPen(self._penSelected)
         else:
@@ -288,14 +426,6 @@ class GeoGraphPathItem(GeoGraphItem):
                 self._penFinal if self.isCreated else self._penDrag)
         painter.drawPath(self.rawShape())
 
-    def zoomScaleChanged(self, zoomChange: float):
-        '''当视图放缩比例改变时更新选中宽度。
-
-        :param zoomChange: 放缩比例的变化比例，即新放缩比例比原放缩比例。
-        '''
-        super().zoomScaleChanged(zoomChange)
-        self._selectWidth /= zoomChange
-
 
 class GeoGraphItemAttributes(MutableMapping):
     '''图元属性类。以字典形式存储图元属性。
@@ -317,8 +447,15 @@ class GeoGraphItemAttributes(MutableMapping):
 
     `GeoGraphItemAttributes.__setitem__()`会对参数进行校验，
     但仅检查`type`、`min`、`max`字段，其余字段供`ItemAttributesSetterDialog`使用。
+
+    属性信息字典在首次使用时解析（补全`title`、`type`等字段），同一字典的解析结果由所有实例共用；
+    每个实例只在`_values`中存储被读取或设置过的属性值，首次读取或设置时才创建。
     '''
+    __slots__ = ('_item', '_values', 'attributesInfo')
     SPECIAL_ATTRTYPES = {'angle': int, 'color': QColor}  # 特殊属性类型，需特殊处理
+    # 已解析的属性信息字典，键为原字典的`id()`，值为原字典与解析结果
+    _resolvedInfos: dict[int, tuple[
+        dict[str, dict[str, Any]], dict[str, dict[str, Any]]]] = {}
 
     def __init__(
             self, item: GeoGraphItem,
@@ -330,27 +467,41 @@ class GeoGraphItemAttributes(MutableMapping):
         '''
         super().__init__()
         self._item = item
-        self._attributes = {}     # 存储图元属性值的字典
-        self.attributesInfo = {}  # 存储图元属性信息的字典，便于后续获取属性信息
-        if attributesInfo is not None:
-            for name, info in attributesInfo.items():
-                self._attributes[name] = (
-                    info['default'] if 'default' in info else None)
-                self.attributesInfo[name] = info.copy()
-                if 'type' not in self.attributesInfo[name]:
-                    self.attributesInfo[name]['type'] \
-                        = type(self._attributes[name])
-                if 'title' not in self.attributesInfo[name]:
-                    self.attributesInfo[name]['title'] = name.capitalize()
-                if self.attributesInfo[name]['type'] in self.SPECIAL_ATTRTYPES:
-                    self.attributesInfo[name]['pythonType'] \
-                        = self.SPECIAL_ATTRTYPES[
-                            self.attributesInfo[name]['type']]
+        self._values: dict[str, Any] | None = None  # 存储图元属性值的字典，首次写入时创建
+        # 存储图元属性信息的字典，便于后续获取属性信息。与同类图元共用，删除属性时才复制
+        self.attributesInfo: dict[str, dict[str, Any]] \
+            = self.resolveAttributesInfo(attributesInfo or {})
+
+    @classmethod
+    def resolveAttributesInfo(
+            cls, attributesInfo: dict[str, dict[str, Any]]) \
+            -> dict[str, dict[str, Any]]:
+        '''解析图元属性信息字典，补全`type`、`title`与`pythonType`字段。
+        同一字典只解析一次，结果由所有使用该字典的图元属性实例共用，不应修改。
+
+        :param attributesInfo: 图元属性信息字典，通常为图元类的`ATTRIBUTES_INFO`。
+        :returns: 解析后的图元属性信息字典。
+        '''
+        cached = cls._resolvedInfos.get(id(attributesInfo))
+        if cached is not None and cached[0] is attributesInfo:
+            return cached[1]
+        resolved = {}
+        for name, info in attributesInfo.items():
+            info = resolved[name] = info.copy()
+            if 'type' not in info:
+                info['type'] = type(info.get('default'))
+            if 'title' not in info:
+                info['title'] = name.capitalize()
+            if info['type'] in cls.SPECIAL_ATTRTYPES:
+                info['pythonType'] = cls.SPECIAL_ATTRTYPES[info['type']]
+        # 同时保存原字典，使其不被回收，从而`id()`不被复用
+        cls._resolvedInfos[id(attributesInfo)] = attributesInfo, resolved
+        return resolved
 
     def __len__(self):
         '''图元属性数量。
         '''
-        return len(self._attributes)
+        return sum(1 for _ in self)
 
     def __getitem__(self, key: str) -> Any:
         '''获取图元属性值。
@@ -360,12 +511,23 @@ class GeoGraphItemAttributes(MutableMapping):
         '''
         if key not in self.attributesInfo:
             raise KeyError(f"Attribute '{key}' not found")
-        value = self._attributes[key]
-        if value is None and 'getter' in self.attributesInfo[key]:
-            value = self.attributesInfo[key]['getter'](self._item)
-            self._attributes[key] = value
+        attrInfo = self.attributesInfo[key]
+        if self._values is not None and key in self._values:
+            value = self._values[key]
+        else:
+            value = attrInfo.get('default')
+        if value is None and 'getter' in attrInfo:
+            value = attrInfo['getter'](self._item)
+            self._store(key, value)
         return value
 
+    def _store(self, key: str, value: Any):
+        '''在`_values`中存储属性值。
+        '''
+        if self._values is None:
+            self._values = {}
+        self._values[key] = value
+
     def __setitem__(self, key: str, value: Any):
         '''设置图元属性值。
 
@@ -391,20 +553,22 @@ class GeoGraphItemAttributes(MutableMapping):
                         f"greater than {attrInfo['max']}")
             if 'setter' in attrInfo:
                 attrInfo['setter'](self._item, value)
-        self._attributes[key] = value
+        self._store(key, value)
 
     def __delitem__(self, key: str):
-        '''删除图元属性。
+        '''删除图元属性值。属性信息与同类图元共用，不被删除，之后读取该属性时得到默认值。
         '''
-        if key in self._attributes:
-            del self._attributes[key]
-        if key in self.attributesInfo:
-            del self.attributesInfo[key]
+        if self._values is not None and key in self._values:
+            del self._values[key]
 
     def __iter__(self) -> Iterator[str]:
-        '''迭代图元属性名称。
+        '''迭代图元属性名称，即属性信息中的属性，以及另外设置了值的属性。
         '''
-        return iter(self._attributes)
+        yield from self.attributesInfo
+        if self._values is not None:
+            for key in self._values:
+                if key not in self.attributesInfo:
+                    yield key
 
     def getAttributesInfo(self, attr: str) -> dict[str, Any]:
         '''获取图元属性信息。
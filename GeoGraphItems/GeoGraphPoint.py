@@ -22,7 +22,21 @@ __all__ = ['GeoGraphPoint']
 
 class GeoGraphPoint(GeoGraphItem):
     '''点图元类，也是其它点图元类的基类。
+    默认样式的画笔、刷子与矩形由所有点图元共用，修改样式时才为图元创建新的对象。
     '''
+    POINT_SIZE = 12.                    # 默认大小
+    PEN_WIDTH = 2.                      # 描边宽度，以像素为单位
+    BORDER_COLOR = QColor('#000000')    # 默认边缘颜色
+    FILL_COLOR = QColor('#e6e6e6')      # 默认填充颜色
+    SELECTED_COLOR = QColor('#808080')  # 被选中时的颜色
+    # 描边宽度以像素为单位，不随放缩改变
+    _defaultPenFinal = QPen(BORDER_COLOR, PEN_WIDTH)  # 默认的完成创建时的画笔
+    _defaultPenFinal.setCosmetic(True)
+    _penSelected = QPen(SELECTED_COLOR, PEN_WIDTH)    # 被选中时的画笔
+    _penSelected.setCosmetic(True)
+    _defaultBrush = QBrush(FILL_COLOR)                # 默认的用于填充的刷子
+    _defaultRect = QRectF(
+        -POINT_SIZE / 2, -POINT_SIZE / 2, POINT_SIZE, POINT_SIZE)  # 默认的点所在矩形
     ATTRIBUTES_INFO = {
         **GeoGraphItem.ATTRIBUTES_INFO,
         'pointSize': {
@@ -63,25 +77,19 @@ class GeoGraphPoint(GeoGraphItem):
         '''初始化点图元。
         '''
         super().__init__()
-        self._pointSize = 12.
-        self._borderColor = QColor('#000000')            # 边缘颜色
-        self._fillColor = QColor('#e6e6e6')              # 填充颜色
-        self._selectedColor = QColor('#808080')          # 被选中时的颜色
-        self._penFinal = QPen(self._borderColor, 2.)       # 完成创建时的画笔
-        self._penSelected = QPen(self._selectedColor, 2.)  # 被选中时的画笔
-        self._brush = QBrush(self._fillColor)              # 用于填充的刷子
-        self._pens = [self._penFinal, self._penSelected]   # 所有画笔
-        self._rect = QRectF()                              # 点所在矩形
-        self.setPointSize(self._pointSize)
+        self._pointSize = self.POINT_SIZE
+        self._borderColor = self.BORDER_COLOR     # 边缘颜色
+        self._fillColor = self.FILL_COLOR         # 填充颜色
+        self._penFinal = self._defaultPenFinal    # 完成创建时的画笔
+        self._brush = self._defaultBrush          # 用于填充的刷子
+        self._rect = self._defaultRect            # 点所在矩形
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
         self.isUpdatable: bool = True                # 是否可被更新
         self.isFree: bool = True                     # 是否为自由点
         self.onPath: GeoGraphPathItem | None = None  # 所在路径
         self.isIntersec: bool = False                # 是否为交点
-        self.instance = GeoPoint(self.x, self.y)     # 基础图元
-        self.ancestors = set()
-        self.typePatterns = {(GeoGraphPoint,)}
+        self.instance = GeoPoint(self.x(), self.y())  # 基础图元
         self._label = GeoGraphPointLabel(self)  # 点标签
 
     def __str__(self):
@@ -94,6 +102,11 @@ class GeoGraphPoint(GeoGraphItem):
         '''
         return self._label.toPlainText()
 
+    def label(self) -> GeoGraphPointLabel:
+        '''点图元的标签。
+        '''
+        return self._label
+
     def _addFirstMaster(self, master: GeoGraphItem):
         '''为本图元添加第一个父图元。
         '''
@@ -106,8 +119,7 @@ class GeoGraphPoint(GeoGraphItem):
             self._masters.append(master)
             self.instance.addMaster(master.instance)
             self.isFree = False
-            self.setPos(self._newPosition(master._mousePos()))
-        self._mastersHaveNotUpdated = set(self._masters)
+            self.setPos(self._newPosition(self.pos()))  # 投影到路径上
 
     def _copyPointToSelf(self, point: GeoGraphPoint):
         '''将给定点图元复制到自己。仅在初始化时调用。
@@ -117,7 +129,6 @@ class GeoGraphPoint(GeoGraphItem):
         self.setPos(point.pos())
         point.removeChild(self)
         point.scene().removeItem(point)
-        self.ancestors = point.ancestors.copy()
         self.onPath = point.onPath
         self.isFree = point.isFree
         self._masters = []
@@ -125,28 +136,39 @@ class GeoGraphPoint(GeoGraphItem):
             self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, False)
             self.isUpdatable = False
             self.isIntersec = True
-            self.instance = GeoIntersection()
+            self._setInstance(GeoIntersection())
             for master in point.masters():
                 self.addMaster(master)
         elif point.onPath is not None:  # 是路径上的点
-            self.instance = GeoPoint(self.x, self.y)
+            self._setInstance(GeoPoint(self.x(), self.y()))
             self.addMaster(point.onPath)
-        else:  # 是自由点
-            self.ancestors = set()
 
     def boundingRect(self):
         '''点图元所在矩形。
         '''
         return self._rect
 
+    def hitRadius(self, scale: float = 1.) -> float:
+        '''选中范围的半径，即点的半径加上描边宽度的一半，在场景坐标系下。
+
+        :param scale: 进行命中测试的视图的放缩比例。
+        '''
+        return self._pointSize / 2 + self._penFinal.widthF() / 2 / scale
+
     def paint(self, painter: QPainter, option, widget=None):
         '''绘制点图元。自动对点的选中状态进行处理。
+        细节层次低于场景的`pointLodThreshold`时，点只绘制为一个像素。
         '''
         # 根据选中状态设置画笔
-        if option.state & QStyle.StateFlag.State_Selected:
-            painter.setPen(self._penSelected)
-        else:
-            painter.setPen(self._penFinal)
+        pen = self._penSelected \
+            if option.state & QStyle.StateFlag.State_Selected \
+            else self._penFinal
+        if option.levelOfDetailFromTransform(painter.worldTransform()) \
+                < self.scene().pointLodThreshold:
+            painter.setPen(pen.color())  # 宽度为0的画笔，即一个像素
+            painter.drawPoint(0, 0)
+            return
+        painter.setPen(pen)
         painter.setBrush(self._brush)
         painter.drawEllipse(self._rect)
 
@@ -168,7 +190,7 @@ class GeoGraphPoint(GeoGraphItem):
             return QPointF(float(fpos.x), float(fpos.y))
         elif self.isFree:
             # 自由点，开启网格吸附
-            gridSize = self.scene().lightGridSize
+            gridSize = self.scene().snapGridSize()
             xGrid, yGrid = pos.x(), pos.y()
             # 若点到网格距离小于1/6的网格大小，则吸附到网格上
             if abs(gridSize / 2 - pos.x() % gridSize) > gridSize / 3:
@@ -194,6 +216,7 @@ class GeoGraphPoint(GeoGraphItem):
         '''在场景中添加的同时初始化标签。子类可覆盖此方法。
         '''
         self._label.setLabel()  # 初始化标签
+        self.updateBatching()
 
     def onRemovingSelfFromScene(self):
         '''在场景中删除时，同时在管理器中删除点图元标签。子类可覆盖此方法。
@@ -201,6 +224,27 @@ class GeoGraphPoint(GeoGraphItem):
         self._label.pointLabelsManager.removeLabel(
             self._label.toPlainText())
 
+    def isDefaultStyle(self) -> bool:
+        '''点图元是否以默认样式显示，即未被选中、可见、不透明且大小与颜色均为默认值。
+        '''
+        return not self.isSelected() and self.isVisible() \
+            and self.opacity() == 1. and self._pointSize == self.POINT_SIZE \
+            and self._borderColor == self.BORDER_COLOR \
+            and self._fillColor == self.FILL_COLOR
+
+    def updateBatching(self):
+        '''若场景开启了点图层，则按样式将本图元加入或移出点图层：
+        默认样式的点图元由点图层批量绘制，其余点图元由自身绘制。
+        '''
+        scene = self.scene()
+        layer = scene.pointLayer() if scene is not None else None
+        if layer is None:
+            return
+        if self.isDefaultStyle():
+            layer.addPoint(self)
+        else:
+            layer.removePoint(self)
+
     def itemChange(self, change, value):
         '''移动点时调用。参见`self._newPosition()`。
         '''
@@ -209,9 +253,35 @@ class GeoGraphPoint(GeoGraphItem):
                 and change == \
                 QGraphicsItem.GraphicsItemChange.ItemPositionChange:
             return self._newPosition(value)
-        elif self.scene() and (self.isFree or self.onPath) and change \
-                == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
-            self.scene().updateItems([self])  # 图元位置变化，递归更新子图元
+        elif change == \
+                QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged \
+                and (self.isFree or self.onPath) \
+                and not (self.scene() and self.scene().isUpdating()):
+            # 用户或程序移动了点，将坐标推送至基础图元，并在下一帧递归更新子图元
+            # 更新中的移动来自基础图元的计算结果，无需推送，否则会使刚计算完的子图元失效
+            self.instance.setPos(value.x(), value.y())
+            if self.scene():
+                # 空间索引中本点的位置须立即更新，否则在下一帧之前绘制的点图层
+                # 会按旧位置查询，从而漏画本点
+                self.scene().itemsManager.updateIndex(self.instance)
+                self.scene().scheduleUpdate(self)
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged \
+                and self.scene():
+            layer = self.scene().pointLayer()
+            if layer is not None and self in layer:
+                layer.movePoint(self, value)  # 同步点图层中的坐标
+        elif change in (
+                QGraphicsItem.GraphicsItemChange.ItemSelectedHasChanged,
+                QGraphicsItem.GraphicsItemChange.ItemVisibleHasChanged,
+                QGraphicsItem.GraphicsItemChange.ItemOpacityHasChanged):
+            self.updateBatching()  # 样式改变，可能需加入或移出点图层
+        if change in (
+                QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged,
+                QGraphicsItem.GraphicsItemChange.ItemVisibleHasChanged) \
+                and self.scene():
+            placer = self.scene().labelsPlacer()
+            if placer is not None:
+                placer.markDirty(self._label)  # 重新布置标签及其附近的标签
         return super().itemChange(change, value)
 
     def pointSize(self) -> float:
@@ -225,6 +295,7 @@ class GeoGraphPoint(GeoGraphItem):
         self._pointSize = size
         self.prepareGeometryChange()  # 修改矩形前要通知场景准备
         self._rect = QRectF(-size / 2, -size / 2, size, size)
+        self.updateBatching()
 
     def borderColor(self) -> QColor:
         '''返回点的描边颜色。
@@ -235,7 +306,9 @@ class GeoGraphPoint(GeoGraphItem):
         '''设置点的描边颜色。
         '''
         self._borderColor = color
+        self._penFinal = QPen(self._penFinal)  # 不修改共用的默认画笔
         self._penFinal.setColor(color)
+        self.updateBatching()
 
     def fillColor(self) -> QColor:
         '''返回点的填充颜色。
@@ -246,4 +319,8 @@ class GeoGraphPoint(GeoGraphItem):
         '''设置点的填充颜色。
         '''
         self._fillColor = color
-        self._brush.setColor(color)
+        self._brush = QBrush(color)
+        self.updateBatching()
+
+
+GeoGraphPoint.typePatterns = frozenset({(GeoGraphPoint,)})
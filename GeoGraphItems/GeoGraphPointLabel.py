@@ -5,21 +5,25 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from PySide6.QtGui import QPainter
     from .GeoPointLabelsManager import GeoPointLabelsManager
 
 from PySide6.QtWidgets import QGraphicsItem, QGraphicsTextItem
-from PySide6.QtGui import QFont, QColor
-from PySide6.QtCore import Qt, QLineF
+from PySide6.QtGui import QFont, QColor, QStaticText, QTransform
+from PySide6.QtCore import Qt, QLineF, QPointF, QRectF
 
 from .GeoGraphItem import GeoGraphItem
-from .Core import GeoItem
 
 __all__ = ['GeoGraphPointLabel']
 
 
-class GeoGraphPointLabel(QGraphicsTextItem):
+class GeoGraphPointLabel(QGraphicsItem):
     '''点图元标签类，是点图元旁的标签。
+    标签以缓存的`QStaticText`绘制，双击时才创建可编辑的文字图元，编辑完成后即删除。
     '''
+    MARGIN = 4.                  # 文字四周的留白，与`QGraphicsTextItem`的文档边距相同
+    TEXT_COLOR = QColor('#000000')  # 字体颜色
+    _font: QFont | None = None   # 所有标签共用的字体，首次使用时创建
 
     def __init__(self, parent: GeoGraphItem):
         '''初始化点图元标签。
@@ -27,31 +31,41 @@ class GeoGraphPointLabel(QGraphicsTextItem):
         :param parent: 待标记的点图元。
         '''
         super().__init__(parent)
-        self.instance = GeoItem()
         self.pointLabelsManager: GeoPointLabelsManager | None = None
-        self._label: str = None
+        self._text: str = ''        # 标签内容
+        self._staticText = QStaticText()  # 缓存字形布局的标签内容
+        self._rect = QRectF()       # 标签所在矩形，仅在内容改变时重新计算
+        self._editor: GeoPointLabelEditor | None = None  # 正在编辑时的文字图元
         self._labelDistance: float = 10.     # 标签与点图元的距离
         self._labelAngle: int | float = -45  # 标签相对于点图元的角度
-        self.setLabelDistance(self._labelDistance)  # 根据距离和角度设置标签位置
-        self.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextEditorInteraction)  # 可编辑的标签
-        self.setDefaultTextColor(QColor('#000000'))      # 字体颜色
-        self.setCursor(Qt.CursorShape.IBeamCursor)         # 鼠标样式
+        self.isAutoPlaced: bool = True  # 场景开启自动布置时，是否由场景选择标签的角度
         self.setFlag(
             QGraphicsItem.GraphicsItemFlag.ItemStacksBehindParent)  # 标签位于点图元下方
-        self.setFont(QFont(None, 18))  # 设置初始字号为18
+
+    @classmethod
+    def font(cls) -> QFont:
+        '''标签的字体，字号为18。
+        '''
+        if cls._font is None:
+            cls._font = QFont(None, 18)
+        return cls._font
+
+    def toPlainText(self) -> str:
+        '''获取标签内容。
+        '''
+        return self._text
 
     def setLabel(self, label: str | None = None) -> bool:
         '''设置标签。
         '''
         if label is None:  # 在`.GeoGraphPoint`中初次设置时保存标签管理器
             self.pointLabelsManager = self.scene().pointLabelsManager
-            self._label = next(self.pointLabelsManager)
-            self.pointLabelsManager.addLabel(self._label)
-            self.setPlainText(self._label)
+            label = next(self.pointLabelsManager)
+            self.pointLabelsManager.addLabel(label)
+            self.setPlainText(label)
             return True
         # 向标签管理器请求修改标签，若成功则修改标签内容，否则保持原标签不变
-        if self.pointLabelsManager.setLabel(self.toPlainText(), label):
+        if self.pointLabelsManager.setLabel(self._text, label):
             self.setPlainText(label)
             return True
         return False
@@ -65,9 +79,8 @@ class GeoGraphPointLabel(QGraphicsTextItem):
         '''设置标签与点图元的距离。
         '''
         self._labelDistance = distance
-        pos = QLineF.fromPolar(distance, self._labelAngle).p2()
-        self._realx, self._realy = pos.x(), pos.y()
         self._updatePos()
+        self._notifyPlacer()
 
     def labelAngle(self) -> float:
         '''获取标签相对于点图元的角度。
@@ -75,60 +88,147 @@ class GeoGraphPointLabel(QGraphicsTextItem):
         return self._labelAngle
 
     def setLabelAngle(self, angle: float):
-        '''设置标签相对于点图元的角度。
+        '''设置标签相对于点图元的角度。修改角度后标签不再被自动布置。
+
+        :param angle: 标签所在角度，使用角度制。
+        '''
+        if int(angle) != self._labelAngle:
+            self.isAutoPlaced = False
+        self.placeAt(angle)
+        self._notifyPlacer()
+
+    def placeAt(self, angle: float):
+        '''将标签放在给定角度处，不改变是否自动布置。供`GeoPointLabelsPlacer`调用。
 
         :param angle: 标签所在角度，使用角度制。
         '''
         self._labelAngle = int(angle)
-        pos = QLineF.fromPolar(self._labelDistance, angle).p2()
-        self._realx, self._realy = pos.x(), pos.y()
         self._updatePos()
 
-    def _updatePos(self):
-        '''按照方向修改位置。
-        '''
-        angle = self.labelAngle() % 360
-        labelWidth = self.boundingRect().width()
-        labelHeight = self.boundingRect().height()
-        halfWidth, halfHeight = labelWidth / 2, labelHeight / 2
+    @staticmethod
+    def anchorAt(angle: float) -> tuple[float, float]:
+        '''标签位于给定角度时，对准点图元的位置在标签中的比例，左上角为(0, 0)，右下角为(1, 1)。
 
+        :param angle: 标签所在角度，使用角度制。
+        '''
+        angle %= 360
         if 337.5 < angle or angle <= 22.5:  # 右侧附近
-            dx, dy = 0, halfHeight
+            return 0., .5
         elif 22.5 < angle <= 67.5:          # 右上附近
-            dx, dy = 0, labelHeight
+            return 0., 1.
         elif 67.5 < angle <= 112.5:         # 上方附近
-            dx, dy = halfWidth, labelHeight
+            return .5, 1.
         elif 112.5 < angle <= 157.5:        # 左上附近
-            dx, dy = labelWidth, labelHeight
+            return 1., 1.
         elif 157.5 < angle <= 202.5:        # 左侧附近
-            dx, dy = labelWidth, halfHeight
+            return 1., .5
         elif 202.5 < angle <= 247.5:        # 左下附近
-            dx, dy = labelWidth, 0
+            return 1., 0.
         elif 247.5 < angle <= 292.5:        # 下方附近
-            dx, dy = halfWidth, 0
+            return .5, 0.
         else:                               # 右下附近
-            dx, dy = 0, 0
-        self.setPos(self._realx - dx, self._realy - dy)  # 以文字中心坐标为原点修改位置
+            return 0., 0.
+
+    def topLeftAt(self, angle: float) -> tuple[float, float]:
+        '''标签位于给定角度时左上角的坐标，在点图元坐标系下。
+        标签按方向以文字的某一边或某一角对准距点图元`self.labelDistance()`处，
+        参见`self.anchorAt()`。
+
+        :param angle: 标签所在角度，使用角度制。
+        '''
+        pos = QLineF.fromPolar(self._labelDistance, angle).p2()
+        xRatio, yRatio = self.anchorAt(angle)
+        return pos.x() - xRatio * self._rect.width(), \
+            pos.y() - yRatio * self._rect.height()
+
+    def _updatePos(self):
+        '''按照方向修改位置，以文字中心坐标为原点。
+        '''
+        self.setPos(*self.topLeftAt(self._labelAngle))
+
+    def _notifyPlacer(self):
+        '''标签的大小或位置被修改后，通知场景的标签布置器重新布置附近的标签。
+        '''
+        scene = self.scene()
+        placer = scene.labelsPlacer() if scene is not None else None
+        if placer is not None:
+            placer.markDirty(self)
 
     def setPlainText(self, text: str):
         '''设置文字，并以文字中心坐标为原点修改位置。
+        文字的字形布局与大小只在此处计算一次。
         '''
-        super().setPlainText(text)
+        self._text = text
+        self._staticText.setText(text)
+        self._staticText.prepare(QTransform(), self.font())
+        size = self._staticText.size()
+        self.prepareGeometryChange()
+        self._rect = QRectF(
+            0, 0, size.width() + self.MARGIN * 2,
+            size.height() + self.MARGIN * 2)
         self._updatePos()  # 使标签以文字中心坐标为原点
+        self._notifyPlacer()
+
+    def boundingRect(self):
+        '''标签所在矩形，包含文字四周的留白。
+        '''
+        return self._rect
 
-    def focusInEvent(self, event):
-        '''聚焦时，缓存当前标签。
+    def paint(self, painter: QPainter, option, widget=None):
+        '''绘制标签。正在编辑或细节层次低于场景的`labelLodThreshold`时不绘制。
+        '''
+        if self._editor is None \
+                and option.levelOfDetailFromTransform(
+                    painter.worldTransform()) \
+                >= self.scene().labelLodThreshold:
+            painter.setFont(self.font())
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawStaticText(
+                QPointF(self.MARGIN, self.MARGIN), self._staticText)
+
+    def mouseDoubleClickEvent(self, event):
+        '''双击时创建可编辑的文字图元，覆盖在标签上编辑标签。
+        '''
+        if self._editor is None:
+            self._editor = GeoPointLabelEditor(self)
+            self.update()
+        self._editor.setFocus(Qt.FocusReason.MouseFocusReason)
+        event.accept()
+
+    def finishEditing(self):
+        '''编辑完成后，判断修改的标签是否合法，若不合法则保持原标签不变。
+        随后删除用于编辑的文字图元。由`GeoPointLabelEditor`在取消聚焦时调用。
         '''
-        super().focusInEvent(event)
-        self._label = self.toPlainText()
+        editor, self._editor = self._editor, None
+        if editor is None:
+            return
+        text = editor.toPlainText()
+        if text != self._text and \
+                self.pointLabelsManager.setLabel(self._text, text):
+            self.setPlainText(text)
+        editor.hide()
+        editor.deleteLater()
+        self.update()
+
+
+class GeoPointLabelEditor(QGraphicsTextItem):
+    '''编辑点图元标签时临时创建的文字图元，与标签重合。
+    '''
+
+    def __init__(self, label: GeoGraphPointLabel):
+        '''初始化文字图元。
+
+        :param label: 正在编辑的标签。
+        '''
+        super().__init__(label.toPlainText(), label)
+        self.setFont(label.font())
+        self.setDefaultTextColor(label.TEXT_COLOR)
+        self.setTextInteractionFlags(
+            Qt.TextInteractionFlag.TextEditorInteraction)  # 可编辑的标签
+        self.setCursor(Qt.CursorShape.IBeamCursor)           # 鼠标样式
 
     def focusOutEvent(self, event):
-        '''取消聚焦时，判断修改的标签是否合法。
-        若不合法，则将修改的标签重新改为缓存的原标签（`self._label`）。
+        '''取消聚焦时结束编辑。
         '''
         super().focusOutEvent(event)
-        if not self.pointLabelsManager.setLabel(
-                self._label, self.toPlainText()):
-            self.setPlainText(self._label)  # 改回原标签
-        else:
-            self._updatePos()  # 文字更新后，使标签以文字中心坐标为原点
+        self.parentItem().finishEditing()
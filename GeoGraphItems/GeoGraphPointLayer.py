@@ -0,0 +1,166 @@
+'''GeoGrapher点图层
+'''
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PySide6.QtGui import QPainter
+    from .GeoGraphPoint import GeoGraphPoint
+
+from PySide6.QtWidgets import QGraphicsItem
+from PySide6.QtGui import QPen, QPolygonF, QPainterPath
+from PySide6.QtCore import Qt, QPointF, QRectF
+
+__all__ = ['GeoGraphPointLayer']
+
+
+class GeoGraphPointLayer(QGraphicsItem):
+    '''点图层，以一次批量绘制代替逐个绘制默认样式的点图元。
+    图层中的点图元不再单独绘制，但仍单独响应选中与拖动；
+    选中或修改了样式的点图元移出图层，由自身绘制。参见`GeoGraphPoint.updateBatching()`。
+    '''
+
+    def __init__(self, pointSize: float, penWidth: float,
+                 borderColor, fillColor):
+        '''初始化点图层。
+
+        :param pointSize: 点的大小，在场景坐标系下。
+        :param penWidth: 描边宽度，以像素为单位。
+        :param borderColor: 描边颜色。
+        :param fillColor: 填充颜色。
+        '''
+        super().__init__()
+        self._pointSize = pointSize
+        self._penWidth = penWidth
+        self._points: list[GeoGraphPoint] = []     # 图层中的点图元
+        self._rows: dict[GeoGraphPoint, int] = {}  # 点图元到所在行号的映射
+        self._positions = QPolygonF()  # 各行点图元的坐标，逐帧整体交给画家绘制
+        self._rect = QRectF()          # 只增不减的图层矩形
+        # 以圆头画笔绘制点：先以描边颜色画外圆，再以填充颜色画内圆
+        self._penBorder = QPen(borderColor)
+        self._penFill = QPen(fillColor)
+        for pen in (self._penBorder, self._penFill):
+            pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        self._penPixel = QPen(borderColor, 0)  # 细节层次低时每个点只画一个像素
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        self.setFlag(  # 使`option.exposedRect`为需重绘的区域
+            QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+        self.setZValue(-.5)  # 位于路径图元上方、单独绘制的点图元下方
+
+    def __len__(self) -> int:
+        '''图层中点图元的个数。
+        '''
+        return len(self._points)
+
+    def __contains__(self, point: GeoGraphPoint) -> bool:
+        '''点图元是否在图层中。
+        '''
+        return point in self._rows
+
+    def addPoint(self, point: GeoGraphPoint):
+        '''将点图元加入图层，此后点图元不再单独绘制。
+        '''
+        if point in self._rows:
+            return
+        self._rows[point] = len(self._points)
+        self._points.append(point)
+        self._positions.append(point.scenePos())
+        point.setFlag(QGraphicsItem.GraphicsItemFlag.ItemHasNoContents)
+        self._include(point.scenePos())
+        self.update()
+
+    def removePoint(self, point: GeoGraphPoint):
+        '''将点图元移出图层，由其自身绘制。以最后一行填补空出的行。
+        '''
+        row = self._rows.pop(point, None)
+        if row is None:
+            return
+        last = self._points.pop()
+        if last is not point:
+            self._points[row] = last
+            self._rows[last] = row
+            self._positions[row] = self._positions.at(len(self._points))
+        self._positions.removeLast()
+        point.setFlag(
+            QGraphicsItem.GraphicsItemFlag.ItemHasNoContents, False)
+        self.update()
+
+    def clear(self):
+        '''将所有点图元移出图层。
+        '''
+        for point in self._points.copy():
+            self.removePoint(point)
+
+    def movePoint(self, point: GeoGraphPoint, pos: QPointF):
+        '''更新图层中点图元的坐标。由点图元在位置改变后调用。
+
+        :param pos: 新坐标，在场景坐标系下。
+        '''
+        self._positions[self._rows[point]] = pos
+        self._include(pos)
+        self.update()
+
+    def _include(self, pos: QPointF):
+        '''扩大图层矩形以包含给定坐标处的点。矩形只增不减，避免每次移动都重建场景索引。
+        '''
+        if self._rect.contains(pos):
+            return
+        # 描边为装饰画笔，与点图元相同，其宽度按场景坐标计入，视图重绘时另留有余量
+        margin = (self._pointSize + self._penWidth) / 2
+        self.prepareGeometryChange()
+        self._rect = self._rect.united(QRectF(
+            pos.x() - margin, pos.y() - margin, margin * 2, margin * 2))
+
+    def _positionsIn(self, rect: QRectF, lod: float) -> QPolygonF:
+        '''图层中位于给定区域附近的点图元的坐标，由场景图元管理器的空间索引查询。
+
+        :param lod: 绘制时的细节层次，描边宽度以像素为单位，需按其换算为场景坐标。
+        '''
+        margin = self._pointSize / 2 + self._penWidth / 2 / lod
+        scene = self.scene()
+        positions = QPolygonF()
+        for handle in scene.itemsManager.inRect((
+                rect.left() - margin, rect.top() - margin,
+                rect.right() + margin, rect.bottom() + margin)):
+            row = self._rows.get(scene.itemByHandle(handle))
+            if row is not None:
+                positions.append(self._positions.at(row))
+        return positions
+
+    def boundingRect(self):
+        '''图层矩形，包含图层中的所有点图元。
+        '''
+        return self._rect
+
+    def shape(self):
+        '''图层不参与命中测试，点图元仍由自身响应鼠标事件。
+        '''
+        return QPainterPath()
+
+    def paint(self, painter: QPainter, option, widget=None):
+        '''以一次`drawPoints()`绘制图层中的所有点图元，与`GeoGraphPoint.paint()`效果相同。
+        需重绘的区域远小于图层时，只绘制该区域附近的点图元。
+        '''
+        positions = self._positions
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        exposed = option.exposedRect
+        if painter.hasClipping():  # `QGraphicsScene.render()`只以裁剪限制绘制区域
+            exposed = exposed.intersected(painter.clipBoundingRect())
+        if exposed.width() * exposed.height() * 4 \
+                < self._rect.width() * self._rect.height():
+            positions = self._positionsIn(exposed, lod)
+        if positions.isEmpty():
+            return
+        if lod < self.scene().pointLodThreshold:
+            painter.setPen(self._penPixel)
+            painter.drawPoints(positions)
+            return
+        width = self._penWidth / lod  # 描边宽度，在场景坐标系下
+        self._penBorder.setWidthF(self._pointSize + width)
+        painter.setPen(self._penBorder)
+        painter.drawPoints(positions)
+        if self._pointSize > width:
+            self._penFill.setWidthF(self._pointSize - width)
+            painter.setPen(self._penFill)
+            painter.drawPoints(positions)
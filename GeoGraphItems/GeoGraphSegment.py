@@ -2,6 +2,7 @@
 '''
 
 from PySide6.QtGui import QPainterPath
+from PySide6.QtCore import QPointF, QRectF
 
 from .GeoGraphItem import GeoGraphPathItem
 from .GeoGraphPoint import GeoGraphPoint
@@ -13,13 +14,13 @@ __all__ = ['GeoGraphSegment']
 class GeoGraphSegment(GeoGraphPathItem):
     '''线段图元类。线段图元由两端点定义。
     '''
+    typePatterns = frozenset({(GeoGraphPoint, GeoGraphPoint)})
 
     def __init__(self):
         '''初始化线段图元。
         '''
         super().__init__()
         self.instance = GeoSegment()
-        self.typePatterns = {(GeoGraphPoint, GeoGraphPoint)}
 
     def __str__(self):
         '''返回线段图元的标识字符串。
@@ -32,14 +33,42 @@ class GeoGraphSegment(GeoGraphPathItem):
         return f'{self._masters[0].shortIdentifier()
                   }-{self._masters[1].shortIdentifier()}'
 
-    def rawShape(self):
-        '''原始路径形状，不具有选中范围。
+    def _endpoints(self) -> tuple[QPointF, QPointF]:
+        '''线段的两端点，在图元坐标系下。正在创建时，第二个端点为鼠标位置。
         '''
         firstPointPos = self.mapFromScene(self._masters[0].pos())
         secondPointPos = self.mapFromScene(
-            self._mousePos() if len(self._masters) == 1
+            self._previewPos if len(self._masters) == 1
             else self._masters[1].pos())
+        return firstPointPos, secondPointPos
+
+    def _newRawShape(self):
+        '''构造原始路径形状，不具有选中范围。
+        '''
+        firstPointPos, secondPointPos = self._endpoints()
         path = QPainterPath()
         path.moveTo(firstPointPos)
         path.lineTo(secondPointPos)
         return path
+
+    def _newBoundingRect(self):
+        '''以两端点所在矩形向外扩展余量，作为图元的矩形。参见`self.boundingMargin()`。
+        '''
+        margin = self.boundingMargin()
+        return QRectF(*self._endpoints()).normalized().adjusted(
+            -margin, -margin, margin, margin)
+
+    def pathDistance(self, pos: QPointF) -> float:
+        '''给定点到线段的距离。
+        '''
+        return self._distanceToSegment(pos, *self._endpoints())
+
+    def pathPoint(self) -> QPointF:
+        '''线段的第一个端点。
+        '''
+        return self._endpoints()[0]
+
+    def edgeDistance(self, a: QPointF, b: QPointF) -> float:
+        '''线段ab到本线段的距离。
+        '''
+        return self._segmentsDistance(a, b, *self._endpoints())
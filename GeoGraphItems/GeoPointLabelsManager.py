@@ -1,18 +1,42 @@
 '''GeoGrapher点图元标签管理器
 '''
 
+import heapq
+import re
+
 __all__ = ['GeoPointLabelsManager']
 
 
 class GeoPointLabelsManager:
     '''点图元标签管理类。
     '''
+    LABEL_PATTERN = re.compile(r'([A-Z])(?:_([1-9][0-9]*))?')  # 自动生成的标签
 
     def __init__(self):
         '''初始化标签管理器。
         标签管理器存储于场景对象中，一个场景只有一个标签管理器。
         '''
         self._labels: set[str] = set()  # 已知标签集
+        # 自动生成的标签按顺序编号：`A'为0，`Z'为25，`A_1'为26，以此类推
+        self._cursor: int = 0  # 编号小于此值的标签均已使用，或其编号在`self._released`中
+        self._released: list[int] = []  # 编号小于游标的空闲标签的编号，为最小堆，可能含已使用的编号
+
+    @staticmethod
+    def labelAt(ordinal: int) -> str:
+        '''给定编号对应的自动生成的标签。
+        '''
+        numberAt, letterAt = divmod(ordinal, 26)
+        return chr(65 + letterAt) + ('_' + str(numberAt) if numberAt else '')
+
+    @classmethod
+    def ordinalOf(cls, label: str) -> int | None:
+        '''给定标签的编号，不是自动生成的标签时返回`None`。
+        '''
+        match = cls.LABEL_PATTERN.fullmatch(label)
+        if match is None:
+            return None
+        letter, number = match.groups()
+        return (int(number) if number else 0) * 26 + ord(letter) - 65
 
     def __next__(self) -> str:
         '''获取下一个点图元标签。
@@ -20,20 +44,28 @@ class GeoPointLabelsManager:
         且不会被自动添加到已知标签集中。
 
         标签从`A'开始，一直到`Z'；`Z'之后是`A_1'、`B_1'、……以此类推。
-        函数按以上规则从`A'开始枚举标签，
-        直到某个标签不与已知标签集中的标签重复。
+        函数返回按以上规则排列的第一个不与已知标签集中的标签重复的标签。
+        优先取已释放的最小编号，否则从游标向后查找，游标只增不减，故均摊复杂度为O(log n)。
         '''
-        label = 'A'
-        letterAt = numberAt = 0
+        released = self._released
+        while released:
+            label = self.labelAt(released[0])
+            if label not in self._labels:
+                return label
+            heapq.heappop(released)  # 释放后又被使用的编号
+        label = self.labelAt(self._cursor)
         while label in self._labels:  # 保证不重复
-            letterAt += 1
-            if letterAt == 26:
-                letterAt = 0
-                numberAt += 1
-            label = chr(65 + letterAt) + (  # 生成下一个标签
-                '_' + str(numberAt) if numberAt else '')
+            self._cursor += 1
+            label = self.labelAt(self._cursor)
         return label
 
+    def _release(self, label: str):
+        '''标签被删除后，若其编号小于游标，则记录为空闲编号。
+        '''
+        ordinal = self.ordinalOf(label)
+        if ordinal is not None and ordinal < self._cursor:
+            heapq.heappush(self._released, ordinal)
+
     def addLabel(self, label: str) -> bool:
         '''向已知标签集中添加标签，返回是否成功。
         若添加的标签不在已知标签集中，则成功。
@@ -52,6 +84,8 @@ class GeoPointLabelsManager:
                 label not in self._labels or label == raw):
             self._labels.remove(raw)
             self._labels.add(label)
+            if label != raw:
+                self._release(raw)
             return True
         return False
 
@@ -61,5 +95,6 @@ class GeoPointLabelsManager:
         '''
         if label in self._labels:
             self._labels.remove(label)
+            self._release(label)
             return True
         return False
@@ -0,0 +1,224 @@
+'''GeoGrapher点图元标签自动布置器
+'''
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Core import GeoItemsManager
+
+import math
+import time
+
+from PySide6.QtCore import QTimer, QLineF
+
+from .GeoGraphPointLabel import GeoGraphPointLabel
+
+__all__ = ['GeoPointLabelsPlacer']
+
+Rect = tuple[float, float, float, float]  # 矩形的左、上、右、下坐标，在场景坐标系下
+
+
+class GeoPointLabelsPlacer:
+    '''点图元标签自动布置器。为每个标签在点图元周围的八个方向中选择代价最小的一个，
+    代价为候选位置与已布置的标签、以及与点和路径等图元重叠的程度。
+    已布置的标签存储于网格索引中，其它图元通过图元管理器的空间索引查询。
+
+    布置是增量的：只重新布置被标记的标签，即移动了的点图元的标签及其附近的标签；
+    每次布置限时`self.budget`秒，未完成的部分在下一次事件循环中继续，不阻塞绘制。
+    '''
+    CELL_SIZE = 64.          # 网格索引的网格大小
+    ANGLES = range(0, 360, 45)  # 候选方向，即`GeoGraphPointLabel.topLeftAt()`区分的八个方向
+    DEFAULT_ANGLE = -45      # 代价相同时优先的方向，即标签的默认方向
+    LABEL_COST = 4.          # 与一个已布置的标签重叠的代价
+    ITEM_COST = 1.           # 与一个图元相交的代价
+    TURN_COST = .01          # 偏离默认方向每45度的代价
+    # 从各方向开始，按偏离该方向由小到大排列的候选方向序号
+    _ORDERS = [sorted(range(8), key=lambda i, start=start: min(
+        (i - start) % 8, (start - i) % 8)) for start in range(8)]
+
+    def __init__(self, itemsManager: GeoItemsManager, budget: float = .008):
+        '''初始化标签布置器。
+
+        :param itemsManager: 场景的图元管理器，用于查询候选位置附近的图元。
+        :param budget: 每次布置的时间预算，以秒为单位。
+        '''
+        self._itemsManager = itemsManager
+        self.budget = budget
+        self._cells: dict[tuple[int, int], set[GeoGraphPointLabel]] = {}
+        self._rects: dict[GeoGraphPointLabel, Rect] = {}  # 已布置的标签所在矩形
+        self._dirty: dict[GeoGraphPointLabel, None] = {}  # 待布置的标签，按标记顺序排列
+        # 按标签距离缓存的各候选方向的对准点、对准点在标签中的比例与代价
+        self._anchorsCache: dict[
+            float, list[tuple[int, float, float, float, float, float]]] = {}
+        self.placedCount = 0  # 布置标签的总次数，供性能统计
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.place)
+
+    def __len__(self) -> int:
+        '''已布置的标签个数。
+        '''
+        return len(self._rects)
+
+    def _cellsOf(self, rect: Rect):
+        '''与矩形相交的所有网格。
+        '''
+        left, top, right, bottom = rect
+        size = self.CELL_SIZE
+        for i in range(math.floor(left / size), math.floor(right / size) + 1):
+            for j in range(
+                    math.floor(top / size), math.floor(bottom / size) + 1):
+                yield i, j
+
+    def _labelsIn(self, rect: Rect) -> set[GeoGraphPointLabel]:
+        '''所在矩形与给定矩形相交的所有已布置的标签。
+        '''
+        left, top, right, bottom = rect
+        labels = set()
+        for cell in self._cellsOf(rect):
+            for label in self._cells.get(cell, ()):
+                l, t, r, b = self._rects[label]
+                if l < right and left < r and t < bottom and top < b:
+                    labels.add(label)
+        return labels
+
+    def _index(self, label: GeoGraphPointLabel, rect: Rect):
+        '''在网格索引中记录标签所在矩形。
+        '''
+        self._rects[label] = rect
+        for cell in self._cellsOf(rect):
+            self._cells.setdefault(cell, set()).add(label)
+
+    def _unindex(self, label: GeoGraphPointLabel) -> Rect | None:
+        '''在网格索引中删除标签，返回其原来所在的矩形。
+        '''
+        rect = self._rects.pop(label, None)
+        if rect is not None:
+            for cell in self._cellsOf(rect):
+                labels = self._cells[cell]
+                labels.discard(label)
+                if not labels:
+                    del self._cells[cell]
+        return rect
+
+    @staticmethod
+    def _reach(label: GeoGraphPointLabel) -> Rect:
+        '''包含标签所有候选位置的矩形。
+        '''
+        point = label.parentItem()
+        rect = label.boundingRect()
+        dx = label.labelDistance() + rect.width()
+        dy = label.labelDistance() + rect.height()
+        return point.x() - dx, point.y() - dy, point.x() + dx, point.y() + dy
+
+    def markDirty(self, label: GeoGraphPointLabel):
+        '''标记标签待重新布置，同时标记其原位置与新候选位置附近的标签。
+        由标签或点图元在大小、位置或可见性改变后调用。
+        '''
+        for rect in (self._unindex(label), self._reach(label)):
+            if rect is not None:
+                for neighbour in self._labelsIn(rect):
+                    self._dirty[neighbour] = None
+        self._dirty[label] = None
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def removeLabel(self, label: GeoGraphPointLabel):
+        '''删除标签。其原位置附近的标签在下次布置时可能有更好的位置。
+        '''
+        self._dirty.pop(label, None)
+        rect = self._unindex(label)
+        if rect is not None:
+            for neighbour in self._labelsIn(rect):
+                self._dirty[neighbour] = None
+            self._timer.start()
+
+    def clear(self):
+        '''删除所有标签。
+        '''
+        self._timer.stop()
+        self._cells.clear()
+        self._rects.clear()
+        self._dirty.clear()
+
+    def place(self, budget: float | None = None) -> bool:
+        '''按标记顺序布置待布置的标签，直到全部完成或超出时间预算。
+
+        :param budget: 时间预算，以秒为单位，默认为`self.budget`。
+        :returns: 是否已全部完成。
+        '''
+        self._timer.stop()
+        deadline = time.perf_counter() + (
+            self.budget if budget is None else budget)
+        while self._dirty:
+            label = next(iter(self._dirty))
+            del self._dirty[label]
+            self._place(label)
+            if time.perf_counter() > deadline:
+                break
+        if self._dirty:
+            self._timer.start()  # 在下一次事件循环中继续
+            return False
+        return True
+
+    def _candidates(self, label: GeoGraphPointLabel) \
+            -> list[tuple[int, float, float, float]]:
+        '''标签的候选方向，及标签位于各方向时左上角的坐标（在点图元坐标系下）与偏离默认方向的代价。
+        对准点与代价只与标签距离有关，按距离缓存，其取值有限；
+        左上角的坐标再由标签大小计算，与`GeoGraphPointLabel.topLeftAt()`相同。
+        '''
+        distance = label.labelDistance()
+        anchors = self._anchorsCache.get(distance)
+        if anchors is None:
+            anchors = self._anchorsCache[distance] = [
+                (angle, *QLineF.fromPolar(distance, angle).p2().toTuple(),
+                 *GeoGraphPointLabel.anchorAt(angle),
+                 self.TURN_COST * (min(
+                     (angle - self.DEFAULT_ANGLE) % 360,
+                     (self.DEFAULT_ANGLE - angle) % 360) // 45))
+                for angle in self.ANGLES]
+        rect = label.boundingRect()
+        width, height = rect.width(), rect.height()
+        return [(angle, x - xRatio * width, y - yRatio * height, cost)
+                for angle, x, y, xRatio, yRatio, cost in anchors]
+
+    def _place(self, label: GeoGraphPointLabel):
+        '''为标签选择代价最小的方向。未开启自动布置的标签保持原方向，只记录其位置。
+        '''
+        self._unindex(label)
+        point = label.parentItem()
+        if point.scene() is None or not label.isVisible():
+            return
+        self.placedCount += 1
+        x, y = point.x(), point.y()
+        rect = label.boundingRect()
+        width, height = rect.width(), rect.height()
+        if not label.isAutoPlaced:
+            left, top = label.topLeftAt(label.labelAngle())
+            self._index(label, (
+                x + left, y + top, x + left + width, y + top + height))
+            return
+        # 可能与候选位置重叠的标签只需查询一次网格索引
+        neighbours = [self._rects[other]
+                      for other in self._labelsIn(self._reach(label))]
+        candidates = self._candidates(label)
+        handle = point.instance.handle()
+        best, bestCost, bestRect = None, math.inf, None
+        # 从当前方向开始比较，代价相同时保持当前方向，避免标签来回跳动
+        for i in self._ORDERS[round(label.labelAngle() / 45) % 8]:
+            angle, left, top, cost = candidates[i]
+            l, t = x + left, y + top
+            r, b = l + width, t + height
+            cost += self.LABEL_COST * sum(
+                l < right and left_ < r and t < bottom and top_ < b
+                for left_, top_, right, bottom in neighbours)
+            if cost >= bestCost:
+                continue  # 图元的查询较慢，已不可能更优时跳过
+            items = self._itemsManager.inRect((l, t, r, b))
+            cost += self.ITEM_COST * (len(items) - (handle in items))
+            if cost < bestCost:
+                best, bestCost, bestRect = angle, cost, (l, t, r, b)
+        if best != label.labelAngle() % 360:
+            label.placeAt(best)
+        self._index(label, bestRect)
@@ -5,24 +5,25 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from PySide6.QtGui import QPainter
     from PySide6.QtCore import QPointF, QRect, QRectF
     from .GeoGraphView import GeoGraphView
 
-import collections
+import math
 
-from PySide6.QtWidgets import QGraphicsScene
-from PySide6.QtGui import QPen, QColor
-from PySide6.QtCore import QLine
+from PySide6.QtWidgets import QGraphicsScene, QGraphicsView
+from PySide6.QtGui import QPen, QColor, QBrush, QPixmap, QPainter, QTransform
+from PySide6.QtCore import Qt, QLineF, QTimer
 
 from .GeoGraphItems.GeoGraphItem import GeoGraphItem, GeoGraphPathItem
 from .GeoGraphItems.GeoGraphPoint import GeoGraphPoint
+from .GeoGraphItems.GeoGraphPointLayer import GeoGraphPointLayer
 from .GeoGraphItems.GeoGraphCircle import GeoGraphCircle
 from .GeoGraphItems.GeoGraphIntersection import GeoGraphIntersection
 from .GeoGraphItems.GeoGraphVariable import GeoGraphIsecNoVar
 from .GeoGraphItems.GeoPointLabelsManager import GeoPointLabelsManager
+from .GeoGraphItems.GeoPointLabelsPlacer import GeoPointLabelsPlacer
 from .GeoGraphItems.Core import (
-    DecFloat, PointPos, intersec, distanceTo, GeoItemsManager)
+    DecFloat, PointPos, intersec, distanceTo, GeoItemsManager, GeoPrecision)
 
 
 __all__ = ['GeoGraphScene']
@@ -32,30 +33,62 @@ class GeoGraphScene(QGraphicsScene):
     '''GeoGrapher绘制场景。使用方法与`QGraphicsScene`基本相同。
     '''
 
+    GRID_BRUSHES_LIMIT = 16  # 最多缓存的网格纹理数，超出时淘汰最久未使用的
+
     def __init__(
             self, parent=None,
             darkGridSize=128, darkPenColor='#c0c0c0', darkPenWidth=1.2,
             lightGridSize=32, lightPenColor='#d0d0d0', lightPenWidth=.5,
-            backgroundColor='#f1f1f1'):
+            backgroundColor='#f1f1f1', labelLodThreshold=.4,
+            pointLodThreshold=.2, lightGridLodThreshold=.2):
         '''初始化场景。
 
         :param parent: 父控件。
-        :param darkGridSize: 深色网格大小。
+        :param darkGridSize: 放缩比例为1时的深色网格大小。
         :param darkPenColor: 深色网格颜色。
-        :param darkPenWidth: 深色网格粗细。
-        :param lightGridSize: 浅色网格大小。
+        :param darkPenWidth: 深色网格粗细，以像素为单位。
+        :param lightGridSize: 放缩比例为1时的浅色网格大小。
         :param lightPenColor: 浅色网格颜色。
-        :param lightPenWidth: 浅色网格粗细。
+        :param lightPenWidth: 浅色网格粗细，以像素为单位。
         :param backgroundColor: 背景颜色。
+        :param labelLodThreshold: 细节层次低于此值时不绘制点标签。
+        :param pointLodThreshold: 细节层次低于此值时点只绘制为一个像素。
+        :param lightGridLodThreshold: 细节层次低于此值时不绘制浅色网格。
         '''
         super().__init__(parent)
         self.lightGridSize, self.darkGridSize = lightGridSize, darkGridSize
-        self.zoomScale = 1.        # 当前放缩比例
-        self.tempScale = 1.        # 缓存放缩比例，用于管理网格宽度
+        # 细节层次（即视图的放缩比例）的阈值，低于阈值时简化绘制
+        self.labelLodThreshold = labelLodThreshold
+        self.pointLodThreshold = pointLodThreshold
+        self.lightGridLodThreshold = lightGridLodThreshold
         self.itemsManager = GeoItemsManager()  # 统一管理基础图元
+        # 交互场景默认使用双精度计算，导出或验证时可切换，见`self.setPrecision()`
+        self.itemsManager.setPrecision(GeoPrecision.DOUBLE)
+        # 使用所有硬件线程重新计算，同层图元较少时仍只在主线程计算
+        self.itemsManager.setThreadCount(0)
+        # 图元编号到图元的映射，编号由`self.itemsManager`分配
+        self._itemsByHandle: dict[int, GeoGraphItem] = {}
+        self._isUpdating = False   # 是否正在更新图元
+        self._isMovingItems = False  # 是否正在由鼠标拖动移动选中的图元
+        self._movingScale = 1.  # 拖动图元的视图的放缩比例，用于自由点的网格吸附
+        # 拖动时待更新的图元，由`self._updateTimer`每帧合并为一次`self.updateItems()`
+        self._pendingItems: set[GeoGraphItem] = set()
+        self._scheduledUpdates = 0  # 自上次更新以来`self.scheduleUpdate()`的调用次数
+        self.coalescedUpdates = 0   # 被合并而未单独更新的次数，供性能统计
+        self._updateTimer = QTimer(self)
+        self._updateTimer.setSingleShot(True)
+        self._updateTimer.timeout.connect(self.flushUpdates)
+        self.setMaxUpdateRate(60)
         self.pointLabelsManager = GeoPointLabelsManager()  # 点图元标签
+        self._pointLayer: GeoGraphPointLayer | None = None  # 批量绘制点图元的图层
+        self._labelsPlacer: GeoPointLabelsPlacer | None = None  # 标签自动布置器
         self._penDark = QPen(QColor(darkPenColor), darkPenWidth)     # 深色画笔
         self._penLight = QPen(QColor(lightPenColor), lightPenWidth)  # 浅色画笔
+        self._penDark.setCosmetic(True)
+        self._penLight.setCosmetic(True)
+        # 以一个深色网格为图块的网格纹理，平移及小幅放缩时直接复用
+        # 键为浅色与深色网格大小、图块的像素大小与是否绘制浅色网格，按最近使用的顺序排列
+        self._gridBrushes: dict[tuple[int, int, int, bool], QBrush] = {}
         self.setBackgroundBrush(QColor(backgroundColor))
 
     def views(self) -> list[GeoGraphView]:
@@ -64,62 +97,145 @@ class GeoGraphScene(QGraphicsScene):
         return super().views()
 
     def drawBackground(self, painter: QPainter, rect: QRect | QRectF):
-        '''绘制背景网格。
+        '''绘制背景网格。以缓存的网格图块平铺，平移时不重新绘制网格线。
         '''
         super().drawBackground(painter, rect)
-        left = int(rect.left()) - int(rect.left()) % self.lightGridSize
-        top = int(rect.top()) - int(rect.top()) % self.lightGridSize
-        right, bottom = int(rect.right()), int(rect.bottom())
-        linesDark, linesLight = [], []
-        for i in range(top, bottom, self.lightGridSize):
-            (linesLight if i % self.darkGridSize
-                else linesDark).append(QLine(left, i, right, i))
-        for i in range(left, right, self.lightGridSize):
-            (linesLight if i % self.darkGridSize
-                else linesDark).append(QLine(i, bottom, i, top))
-        painter.setPen(self._penLight)
-        if linesLight:
-            painter.drawLines(linesLight)
-        painter.setPen(self._penDark)
-        if linesDark:
-            painter.drawLines(linesDark)
-
-    def zoomScaleChanged(self, zoomChange: float):
-        '''放缩比例变化。
-
-        :param zoomChange: 新放缩比例与原放缩比例的比值。
-        '''
-        # 更新网格画笔宽度
-        self._penDark.setWidthF(
-            self._penDark.widthF() / zoomChange)
-        self._penLight.setWidthF(
-            self._penLight.widthF() / zoomChange)
-        self.zoomScale *= zoomChange
-        self.tempScale *= zoomChange
-        # 更新网格宽度
-        while self.tempScale >= 2 and self.lightGridSize % 2 == 0:
-            self.tempScale /= 2
-            self.lightGridSize //= 2
-            self.darkGridSize //= 2
-        while self.tempScale <= .5:
-            self.tempScale *= 2
-            self.lightGridSize *= 2
-            self.darkGridSize *= 2
-        for item in self.items():
-            if isinstance(item, GeoGraphItem):
-                item.zoomScaleChanged(zoomChange)
-
-    def createPointAt(self, scenePos: QPointF) -> GeoGraphPoint:
+        scale = painter.worldTransform().m11()  # 正在绘制的视图的放缩比例
+        lightGridSize, tileSize = self.gridSizes(scale)
+        # 图块的像素大小取整，平滑放缩时只在其改变时才绘制新的图块
+        pixelSize = max(1, round(tileSize * scale))
+        key = (lightGridSize, tileSize, pixelSize,
+               scale >= self.lightGridLodThreshold)
+        brush = self._gridBrushes.pop(key, None)
+        if brush is None:
+            if len(self._gridBrushes) >= self.GRID_BRUSHES_LIMIT:
+                del self._gridBrushes[next(iter(self._gridBrushes))]
+            brush = self._newGridBrush(*key)
+        self._gridBrushes[key] = brush  # 重新插入，使字典按最近使用的顺序排列
+        painter.fillRect(rect, brush)
+
+    def gridSizes(self, scale: float) -> tuple[int, int]:
+        '''给定放缩比例下的浅色与深色网格大小。
+        网格大小随放缩比例成倍变化，使浅色网格在视图中的大小约为放缩比例为1时的大小。
+
+        :param scale: 视图的放缩比例。
+        :returns: 浅色与深色网格大小。
+        '''
+        light, dark = self.lightGridSize, self.darkGridSize
+        level = round(-math.log2(scale))
+        for _ in range(level):
+            light, dark = light * 2, dark * 2
+        for _ in range(-level):
+            if light % 2:
+                break
+            light, dark = light // 2, dark // 2
+        return light, dark
+
+    def snapGridSize(self) -> int:
+        '''自由点吸附的网格大小，即拖动图元的视图中浅色网格的大小。
+        不在拖动中时按放缩比例为1计算。
+        '''
+        return self.gridSizes(self._movingScale)[0]
+
+    def _newGridBrush(
+            self, lightGridSize: int, tileSize: int, pixelSize: int,
+            drawLight: bool = True) -> QBrush:
+        '''绘制一个深色网格大小的图块，作为网格纹理。
+        图块按视图中的像素大小绘制，故放大后网格线仍然清晰。
+        图块左上角位于场景原点，与网格对齐；边缘上的网格线在图块两侧各画一半。
+
+        像素大小由`tileSize * scale`取整得到，画刷的变换将其映射回场景坐标系，
+        故图块在视图中被放缩至多半个像素。视图未开启`SmoothPixmapTransform`，
+        纹理按最近邻采样，网格线不会模糊，但个别网格线可能偏移一个像素。
+
+        :param lightGridSize: 浅色网格大小。
+        :param tileSize: 深色网格大小，即图块在场景中的大小。
+        :param pixelSize: 图块的像素大小。
+        :param drawLight: 是否绘制浅色网格。
+        :returns: 以图块为纹理的画刷，其变换将图块映射到场景坐标系。
+        '''
+        tile = QPixmap(pixelSize, pixelSize)
+        tile.fill(Qt.GlobalColor.transparent)
+        tilePainter = QPainter(tile)
+        tilePainter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        tilePainter.scale(pixelSize / tileSize, pixelSize / tileSize)
+        if drawLight:
+            tilePainter.setPen(self._penLight)
+            tilePainter.drawLines([
+                line for i in range(lightGridSize, tileSize, lightGridSize)
+                for line in (
+                    QLineF(i, 0, i, tileSize), QLineF(0, i, tileSize, i))
+            ])
+        tilePainter.setPen(self._penDark)
+        tilePainter.drawLines([
+            line for i in (0, tileSize)
+            for line in (QLineF(i, 0, i, tileSize), QLineF(0, i, tileSize, i))
+        ])
+        tilePainter.end()
+        brush = QBrush(tile)
+        brush.setTransform(QTransform.fromScale(
+            tileSize / pixelSize, tileSize / pixelSize))
+        return brush
+
+    def pointLayer(self) -> GeoGraphPointLayer | None:
+        '''批量绘制默认样式的点图元的点图层，未开启时为`None`。
+        '''
+        return self._pointLayer
+
+    def setPointBatching(self, enabled: bool):
+        '''开启或关闭点图层。开启后默认样式的点图元由点图层以一次绘制调用批量绘制，
+        适用于点图元很多的场景；选中或修改了样式的点图元仍由自身绘制。
+
+        :param enabled: 是否开启点图层。
+        '''
+        if enabled == (self._pointLayer is not None):
+            return
+        if enabled:
+            self._pointLayer = GeoGraphPointLayer(
+                GeoGraphPoint.POINT_SIZE, GeoGraphPoint.PEN_WIDTH,
+                GeoGraphPoint.BORDER_COLOR, GeoGraphPoint.FILL_COLOR)
+            QGraphicsScene.addItem(self, self._pointLayer)  # 点图层不是图元
+            for item in self._itemsByHandle.values():
+                if isinstance(item, GeoGraphPoint):
+                    item.updateBatching()
+        else:
+            self._pointLayer.clear()
+            QGraphicsScene.removeItem(self, self._pointLayer)
+            self._pointLayer = None
+
+    def labelsPlacer(self) -> GeoPointLabelsPlacer | None:
+        '''自动布置点图元标签的标签布置器，未开启时为`None`。
+        '''
+        return self._labelsPlacer
+
+    def setLabelAutoPlacement(self, enabled: bool):
+        '''开启或关闭标签自动布置。开启后点图元的标签在八个方向中自动选择，
+        避免与其它标签及图元重叠；移动点图元后只重新布置其附近的标签。
+        手动设置了角度的标签不被自动布置。
+
+        :param enabled: 是否开启标签自动布置。
+        '''
+        if enabled == (self._labelsPlacer is not None):
+            return
+        if enabled:
+            self._labelsPlacer = GeoPointLabelsPlacer(self.itemsManager)
+            for item in self._itemsByHandle.values():
+                if isinstance(item, GeoGraphPoint):
+                    self._labelsPlacer.markDirty(item.label())
+        else:
+            self._labelsPlacer.clear()
+            self._labelsPlacer = None
+
+    def createPointAt(self, scenePos: QPointF,
+                      scale: float = 1.) -> GeoGraphPoint:
         '''在指定坐标处创建一个点。
         自动判断该点是否为自由点、一路径上的点或两路径的交点。
 
         :param scenePos: 创建点的坐标，在场景坐标系下。
+        :param scale: 进行操作的视图的放缩比例，参见`self.itemsAt()`。
         :returns: 创建好的点。
         '''
-        # 在指定坐标附近的图元
-        items: list[GeoGraphItem] = [
-            item for item in self.items(scenePos)
-            if isinstance(item, GeoGraphItem) and item.isCreated]
+        items = self.itemsAt(scenePos, scale)  # 在指定坐标附近的图元
         if len(items) and all(
                 isinstance(item, GeoGraphPathItem) for item in items):
             # 若附近有两个及以上的路径图元
@@ -130,6 +246,7 @@ class GeoGraphScene(QGraphicsScene):
             else:
                 # 则创建路径上的点
                 point = GeoGraphPoint()
+                point.setPos(scenePos)
                 point.addMaster(items[0])
         else:  # 否则创建自由点
             point = GeoGraphPoint()
@@ -139,6 +256,61 @@ class GeoGraphScene(QGraphicsScene):
         point.updateSelfPosition()  # 更新点坐标
         return point
 
+    def itemsAt(self, scenePos: QPointF,
+                scale: float = 1.) -> list[GeoGraphItem]:
+        '''在指定坐标处的所有已创建的可见图元，即到该坐标的距离不超过其选中半径的图元。
+        点、线段与圆由图元管理器的空间索引查询，而不对每个路径图元描边求形状；
+        空间索引不含的图元（如点标签）仍由`QGraphicsScene.items()`查询，
+        并视为其所属的`GeoGraphItem`，如点中其标签即点中该点。
+        结果只含`GeoGraphItem`，不属于任何`GeoGraphItem`的图元（如点图层）不在结果中。
+        与`QGraphicsScene.items()`相同，按Z值由高到低排列，Z值相同时按距离由近到远排列，
+        经标签等点中的图元排在同Z值的其余图元之后。
+        选中范围以像素为单位，在视图坐标系下计算，故由视图传入自身的放缩比例；
+        图元的形状与矩形不含选中范围，不随放缩改变。
+
+        :param scenePos: 指定坐标，在场景坐标系下。
+        :param scale: 进行查询的视图的放缩比例。
+        :returns: 在指定坐标处的图元列表，不含重复的图元。
+        '''
+        self.flushUpdates()  # 以最新的坐标查询
+        # 查询半径不小于任一图元的选中半径，再逐一按图元自身的选中半径筛选
+        pointSize = GeoGraphPoint.ATTRIBUTES_INFO['pointSize']['max']
+        radius = pointSize / 2 + GeoGraphPathItem.SELECT_WIDTH / 2 / scale
+        items = []
+        for handle, distance in self.itemsManager.within(
+                (scenePos.x(), scenePos.y()), radius):
+            item = self._itemsByHandle.get(handle)
+            if item is not None and item.isCreated and item.isVisible() \
+                    and distance <= item.hitRadius(scale):
+                items.append(item)
+        # 空间索引不含的图元仍由Qt的索引按矩形查询，再由图元自身判断是否包含该坐标
+        found = set(items)
+        for other in super().items(
+                scenePos, Qt.ItemSelectionMode.IntersectsItemBoundingRect):
+            if isinstance(other, (GeoGraphPoint, GeoGraphPathItem)) \
+                    or not other.contains(other.mapFromScene(scenePos)):
+                continue  # 点与路径图元已由空间索引查询
+            item = other
+            while item is not None and not isinstance(item, GeoGraphItem):
+                item = item.parentItem()  # 点标签等子图元视为其所属的图元
+            if item is not None and item not in found \
+                    and item.isCreated and item.isVisible():
+                items.append(item)
+                found.add(item)
+        items.sort(key=lambda item: -item.zValue())
+        return items
+
+    def topItemAt(self, scenePos: QPointF,
+                  scale: float = 1.) -> GeoGraphItem | None:
+        '''在指定坐标处最上方的图元，参见`self.itemsAt()`。
+
+        :param scenePos: 指定坐标，在场景坐标系下。
+        :param scale: 进行查询的视图的放缩比例。
+        :returns: 最上方的图元，无则返回`None`。
+        '''
+        items = self.itemsAt(scenePos, scale)
+        return items[0] if items else None
+
     def createIntersecWithItems(
             self, scenePos: QPointF,
             items: list[GeoGraphItem]) -> GeoGraphIntersection:
@@ -179,9 +351,8 @@ class GeoGraphScene(QGraphicsScene):
         '''添加图元。
         '''
         super().addItem(item)
-        item.zoomScaleChanged(self.zoomScale)     # 让图元适应当前缩放倍数
-        item.onAddingSelfToScene()                # 调用图元的添加回调函数
-        self.itemsManager.addItem(item.instance)  # 添加基础图元
+        item.onAddingSelfToScene()  # 调用图元的添加回调函数
+        self.registerInstance(item)  # 添加基础图元
 
     def removeItem(self, item: GeoGraphItem):
         '''删除图元，并递归删除其子图元。
@@ -189,31 +360,132 @@ class GeoGraphScene(QGraphicsScene):
         if item.instance is None:
             return  # 图元已经被删除
         super().removeItem(item)
+        if self._pointLayer is not None:
+            self._pointLayer.removePoint(item)
+        if self._labelsPlacer is not None and isinstance(item, GeoGraphPoint):
+            self._labelsPlacer.removeLabel(item.label())
         item.onRemovingSelfFromScene()
         item.isAvailable = False
         for master in item.masters():
             master.removeChild(item)  # 从所有父图元中删除图元
-        self.itemsManager.removeItem(item.instance)  # 删除基础图元
+        self.unregisterInstance(item)  # 删除基础图元
         item.instance = None
         for child in item.children():
             self.removeItem(child)  # 递归删除子图元
 
+    def registerInstance(self, item: GeoGraphItem):
+        '''在图元管理器中添加图元的基础图元，并记录其编号。
+        '''
+        self._itemsByHandle[self.itemsManager.addItem(item.instance)] = item
+
+    def itemByHandle(self, handle: int) -> GeoGraphItem | None:
+        '''图元管理器中给定编号的基础图元所属的图元，无则返回`None`。
+        '''
+        return self._itemsByHandle.get(handle)
+
+    def unregisterInstance(self, item: GeoGraphItem):
+        '''在图元管理器中删除图元的基础图元。
+        '''
+        self._itemsByHandle.pop(item.instance.handle(), None)
+        self.itemsManager.removeItem(item.instance)
+
+    def precision(self) -> GeoPrecision:
+        '''图元的计算精度。
+        '''
+        return self.itemsManager.precision()
+
+    def setPrecision(self, precision: GeoPrecision):
+        '''设置所有图元的计算精度，并以新精度重新计算、更新所有图元。
+        两种精度下交点的坐标略有不同，且交点编号虽均只由父图元决定，
+        但父图元本身已有舍入误差，直线几乎过圆心等退化情形下仍可能不同，
+        故切换精度可能使交点互换位置。
+        重新计算从所有顶层图元开始，按拓扑顺序更新坐标改变了的图元，
+        结果只取决于各图元的当前状态，与切换前的精度和更新历史无关。
+
+        :param precision: `GeoPrecision.DOUBLE`或`GeoPrecision.DECFLOAT`。
+        '''
+        self.flushUpdates()
+        self.itemsManager.setPrecision(precision)
+        self.updateItems({
+            item for item in self._itemsByHandle.values()
+            if not item.masters()})
+
+    def mouseMoveEvent(self, event):
+        '''拖动时Qt逐个移动所有选中的图元。移动期间推迟更新，
+        移动完成后以所有移动了的图元为起点一次更新，使它们共同的子图元只计算一次。
+        移动期间记录发出事件的视图的放缩比例，自由点按该视图中的网格吸附。
+        '''
+        view = event.widget().parentWidget() if event.widget() else None
+        self._isMovingItems = True
+        if isinstance(view, QGraphicsView):  # 事件由视图的视口发出
+            self._movingScale = view.transform().m11()
+        try:
+            super().mouseMoveEvent(event)
+        finally:
+            self._isMovingItems = False
+            self._movingScale = 1.
+        if self._maxUpdateRate <= 0:
+            self.flushUpdates()
+
+    def maxUpdateRate(self) -> float:
+        '''拖动时每秒最多更新图元的次数。
+        '''
+        return self._maxUpdateRate
+
+    def setMaxUpdateRate(self, rate: float):
+        '''设置拖动时每秒最多更新图元的次数。不大于0时不合并更新，每次移动立即更新。
+        '''
+        self._maxUpdateRate = rate
+        if rate > 0:
+            self._updateTimer.setInterval(round(1000 / rate))
+        else:
+            self.flushUpdates()
+
+    def scheduleUpdate(self, item: GeoGraphItem):
+        '''在下一帧更新从给定图元开始受影响的所有图元。
+        同一帧内多次移动的图元合并为一次`self.updateItems()`。
+
+        :param item: 移动了的图元。
+        '''
+        if self._isUpdating:
+            return  # 更新中移动的路径上的点，其子图元已在本轮更新中
+        self._pendingItems.add(item)
+        self._scheduledUpdates += 1
+        if self._maxUpdateRate <= 0:
+            if not self._isMovingItems:
+                self.flushUpdates()
+        elif not self._updateTimer.isActive():
+            self._updateTimer.start()
+
+    def isUpdating(self) -> bool:
+        '''是否正在更新图元，即图元此时的移动是否来自`self.updateItems()`。
+        '''
+        return self._isUpdating
+
+    def flushUpdates(self):
+        '''立即更新所有待更新的图元。
+        '''
+        self._updateTimer.stop()
+        if not self._pendingItems:
+            return
+        items = {item for item in self._pendingItems if item.isAvailable}
+        self.coalescedUpdates += self._scheduledUpdates - 1
+        self._pendingItems, self._scheduledUpdates = set(), 0
+        self.updateItems(items)
+
     def updateItems(self, items: set[GeoGraphItem]):
-        '''从给定的图元集合开始递归更新图元，保证每个图元实际上最多只会被计算一次。
-        先将相关图元还原为更新前的准备状态，再更新图元。
-        '''
-        q = collections.deque()
-        ancestors: set[GeoGraphItem] = set()
-        for item in items:
-            if item.isUpdatable and not item.isUndefined:
-                q.append(item)
-                ancestors.add(item)
-        while q:  # 将相关图元全部还原为更新前的准备状态
-            master: GeoGraphItem = q.popleft()
-            for child in master.children():
-                q.append(child)  # 广度优先遍历
-            master.updateFromMasters()
-            master.instance.update()
-        for ancestor in ancestors:
-            for child in ancestor.children():
-                child.updatePosition(ancestor, ancestors)
+        '''从给定的图元集合开始更新所有受影响的图元。
+        依赖图的遍历与计算全部由`self.itemsManager`完成，
+        此处仅更新坐标或定义状态改变了的图元，且父图元总在子图元之前更新。
+        '''
+        if self._isUpdating:
+            return  # 更新中移动的路径上的点，其子图元已在本轮更新中
+        self._isUpdating = True
+        try:
+            changed = self.itemsManager.recompute([
+                item.instance for item in items
+                if item.isUpdatable and not item.isUndefined])
+            for handle in changed:
+                self._itemsByHandle[handle].updateSelfPosition()
+        finally:
+            self._isUpdating = False
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from PySide6.QtCore import QPoint
+    from PySide6.QtGui import QMouseEvent
     from .Constants import GeoSecondaryMode
     from .GeoGraphScene import GeoGraphScene
 
@@ -65,13 +66,47 @@ class GeoGraphView(QGraphicsView):
         self._secondaryMode = mode
 
     def mousePressEvent(self, event):
-        '''按下鼠标时，若主模式为绘制模式，则创建图元或添加父图元。
+        '''按下鼠标时，若主模式为绘制模式，则创建图元或添加父图元；
+        若主模式为选择模式，则未直接点中图元时选中附近的图元，参见`self._selectNearItem()`。
         '''
+        if event.button() == Qt.MouseButton.LeftButton \
+                and self._mainMode == GeoMainMode.SELECT \
+                and self._selectNearItem(event):
+            return
         super().mousePressEvent(event)
         if event.button() == Qt.MouseButton.LeftButton \
                 and self._mainMode == GeoMainMode.DRAW:
             self._clickInDrawMode(event.pos())
 
+    def mouseMoveEvent(self, event):
+        '''移动鼠标时，若正在创建图元，则以鼠标位置更新其预览。
+        '''
+        super().mouseMoveEvent(event)
+        if self._creatingItem is not None:
+            self._creatingItem.setPreviewPos(self.mapToScene(event.pos()))
+
+    def _selectNearItem(self, event: QMouseEvent) -> bool:
+        '''Qt只以图元的形状判断是否点中图元，而形状不含随放缩改变的选中范围。
+        未直接点中任何图元时，按本视图的放缩比例查询选中范围内最上方的图元并选中它，
+        按住Ctrl时则切换其选中状态。此时不开始框选。
+
+        :param event: 按下鼠标的事件。
+        :returns: 是否选中了附近的图元，是则事件已处理。
+        '''
+        if self.itemAt(event.pos()) is not None:
+            return False
+        item = self.scene().topItemAt(
+            self.mapToScene(event.pos()), self._zoomScale)
+        if item is None:
+            return False
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            item.setSelected(not item.isSelected())
+        else:
+            self.scene().clearSelection()
+            item.setSelected(True)
+        event.accept()
+        return True
+
     def _clickInDrawMode(self, pos: QPoint):
         '''当在绘制模式按下鼠标时，创建图元或添加父图元。具体实现如下：
         1. 若当前尚未创建图元，则创建；
@@ -89,8 +124,9 @@ class GeoGraphView(QGraphicsView):
 
         :param pos: 鼠标点击的位置，在视图坐标系下。
         '''
-        selectedItem = self.itemAt(pos)  # 选中的图元
         scenePos = self.mapToScene(pos)  # 转换为场景坐标系
+        selectedItem = self.scene().topItemAt(
+            scenePos, self._zoomScale)  # 选中的图元
         # 从未选择过图元，表明此次点击是第一次，要创建新图元
         if not self._drawModeSelectedItems:
             # 创建图元
@@ -113,8 +149,11 @@ class GeoGraphView(QGraphicsView):
                 len(self._drawModeSelectedItems), GeoGraphPoint)
         if self._typePatterns:  # 匹配成功
             self._addMasterForCreatingItem(                     # 添加
-                self.scene().createPointAt(scenePos)   # 创建的新点
+                self.scene().createPointAt(
+                    scenePos, self._zoomScale)         # 创建的新点
                 if createPointFlag else selectedItem)  # 或选中的图元为父图元
+            # 父图元改变了预览的形状，以点击位置更新预览
+            self._creatingItem.setPreviewPos(scenePos)
             # 重复检查变量输入要求，直到不再需要输入变量值或输入失败
             if not self._repeatCheckingVarInputRequirement():
                 self._afterCreatingItem()
@@ -223,10 +262,10 @@ class GeoGraphView(QGraphicsView):
                 self._itemAttributesSetterDialog = None
 
     def zoomScaleChanged(self, zoomChange: float):
-        '''缩放时调用。控制缩放比例于一定范围内，并将信号传递给场景。
+        '''缩放时调用。控制缩放比例于一定范围内。
+        画笔与选中范围均以像素为单位，故无需更新场景中的图元。
         '''
         newZoomScale = self._zoomScale * zoomChange
         if self._minimumZoomScale <= newZoomScale <= self._maximumZoomScale:
             self._zoomScale = newZoomScale
             self.scale(zoomChange, zoomChange)
-            self.scene().zoomScaleChanged(zoomChange)
@@ -0,0 +1,88 @@
+'''GeoGrapher图元内存占用测试
+分别创建大量点、线段与圆，统计平均每个图元占用的内存。
+Python对象的内存由`tracemalloc`统计，进程内存（含Qt与基础图元）由常驻内存的增量统计。
+使用`make benchmark-memory`运行。
+'''
+
+import gc
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+
+from .GeoGraphScene import GeoGraphScene
+from .GeoGraphItems.GeoGraphItem import GeoGraphItem
+from .GeoGraphItems.GeoGraphPoint import GeoGraphPoint
+from .GeoGraphItems.GeoGraphSegment import GeoGraphSegment
+from .GeoGraphItems.GeoGraphCircle import GeoGraphCircle
+
+__all__ = ['benchmark']
+
+
+def _residentBytes() -> int:
+    '''进程的常驻内存，以字节为单位。仅支持Linux。
+    '''
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _addPoint(scene: GeoGraphScene, i: int) -> GeoGraphPoint:
+    '''在场景中添加一个自由点。
+    '''
+    point = GeoGraphPoint()
+    point.isCreated = True
+    scene.addItem(point)
+    point.setPos(i % 1000, i // 1000)
+    return point
+
+
+def _pathAdder(pathType: type[GeoGraphItem]):
+    '''返回在场景中添加路径图元的函数，所有路径图元共用两个父图元。
+    '''
+    masters = {}
+
+    def addPath(scene: GeoGraphScene, i: int) -> GeoGraphItem:
+        if scene not in masters:
+            masters[scene] = _addPoint(scene, 0), _addPoint(scene, 1001)
+        item = pathType()
+        scene.addItem(item)
+        for master in masters[scene]:
+            item.addMaster(master)
+        item.isCreated = True
+        item.updateSelfPosition()
+        return item
+    return addPath
+
+
+def benchmark(n: int):
+    '''分别创建n个点、线段与圆，输出平均每个图元占用的内存。
+    '''
+    for name, add in (('point', _addPoint),
+                      ('segment', _pathAdder(GeoGraphSegment)),
+                      ('circle', _pathAdder(GeoGraphCircle))):
+        scene = GeoGraphScene()
+        add(scene, 0)  # 预先创建共用的对象，不计入统计
+        gc.collect()
+        tracemalloc.start()
+        resident = _residentBytes()
+        start = time.perf_counter()
+        items = [add(scene, i) for i in range(n)]
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        python, _ = tracemalloc.get_traced_memory()
+        process = _residentBytes() - resident
+        tracemalloc.stop()
+        print(f'== {n} {name}s')
+        print(f'{python / n:10.0f} bytes of Python objects per {name}')
+        print(f'{process / n:10.0f} bytes of process memory per {name}')
+        print(f'{elapsed / n * 1e6:10.1f} us to create a {name}')
+        del items
+        scene.clear()
+
+
+if __name__ == '__main__':
+    app = QApplication([])
+    benchmark(100000)
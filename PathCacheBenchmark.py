@@ -0,0 +1,91 @@
+'''GeoGrapher路径缓存性能测试
+拖动一个点，统计每帧构造路径与矩形的次数（`GeoGraphPathItem.pathConstructions`）及每帧耗时。
+使用`make benchmark-paths`运行。
+'''
+
+import math
+import os
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtCore import QRectF
+
+from .GeoGraphScene import GeoGraphScene
+from .GeoGraphItems.GeoGraphItem import GeoGraphPathItem
+from .GeoGraphItems.GeoGraphPoint import GeoGraphPoint
+from .GeoGraphItems.GeoGraphSegment import GeoGraphSegment
+from .GeoGraphItems.GeoGraphCircle import GeoGraphCircle
+
+__all__ = ['buildScene', 'benchmark']
+
+
+def _addPath(scene: GeoGraphScene, pathType: type[GeoGraphPathItem],
+             first: GeoGraphPoint, second: GeoGraphPoint):
+    '''在场景中添加以给定两点为父图元的路径图元。
+    '''
+    item = pathType()
+    scene.addItem(item)
+    item.addMaster(first)
+    item.addMaster(second)
+    item.isCreated = True
+    item.updateSelfPosition()
+
+
+def buildScene(n: int, radius: float = 300.) \
+        -> tuple[GeoGraphScene, GeoGraphPoint]:
+    '''创建场景：中心点与圆周上的n个点各连一条线段，并以中心点为圆心各作一个圆，
+    另有n条不依赖中心点的线段，拖动中心点时不应重新构造它们的路径。
+
+    :param n: 圆周上点的个数。
+    :param radius: 圆周的半径。
+    :returns: 创建好的场景与中心点。
+    '''
+    scene = GeoGraphScene()
+    scene.setSceneRect(-radius * 2, -radius * 2, radius * 4, radius * 4)
+    points = []
+    for i in range(n + 1):
+        point = GeoGraphPoint()
+        point.isCreated = True
+        scene.addItem(point)
+        if i:
+            angle = math.tau * i / n
+            point.setPos(radius * math.cos(angle), radius * math.sin(angle))
+        points.append(point)
+    hub, rim = points[0], points[1:]
+    for i, point in enumerate(rim):
+        _addPath(scene, GeoGraphSegment, hub, point)
+        _addPath(scene, GeoGraphCircle, hub, point)
+        _addPath(scene, GeoGraphSegment, point, rim[(i + 1) % n])
+    return scene, hub
+
+
+def benchmark(n: int, frames: int = 200):
+    '''创建场景并拖动中心点，每帧移动一次并绘制整个场景。
+    '''
+    scene, hub = buildScene(n)
+    rect = scene.sceneRect()
+    image = QImage(800, 800, QImage.Format.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(image.rect()), rect)  # 预热，不计入统计
+    before = GeoGraphPathItem.pathConstructions
+    start = time.perf_counter()
+    for frame in range(frames):
+        angle = math.tau * frame / frames
+        hub.setPos(20 * math.cos(angle), 20 * math.sin(angle))
+        scene.flushUpdates()  # 每帧各移动一次，不合并
+        scene.render(painter, QRectF(image.rect()), rect)
+    elapsed = time.perf_counter() - start
+    painter.end()
+    constructions = GeoGraphPathItem.pathConstructions - before
+    print(f'== {n * 3} path items, {n * 2} depend on the dragged point')
+    print(f'{constructions / frames:10.1f} path constructions per frame')
+    print(f'{elapsed / frames * 1e3:10.2f} ms per frame')
+
+
+if __name__ == '__main__':
+    app = QApplication([])
+    for n in (100, 1000):
+        benchmark(n)
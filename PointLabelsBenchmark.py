@@ -0,0 +1,123 @@
+'''GeoGrapher点图元标签性能测试
+统计标签管理器分配标签的耗时，在场景中创建带标签的点图元的耗时，
+以及标签自动布置（`GeoGraphScene.setLabelAutoPlacement()`）的耗时与效果。
+使用`make benchmark-labels`运行。
+'''
+
+import math
+import os
+import random
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QPointF
+
+from .GeoGraphScene import GeoGraphScene
+from .GeoGraphItems.GeoGraphPoint import GeoGraphPoint
+from .GeoGraphItems.GeoPointLabelsManager import GeoPointLabelsManager
+
+__all__ = ['benchmarkManager', 'benchmarkScene', 'benchmarkPlacement']
+
+
+def benchmarkManager(n: int):
+    '''依次分配n个标签，再删除其中一半并重新分配。
+    '''
+    manager = GeoPointLabelsManager()
+    start = time.perf_counter()
+    for _ in range(n):
+        manager.addLabel(next(manager))
+    allocated = time.perf_counter()
+    for ordinal in range(0, n, 2):
+        manager.removeLabel(manager.labelAt(ordinal))
+    for _ in range(0, n, 2):
+        manager.addLabel(next(manager))
+    reallocated = time.perf_counter()
+    print(f'== {n} labels')
+    print(f'{(allocated - start) / n * 1e6:10.2f} us per label')
+    print(f'{(reallocated - allocated) / (n / 2) * 1e6:10.2f} us per label '
+          'after releasing half of them')
+
+
+def benchmarkScene(n: int):
+    '''在场景中创建n个带标签的点图元。
+    '''
+    scene = GeoGraphScene()
+    start = time.perf_counter()
+    for i in range(n):
+        point = GeoGraphPoint()
+        point.isCreated = True
+        scene.addItem(point)
+    elapsed = time.perf_counter() - start
+    print(f'== {n} labelled points in a scene')
+    print(f'{elapsed:10.2f} s in total, {elapsed / n * 1e6:.2f} us per point')
+
+
+def _overlaps(points: list[GeoGraphPoint], cellSize: float = 64.) -> int:
+    '''与其它标签重叠的标签个数。
+    '''
+    cells, rects = {}, [point.label().sceneBoundingRect() for point in points]
+    for i, rect in enumerate(rects):
+        for x in range(math.floor(rect.left() / cellSize),
+                       math.floor(rect.right() / cellSize) + 1):
+            for y in range(math.floor(rect.top() / cellSize),
+                           math.floor(rect.bottom() / cellSize) + 1):
+                cells.setdefault((x, y), []).append(i)
+    overlapping = set()
+    for indices in cells.values():
+        for i in indices:
+            for j in indices:
+                if i < j and rects[i].intersects(rects[j]):
+                    overlapping.update((i, j))
+    return len(overlapping)
+
+
+def benchmarkPlacement(n: int, moves: int = 100, density: float = 100.):
+    '''在场景中随机创建n个点图元并自动布置标签，
+    再逐一移动其中一些点图元，统计每次增量布置的耗时。
+
+    :param density: 平均每个点图元占据的正方形的边长。
+    '''
+    random.seed(0)
+    scene = GeoGraphScene()
+    size = density * math.sqrt(n)
+    points = []
+    for i in range(n):
+        point = GeoGraphPoint()
+        point.isCreated = True
+        scene.addItem(point)
+        point.setPos(random.uniform(0, size), random.uniform(0, size))
+        points.append(point)
+    scene.flushUpdates()
+    before = _overlaps(points)
+    start = time.perf_counter()
+    scene.setLabelAutoPlacement(True)
+    placer = scene.labelsPlacer()
+    placer.place(math.inf)
+    elapsed = time.perf_counter() - start
+    print(f'== {n} labels placed automatically')
+    print(f'{elapsed:10.2f} s for the first placement')
+    print(f'{before:10d} -> {_overlaps(points)} labels overlapping others')
+    worst, total, placed = 0., 0., placer.placedCount
+    for _ in range(moves):
+        point = random.choice(points)
+        point.setPos(point.pos() + QPointF(density / 2, 0))
+        scene.flushUpdates()
+        start = time.perf_counter()
+        placer.place(math.inf)
+        elapsed = time.perf_counter() - start
+        worst, total = max(worst, elapsed), total + elapsed
+    print(f'{(placer.placedCount - placed) / moves:10.1f} labels re-placed '
+          'per move')
+    print(f'{total / moves * 1e3:10.2f} ms per move, '
+          f'{worst * 1e3:.2f} ms at worst')
+    scene.setLabelAutoPlacement(False)
+
+
+if __name__ == '__main__':
+    app = QApplication([])
+    for n in (1000, 10000, 100000):
+        benchmarkManager(n)
+    benchmarkScene(100000)
+    benchmarkPlacement(10000)
@@ -0,0 +1,75 @@
+'''GeoGrapher点图层性能测试
+比较逐个绘制点图元与由点图层（`GeoGraphScene.setPointBatching()`）批量绘制时每帧的绘制耗时。
+使用`make benchmark-points`运行。
+'''
+
+import math
+import os
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtCore import QRectF
+
+from .GeoGraphScene import GeoGraphScene
+from .GeoGraphItems.GeoGraphPoint import GeoGraphPoint
+
+__all__ = ['buildScene', 'benchmark']
+
+
+def buildScene(n: int, spacing: float = 40.) -> GeoGraphScene:
+    '''创建场景：n个自由点排成正方形网格。
+
+    :param n: 点的个数。
+    :param spacing: 相邻两点的距离。
+    :returns: 创建好的场景。
+    '''
+    scene = GeoGraphScene()
+    side = math.ceil(math.sqrt(n))
+    for i in range(n):
+        point = GeoGraphPoint()
+        point.isCreated = True
+        scene.addItem(point)
+        point.setPos(i % side * spacing, i // side * spacing)
+    scene.flushUpdates()
+    return scene
+
+
+def _renderTime(scene: GeoGraphScene, rect: QRectF, frames: int) -> float:
+    '''绘制场景中的给定区域若干帧，返回每帧的平均耗时，以秒为单位。
+    '''
+    image = QImage(800, 800, QImage.Format.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(image.rect()), rect)  # 预热，不计入统计
+    start = time.perf_counter()
+    for _ in range(frames):
+        scene.render(painter, QRectF(image.rect()), rect)
+    elapsed = time.perf_counter() - start
+    painter.end()
+    return elapsed / frames
+
+
+def benchmark(n: int, frames: int = 10):
+    '''创建场景，分别以逐个绘制与点图层绘制整个场景及场景中心的一小块区域。
+    '''
+    scene = buildScene(n)
+    whole = scene.itemsBoundingRect()
+    centre = QRectF(0, 0, 800, 800)
+    centre.moveCenter(whole.center())
+    print(f'== {n} points')
+    for name, rect in (('whole scene', whole), ('800x800 at 1:1', centre)):
+        scene.setPointBatching(False)
+        single = _renderTime(scene, rect, frames)
+        scene.setPointBatching(True)
+        batched = _renderTime(scene, rect, frames)
+        print(f'{name:>16}: {single * 1e3:8.2f} ms per item, '
+              f'{batched * 1e3:8.2f} ms batched')
+    scene.setPointBatching(False)
+
+
+if __name__ == '__main__':
+    app = QApplication([])
+    for n in (10000, 50000):
+        benchmark(n)
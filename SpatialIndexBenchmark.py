@@ -0,0 +1,98 @@
+'''GeoGrapher空间索引性能测试
+比较`GeoGraphScene.itemsAt()`（图元管理器的空间索引）与`QGraphicsScene.items()`的查询延迟。
+使用`make benchmark-index`运行。
+'''
+
+import os
+import random
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QPointF
+
+from .GeoGraphScene import GeoGraphScene
+from .GeoGraphItems.GeoGraphItem import GeoGraphItem
+from .GeoGraphItems.GeoGraphPoint import GeoGraphPoint
+from .GeoGraphItems.GeoGraphSegment import GeoGraphSegment
+
+__all__ = ['buildScene', 'timeQueries', 'benchmark']
+
+
+def buildScene(n: int, spacing: float = 40.) -> GeoGraphScene:
+    '''创建含n个图元的场景，一半为随机分布的点，一半为连接相邻两点的线段。
+
+    :param n: 图元总数。
+    :param spacing: 点的平均间距，场景大小随n增大以保持密度不变。
+    :returns: 创建好的场景。
+    '''
+    scene = GeoGraphScene()
+    side = spacing * (n / 2) ** .5
+    scene.setSceneRect(-side, -side, side * 2, side * 2)
+    points = []
+    for _ in range(n // 2):
+        point = GeoGraphPoint()
+        point.isCreated = True
+        scene.addItem(point)
+        point.setPos(random.uniform(-side, side), random.uniform(-side, side))
+        points.append(point)
+    points.sort(key=lambda point: (point.x() // spacing, point.y()))
+    for i in range(n - n // 2):
+        segment = GeoGraphSegment()
+        scene.addItem(segment)
+        segment.addMaster(points[i % len(points)])
+        segment.addMaster(points[(i + 1) % len(points)])
+        segment.isCreated = True
+        segment.updateSelfPosition()
+    scene.flushUpdates()
+    return scene
+
+
+def timeQueries(query, positions: list[QPointF]) -> float:
+    '''对每个坐标调用一次`query`，返回平均每次查询的时间（微秒）。
+    '''
+    start = time.perf_counter()
+    for pos in positions:
+        query(pos)
+    return (time.perf_counter() - start) / len(positions) * 1e6
+
+
+def benchmark(n: int, queries: int = 1000):
+    '''创建含n个图元的场景，并比较各种查询的延迟。
+    '''
+    start = time.perf_counter()
+    scene = buildScene(n)
+    rect = scene.sceneRect()
+    print(f'== {n} items (built in {time.perf_counter() - start:.1f} s)')
+    positions = [
+        QPointF(random.uniform(rect.left(), rect.right()),
+                random.uniform(rect.top(), rect.bottom()))
+        for _ in range(queries)]
+    manager = scene.itemsManager
+    manager.within((0., 0.), 0.)  # 建立空间索引，不计入查询时间
+    scene.items(QPointF())        # 建立Qt的BSP索引，同上
+    results = {
+        'QGraphicsScene.items(pos)': timeQueries(lambda pos: [
+            item for item in scene.items(pos)
+            if isinstance(item, GeoGraphItem) and item.isCreated],
+            positions),
+        'GeoGraphScene.itemsAt(pos)': timeQueries(scene.itemsAt, positions),
+        'itemsManager.within(p, 20)': timeQueries(
+            lambda pos: manager.within((pos.x(), pos.y()), 20.), positions),
+        'itemsManager.nearest(p, 8)': timeQueries(
+            lambda pos: manager.nearest((pos.x(), pos.y()), 8), positions),
+        'itemsManager.inRect(100x100)': timeQueries(
+            lambda pos: manager.inRect(
+                (pos.x(), pos.y(), pos.x() + 100, pos.y() + 100)),
+            positions),
+    }
+    for name, t in results.items():
+        print(f'{name:<32}{t:10.1f} us per query')
+
+
+if __name__ == '__main__':
+    app = QApplication([])
+    random.seed(0)
+    for n in (10000, 100000):
+        benchmark(n)